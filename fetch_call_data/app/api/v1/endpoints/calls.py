@@ -2,62 +2,193 @@
 API endpoints for calls management.
 """
 
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from databases import Database
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+import json
 import math
 
 from app.schemas.calls import (
-    CallCreate, CallUpdate, CallResponse, CallBatchCreate, 
-    CallBatchResponse, CallListResponse, SuccessResponse, PaginationInfo
+    CallCreate, CallUpdate, CallResponse, CallBatchCreate, CallBatchUpsert, 
+    CallBatchResponse, CallBatchUpsertResponse, CallListResponse, SuccessResponse, 
+    PaginationInfo, QueuedResponse
 )
 from app.dependencies.database import get_database
-from app.dependencies.pagination import get_pagination_params
+from app.models import calls as call_queries
+from app.models.database import Database
+from app.dependencies.filters import apply_client_scope, get_scoped_call_filters, build_filter_clause
+from app.dependencies.auth import get_client_scope
+from app.dependencies.pagination import get_pagination_params, encode_cursor
+from app.dependencies.fields import get_call_fields
+from app.models.rollup import fetch_calls_version, touched_clients
+from app.services.client_registry import client_registry
+from app.services.ingest import ingest_writer
+from app.core.cache import calls_tag, invalidate_calls, shared_cache
+from app.core.conditional import is_not_modified, make_etag, not_modified_response, validator_headers
+from app.core.serialization import CALL_FIELDS, FastJSONResponse, call_record
 from app.core.config import settings
 
 router = APIRouter()
 
 
+def is_foreign_key_violation(error: Exception) -> bool:
+    """Check whether a database error is a foreign key violation."""
+    return "foreign key constraint" in str(error).lower()
+
+
+def filters_cache_key(where_clause: str, values: dict) -> tuple:
+    """Build a hashable cache key for a filtered query."""
+    return (where_clause, tuple(
+        (name, tuple(value) if isinstance(value, list) else value)
+        for name, value in sorted(values.items())
+    ))
+
+
+async def count_calls(
+    db: Database, 
+    mode: str, 
+    where_clause: str = "", 
+    values: Optional[dict] = None,
+    client_id: Optional[int] = None,
+    version: Optional[int] = None
+) -> Optional[int]:
+    """Count calls exactly (cached briefly), from planner statistics, or not at all."""
+    values = values or {}
+    
+    if mode == "none":
+        return None
+    
+    if mode == "estimate":
+        if where_clause:
+            # the planner's row estimate for the filtered scan
+            plan = await db.fetch_val(
+                f"EXPLAIN (FORMAT JSON) SELECT 1 FROM calls {where_clause}", 
+                values=values
+            )
+            return int(json.loads(plan)[0]["Plan"]["Plan Rows"])
+        
+        # reltuples is maintained by VACUUM/ANALYZE, -1 until a table is first
+        # analyzed; a partitioned calls has no rows of its own, so sum the partitions
+        estimate_query = """
+            SELECT CASE WHEN bool_and(c.reltuples >= 0) THEN SUM(c.reltuples)::bigint END
+            FROM pg_class c
+            WHERE c.oid = 'calls'::regclass AND c.relkind = 'r'
+                OR c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = 'calls'::regclass)
+        """
+        estimate = await db.fetch_val(estimate_query)
+        if estimate is not None:
+            return estimate
+    
+    # shared by every worker until a write invalidates it or it expires; keyed
+    # by the change counter too, for writes that bypassed the API
+    return await shared_cache.fetch(
+        "count", 
+        (version, filters_cache_key(where_clause, values)), 
+        lambda: db.fetch_val(f"SELECT COUNT(*) FROM calls {where_clause}", values=values), 
+        tag=calls_tag(client_id), 
+        ttl=settings.api.count_cache_ttl
+    )
+
+
+def calls_page_query(where_clause: str, with_offset: bool, fields: tuple = CALL_FIELDS) -> str:
+    """Build the query for one page of calls, newest first, reading only the given fields."""
+    offset_clause = "OFFSET :offset" if with_offset else ""
+    # the cursor needs timestamp and call_id even when they are not returned
+    columns = ", ".join(field for field in CALL_FIELDS if field in fields or field in ("timestamp", "call_id"))
+    return f"""
+        SELECT {columns}
+        FROM calls 
+        {where_clause}
+        ORDER BY timestamp DESC, call_id DESC 
+        LIMIT :limit {offset_clause}
+    """
+
+
 @router.get("/", response_model=CallListResponse)
 async def get_calls(
+    request: Request,
     pagination: dict = Depends(get_pagination_params),
+    count: Literal["exact", "estimate", "none"] = Query(
+        "exact", 
+        description="How to compute the total: exact (cached briefly), estimate or none"
+    ),
+    filters: dict = Depends(get_scoped_call_filters),
+    fields: tuple = Depends(get_call_fields),
     db: Database = Depends(get_database),
 ):
-    """Get all calls with pagination."""
+    """Get calls matching the filters with page or cursor pagination."""
     try:
+        # the triggers on calls bump the change counter of every client a write
+        # touched, whoever wrote it, so an unchanged counter means the page is current
+        async with db.pool.acquire() as conn:
+            version, last_modified = await fetch_calls_version(conn, filters.get("client_id"))
+        etag = make_etag(version, last_modified, sorted(request.query_params.multi_items()))
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        
         # get total count
-        count_query = "SELECT COUNT(*) FROM calls"
-        total_calls = await db.fetch_val(count_query)
+        filter_clause, filter_values = build_filter_clause(filters)
+        total_calls = await count_calls(db, count, filter_clause, filter_values, filters.get("client_id"), version)
         
-        # get paginated calls
-        query = """
-            SELECT call_id, client_id, phone_number, response_category, 
-                timestamp, recording_url, recording_length, list_id, final_transcription
-            FROM calls 
-            ORDER BY timestamp DESC 
-            LIMIT :limit OFFSET :offset
-        """
+        # get paginated calls, seeking past the cursor when one is given
+        # instead of scanning and discarding the earlier rows
+        if pagination["cursor"]:
+            where_clause, values = build_filter_clause(
+                filters, 
+                extra_conditions=["(timestamp, call_id) < (:cursor_timestamp, :cursor_call_id)"]
+            )
+            values["cursor_timestamp"] = pagination["cursor"]["timestamp"]
+            values["cursor_call_id"] = pagination["cursor"]["call_id"]
+            query = calls_page_query(where_clause, with_offset=False, fields=fields)
+        else:
+            where_clause, values = filter_clause, dict(filter_values)
+            values["offset"] = pagination["offset"]
+            query = calls_page_query(where_clause, with_offset=True, fields=fields)
         
-        calls = await db.fetch_all(
-            query, 
-            values={"limit": pagination["limit"], "offset": pagination["offset"]}
-        )
+        values["limit"] = pagination["limit"]
+        
+        async def fetch_page():
+            rows = await db.fetch_all(query, values=values)
+            
+            # a full page may have more calls after it
+            next_cursor = None
+            if len(rows) == pagination["limit"]:
+                next_cursor = encode_cursor(rows[-1]["timestamp"], rows[-1]["call_id"])
+            
+            return [call_record(row, fields) for row in rows], next_cursor
         
-        # convert to response format
-        call_responses = [CallResponse(**dict(call)) for call in calls]
+        # first pages are what dashboards poll, later pages are rarely repeated;
+        # keyed by the change counter so a page is never served under a newer ETag
+        if pagination["cursor"] is None and pagination["offset"] == 0:
+            calls, next_cursor = await shared_cache.fetch(
+                "first_page", 
+                (version, filters_cache_key(where_clause, values), fields), 
+                fetch_page, 
+                tag=calls_tag(filters.get("client_id")), 
+                ttl=settings.api.page_cache_ttl
+            )
+        else:
+            calls, next_cursor = await fetch_page()
         
         # calculate pagination info
-        total_pages = math.ceil(total_calls / pagination["limit"]) if total_calls > 0 else 0
+        total_pages = None
+        if total_calls is not None:
+            total_pages = math.ceil(total_calls / pagination["limit"]) if total_calls > 0 else 0
         
         pagination_info = PaginationInfo(
             page=pagination["page"],
             limit=pagination["limit"],
             total=total_calls,
-            total_pages=total_pages
+            total_pages=total_pages,
+            count=count
         )
         
-        return CallListResponse(calls=call_responses, pagination=pagination_info)
-        
+        # encode records directly, CallListResponse only documents the shape
+        return FastJSONResponse({
+            "calls": calls,
+            "pagination": pagination_info.model_dump(),
+            "next_cursor": next_cursor,
+        }, headers=validator_headers(etag, last_modified))
+    
     except Exception as e:
         print(e)
         raise HTTPException(
@@ -69,6 +200,9 @@ async def get_calls(
 @router.get("/{call_id}", response_model=CallResponse)
 async def get_call(
     call_id: int,
+    request: Request,
+    fields: tuple = Depends(get_call_fields),
+    scope: Optional[int] = Depends(get_client_scope),
     db: Database = Depends(get_database)
 ):
     """Get call by ID."""
@@ -79,14 +213,8 @@ async def get_call(
         )
     
     try:
-        query = """
-            SELECT call_id, client_id, phone_number, response_category, 
-                timestamp, recording_url, recording_length, list_id, final_transcription
-            FROM calls 
-            WHERE call_id = :call_id
-        """
-        
-        call = await db.fetch_one(query, values={"call_id": call_id})
+        async with db.pool.acquire() as conn:
+            call = await call_queries.fetch_call(conn, call_id, fields, client_id=scope)
         
         if not call:
             raise HTTPException(
@@ -94,8 +222,13 @@ async def get_call(
                 detail="Call not found"
             )
         
-        return CallResponse(**dict(call))
+        # xmin changes with every update of the row
+        etag = make_etag(call["version"], fields)
+        if is_not_modified(request, etag, call["modified_at"]):
+            return not_modified_response(etag, call["modified_at"])
         
+        return FastJSONResponse(call_record(call, fields), headers=validator_headers(etag, call["modified_at"]))
+    
     except HTTPException:
         raise
     except Exception as e:
@@ -108,44 +241,37 @@ async def get_call(
 @router.post("/", response_model=SuccessResponse, status_code=status.HTTP_201_CREATED)
 async def create_call(
     call_data: CallCreate,
+    scope: Optional[int] = Depends(get_client_scope),
     db: Database = Depends(get_database)
 ):
     """Create a new call."""
+    # a scoped token only writes calls for its own client
+    apply_client_scope(call_data.client_id, scope)
+    
     try:
-        # verify client exists
-        client_check_query = "SELECT client_id FROM clients WHERE client_id = :client_id"
-        client_exists = await db.fetch_one(
-            client_check_query, 
-            values={"client_id": call_data.client_id}
-        )
-        
-        if not client_exists:
+        # verify client exists against the cached registry
+        if not await client_registry.exists(db, call_data.client_id):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Client ID does not exist"
             )
         
         # insert new call
-        insert_query = """
-            INSERT INTO calls (client_id, phone_number, response_category, 
-                            recording_url, recording_length, list_id, final_transcription)
-            VALUES (:client_id, :phone_number, :response_category, 
-                    :recording_url, :recording_length, :list_id, :final_transcription)
-            RETURNING *
-        """
-        
-        new_call = await db.fetch_one(insert_query, values=call_data.dict())
+        async with db.pool.acquire() as conn, conn.transaction():
+            new_call = await call_queries.insert_call(conn, call_data)
+            client_ids = touched_clients([new_call])
+        invalidate_calls(client_ids)
         
         return SuccessResponse(
             message="Call created successfully",
             call=CallResponse(**dict(new_call))
         )
-        
+    
     except HTTPException:
         raise
     except Exception as e:
         # handle foreign key violations
-        if "foreign key constraint" in str(e).lower():
+        if is_foreign_key_violation(e):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Invalid client_id"
@@ -160,6 +286,7 @@ async def create_call(
 @router.post("/batch", response_model=CallBatchResponse, status_code=status.HTTP_201_CREATED)
 async def create_calls_batch(
     batch_data: CallBatchCreate,
+    scope: Optional[int] = Depends(get_client_scope),
     db: Database = Depends(get_database)
 ):
     """Create multiple calls in batch."""
@@ -169,72 +296,116 @@ async def create_calls_batch(
             detail=f"Maximum {settings.api.max_batch_size} calls per batch"
         )
     
+    # a scoped token only writes calls for its own client
+    for call_data in batch_data.calls:
+        apply_client_scope(call_data.client_id, scope)
+    
     try:
+        # check all client IDs against the cached registry
+        missing_client_ids = await client_registry.missing(
+            db, 
+            (call_data.client_id for call_data in batch_data.calls)
+        )
+        
+        # Check for any missing client IDs
+        for call_data in batch_data.calls:
+            if call_data.client_id in missing_client_ids:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Client ID {call_data.client_id} does not exist"
+                )
+        
         # start transaction
-        async with db.transaction():
-            unique_client_ids = list(set(call_data.client_id for call_data in batch_data.calls))
-            
-            # Single query to check all client IDs exist using IN clause
-            placeholders = ','.join([f':client_id_{i}' for i in range(len(unique_client_ids))])
-            existing_clients_query = f"""
-                SELECT client_id FROM clients 
-                WHERE client_id IN ({placeholders})
-            """
-            
-            # Create parameter dict for each client_id
-            client_params = {f'client_id_{i}': client_id for i, client_id in enumerate(unique_client_ids)}
-            
-            existing_clients = await db.fetch_all(
-                existing_clients_query, 
-                values=client_params
+        async with db.pool.acquire() as conn, conn.transaction():
+            rows = await call_queries.insert_calls(conn, batch_data.calls)
+            client_ids = touched_clients(rows)
+        invalidate_calls(client_ids)
+        
+        # encode records directly, CallBatchResponse only documents the shape
+        return FastJSONResponse({
+            "message": f"{len(rows)} calls created successfully",
+            "calls": [call_record(row) for row in rows],
+        }, status_code=status.HTTP_201_CREATED)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        # a client deleted since the registry was loaded
+        if is_foreign_key_violation(e):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid client_id"
             )
-            
-            existing_client_ids = {row["client_id"] for row in existing_clients}
-            
-            # Check for any missing client IDs
-            for call_data in batch_data.calls:
-                if call_data.client_id not in existing_client_ids:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"Client ID {call_data.client_id} does not exist"
-                    )
-            
-            insert_query = """
-                INSERT INTO calls (client_id, phone_number, response_category, 
-                                recording_url, recording_length, list_id, final_transcription)
-                VALUES (:client_id, :phone_number, :response_category, 
-                        :recording_url, :recording_length, :list_id, :final_transcription)
-                RETURNING *
-            """
-            
-            # Prepare list of dicts for each call
-            insert_values = [
+        
+        print(e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+
+@router.put("/batch", response_model=CallBatchUpsertResponse)
+async def upsert_calls_batch(
+    batch_data: CallBatchUpsert,
+    scope: Optional[int] = Depends(get_client_scope),
+    db: Database = Depends(get_database)
+):
+    """Create or update multiple calls by external key."""
+    if len(batch_data.calls) > settings.api.max_batch_size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Maximum {settings.api.max_batch_size} calls per batch"
+        )
+    
+    # external keys belong to a client, so a scoped token only reaches its own calls
+    for call_data in batch_data.calls:
+        apply_client_scope(call_data.client_id, scope)
+    
+    try:
+        # check all client IDs against the cached registry
+        missing_client_ids = await client_registry.missing(
+            db, 
+            (call_data.client_id for call_data in batch_data.calls)
+        )
+        
+        for call_data in batch_data.calls:
+            if call_data.client_id in missing_client_ids:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Client ID {call_data.client_id} does not exist"
+                )
+        
+        # start transaction
+        async with db.pool.acquire() as conn, conn.transaction():
+            rows = await call_queries.upsert_calls(conn, batch_data.calls)
+            client_ids = touched_clients(rows)
+        invalidate_calls(client_ids)
+        
+        created = sum(1 for row in rows if row["created"])
+        return FastJSONResponse({
+            "message": f"{created} calls created, {len(rows) - created} calls updated",
+            "created": created,
+            "updated": len(rows) - created,
+            "results": [
                 {
-                    "client_id": call.client_id,
-                    "phone_number": call.phone_number,
-                    "response_category": call.response_category,
-                    "recording_url": call.recording_url,
-                    "recording_length": call.recording_length,
-                    "list_id": call.list_id,
-                    "final_transcription": call.final_transcription
+                    "external_key": call_data.external_key,
+                    "created": row["created"],
+                    "call": call_record(row),
                 }
-                for call in batch_data.calls
-            ]
-            
-            # Execute all inserts within the transaction
-            inserted_calls = []
-            for values in insert_values:
-                row = await db.fetch_one(insert_query, values=values)
-                inserted_calls.append(CallResponse(**dict(row)))
-            
-            return CallBatchResponse(
-                message=f"{len(inserted_calls)} calls created successfully",
-                calls=inserted_calls
-            )
-            
+                for call_data, row in zip(batch_data.calls, rows)
+            ],
+        })
+    
     except HTTPException:
         raise
     except Exception as e:
+        # a client deleted since the registry was loaded
+        if is_foreign_key_violation(e):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid client_id"
+            )
+        
         print(e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -242,10 +413,44 @@ async def create_calls_batch(
         )
 
 
+@router.post("/async", response_model=QueuedResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_call_async(
+    call_data: CallCreate,
+    scope: Optional[int] = Depends(get_client_scope),
+    db: Database = Depends(get_database)
+):
+    """Queue a new call for group-commit writing."""
+    # a scoped token only writes calls for its own client
+    apply_client_scope(call_data.client_id, scope)
+    
+    # verify client exists against the cached registry
+    if not await client_registry.exists(db, call_data.client_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Client ID does not exist"
+        )
+    
+    if not ingest_writer.accepting:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Call ingestion is shutting down"
+        )
+    
+    if not ingest_writer.submit([call_data]):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Call queue is full, retry later",
+            headers={"Retry-After": "1"}
+        )
+    
+    return QueuedResponse(message="Call queued successfully", queued=1)
+
+
 @router.put("/{call_id}", response_model=SuccessResponse)
 async def update_call(
     call_id: int,
     call_data: CallUpdate,
+    scope: Optional[int] = Depends(get_client_scope),
     db: Database = Depends(get_database)
 ):
     """Update call by ID."""
@@ -255,50 +460,45 @@ async def update_call(
             detail="Invalid call ID"
         )
     
+    # a scoped token can neither touch nor move calls outside its client
+    apply_client_scope(call_data.client_id, scope)
+    
     try:
-        # verify client exists
-        client_check_query = "SELECT client_id FROM clients WHERE client_id = :client_id"
-        client_exists = await db.fetch_one(
-            client_check_query, 
-            values={"client_id": call_data.client_id}
-        )
-        
-        if not client_exists:
+        # verify client exists against the cached registry
+        if not await client_registry.exists(db, call_data.client_id):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Client ID does not exist"
             )
         
-        # update call
-        update_query = """
-            UPDATE calls 
-            SET client_id = :client_id, phone_number = :phone_number, 
-                response_category = :response_category, recording_url = :recording_url, 
-                recording_length = :recording_length, list_id = :list_id, 
-                final_transcription = :final_transcription
-            WHERE call_id = :call_id
-            RETURNING *
-        """
-        
-        values = call_data.dict()
-        values["call_id"] = call_id
-        
-        updated_call = await db.fetch_one(update_query, values=values)
-        
-        if not updated_call:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Call not found"
-            )
+        # update call, returning its previous client as well
+        async with db.pool.acquire() as conn, conn.transaction():
+            updated_call = await call_queries.update_call(conn, call_id, call_data, client_id=scope)
+            
+            if not updated_call:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Call not found"
+                )
+            
+            client_ids = touched_clients([updated_call])
+        invalidate_calls(client_ids)
         
         return SuccessResponse(
             message="Call updated successfully",
             call=CallResponse(**dict(updated_call))
         )
-        
+    
     except HTTPException:
         raise
     except Exception as e:
+        # handle foreign key violations
+        if is_foreign_key_violation(e):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid client_id"
+            )
+        
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -308,6 +508,7 @@ async def update_call(
 @router.delete("/{call_id}", response_model=SuccessResponse)
 async def delete_call(
     call_id: int,
+    scope: Optional[int] = Depends(get_client_scope),
     db: Database = Depends(get_database)
 ):
     """Delete call by ID."""
@@ -318,20 +519,23 @@ async def delete_call(
         )
     
     try:
-        delete_query = "DELETE FROM calls WHERE call_id = :call_id RETURNING *"
-        deleted_call = await db.fetch_one(delete_query, values={"call_id": call_id})
-        
-        if not deleted_call:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Call not found"
-            )
+        async with db.pool.acquire() as conn, conn.transaction():
+            deleted_call = await call_queries.delete_call(conn, call_id, client_id=scope)
+            
+            if not deleted_call:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Call not found"
+                )
+            
+            client_ids = touched_clients([deleted_call])
+        invalidate_calls(client_ids)
         
         return SuccessResponse(
             message="Call deleted successfully",
             call=CallResponse(**dict(deleted_call))
         )
-        
+    
     except HTTPException:
         raise
     except Exception as e:
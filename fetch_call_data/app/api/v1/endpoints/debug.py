@@ -0,0 +1,17 @@
+"""
+API endpoints for debugging, only mounted when debug is enabled.
+"""
+
+from typing import List
+
+from fastapi import APIRouter
+
+from app.models.query_log import slow_query_log
+
+router = APIRouter()
+
+
+@router.get("/slow-queries", response_model=List[dict])
+async def get_slow_queries():
+    """Get the most recent slow statements, newest first."""
+    return slow_query_log.recent()
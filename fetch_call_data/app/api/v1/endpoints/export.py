@@ -0,0 +1,122 @@
+"""
+API endpoints for streaming call exports.
+"""
+
+import csv
+import io
+import json
+from decimal import Decimal
+from typing import AsyncIterator, Literal
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from databases import Database
+
+from app.dependencies.database import get_database
+from app.dependencies.filters import get_scoped_call_filters, build_filter_clause
+from app.core.config import settings
+
+router = APIRouter()
+
+EXPORT_COLUMNS = [
+    ("call_id", "Call ID"),
+    ("client_id", "Client ID"),
+    ("client_name", "Client Name"),
+    ("phone_number", "Phone Number"),
+    ("list_id", "List ID"),
+    ("response_category", "Response Category"),
+    ("timestamp", "Timestamp"),
+    ("recording_url", "Recording URL"),
+    ("recording_length", "Recording Length (seconds)"),
+]
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def json_default(value):
+    """Encode values the json module does not handle natively."""
+    if isinstance(value, Decimal):
+        return float(value)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def csv_row(row) -> list:
+    """Format a record as a CSV row."""
+    values = []
+    for column, _ in EXPORT_COLUMNS:
+        value = row[column]
+        if value is None:
+            value = ""
+        elif column == "timestamp":
+            value = value.strftime("%Y-%m-%d %H:%M:%S")
+        values.append(value)
+    return values
+
+
+async def stream_csv(rows: AsyncIterator) -> AsyncIterator[str]:
+    """Encode records as CSV, one chunk per export_chunk_size rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([header for _, header in EXPORT_COLUMNS])
+    
+    pending = 0
+    async for row in rows:
+        writer.writerow(csv_row(row))
+        pending += 1
+        if pending >= settings.api.export_chunk_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    
+    yield buffer.getvalue()
+
+
+async def stream_ndjson(rows: AsyncIterator) -> AsyncIterator[str]:
+    """Encode records as newline-delimited JSON, one chunk per export_chunk_size rows."""
+    lines = []
+    async for row in rows:
+        record = {column: row[column] for column, _ in EXPORT_COLUMNS}
+        lines.append(json.dumps(record, default=json_default))
+        if len(lines) >= settings.api.export_chunk_size:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+@router.get("/export")
+async def export_calls(
+    format: Literal["csv", "ndjson"] = Query("csv", description="Export file format"),
+    filters: dict = Depends(get_scoped_call_filters),
+    db: Database = Depends(get_database),
+):
+    """Stream calls matching the filters as CSV or NDJSON."""
+    where_clause, values = build_filter_clause(filters, table_alias="c")
+    
+    query = f"""
+        SELECT c.call_id, c.client_id, 
+            COALESCE(cl.client_name, 'Unknown Client') AS client_name,
+            c.phone_number, c.list_id, c.response_category, c.timestamp, 
+            c.recording_url, c.recording_length
+        FROM calls c 
+        LEFT JOIN clients cl ON c.client_id = cl.client_id 
+        {where_clause}
+        ORDER BY c.timestamp DESC, c.call_id DESC
+    """
+    
+    # iterate() reads through a server-side cursor, so only the rows of the
+    # chunk being encoded are held in memory however large the export is
+    rows = db.iterate(query, values=values)
+    encoder = stream_csv if format == "csv" else stream_ndjson
+    
+    return StreamingResponse(
+        encoder(rows),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="calls_export.{format}"'}
+    )
@@ -0,0 +1,78 @@
+"""
+API endpoints for background retention purges.
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.dependencies.auth import get_client_scope
+from app.dependencies.filters import apply_client_scope
+from app.schemas.calls import PurgeJobResponse, PurgeRequest
+from app.services.purge import purge_runner
+
+router = APIRouter()
+
+
+def job_in_scope(job: dict, scope: Optional[int]) -> bool:
+    """Whether a caller may see a purge job: any job if unscoped, else only its own client's."""
+    return scope is None or job["filters"].get("client_id") == scope
+
+
+@router.post("/purge", response_model=PurgeJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def start_purge(purge_data: PurgeRequest, scope: Optional[int] = Depends(get_client_scope)):
+    """Start deleting calls matching a filter in the background."""
+    # a scoped token purges its own client's calls, never every client's
+    filters = {**purge_data.model_dump(), "client_id": apply_client_scope(purge_data.client_id, scope)}
+    
+    try:
+        return await purge_runner.submit(filters)
+    except Exception as e:
+        print(e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+
+@router.get("/purge/{job_id}", response_model=PurgeJobResponse)
+async def get_purge(job_id: int, scope: Optional[int] = Depends(get_client_scope)):
+    """Get a purge job's progress."""
+    try:
+        job = await purge_runner.get(job_id)
+    except Exception as e:
+        print(e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+    
+    if not job or not job_in_scope(job, scope):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Purge job not found"
+        )
+    return job
+
+
+@router.delete("/purge/{job_id}", response_model=PurgeJobResponse)
+async def cancel_purge(job_id: int, scope: Optional[int] = Depends(get_client_scope)):
+    """Cancel a running purge job after its current chunk."""
+    try:
+        # a job's filters never change, so checking before cancelling is enough
+        job = await purge_runner.get(job_id)
+        if job and job_in_scope(job, scope):
+            job = await purge_runner.cancel(job_id)
+    except Exception as e:
+        print(e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+    
+    if not job or not job_in_scope(job, scope):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Purge job not found"
+        )
+    return job
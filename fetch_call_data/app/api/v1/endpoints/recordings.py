@@ -0,0 +1,154 @@
+"""
+API endpoints for streaming call recordings.
+"""
+
+import hashlib
+import os
+from typing import BinaryIO, Iterator, Optional, Tuple
+from urllib.parse import urlsplit
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+
+from app.dependencies.database import get_database
+from app.dependencies.auth import get_client_scope
+from app.models import calls as call_queries
+from app.models.database import Database
+from app.services.recordings import RecordingUnavailable, content_type, recording_cache
+from app.core.conditional import is_not_modified
+
+router = APIRouter()
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Get the first and last byte of a single bytes range, None to send the whole recording."""
+    unit, _, spec = header.partition("=")
+    # several ranges would need a multipart body, the whole recording is valid too
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    
+    start, _, end = spec.strip().partition("-")
+    try:
+        if start:
+            first = int(start)
+            last = int(end) if end else size - 1
+            if first < 0 or (end and last < first):
+                return None
+        else:
+            # suffix range, the last N bytes; an empty one cannot be satisfied
+            suffix = int(end)
+            first = max(size - suffix, 0) if suffix > 0 else size
+            last = size - 1
+    except ValueError:
+        return None
+    
+    if first >= size:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return first, min(last, size - 1)
+
+
+def read_bytes(recording: BinaryIO, first: int, length: int) -> Iterator[bytes]:
+    """Read part of an open recording in chunks, closing it at the end."""
+    try:
+        recording.seek(first)
+        while length > 0:
+            chunk = recording.read(min(STREAM_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        recording.close()
+
+
+@router.get("/{call_id}/recording")
+async def get_call_recording(
+    call_id: int,
+    request: Request,
+    scope: Optional[int] = Depends(get_client_scope),
+    db: Database = Depends(get_database)
+):
+    """Stream a call's recording through the local recording cache, with Range support."""
+    if call_id <= 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid call ID"
+        )
+    
+    async with db.pool.acquire() as conn:
+        call = await call_queries.fetch_call_recording(conn, call_id, client_id=scope)
+    
+    if not call:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Call not found"
+        )
+    if not call["recording_url"]:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Call has no recording"
+        )
+    if not call["fetch_recording_url"]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Client recording URL not configured"
+        )
+    
+    # only fetch from the client's own recording host
+    url = urlsplit(call["recording_url"])
+    if url.scheme not in ("http", "https") or url.hostname != urlsplit(call["fetch_recording_url"]).hostname:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid recording URL domain for this client"
+        )
+    
+    try:
+        recording = await recording_cache.open(call["recording_url"])
+    except RecordingUnavailable as e:
+        print(f"Could not fetch recording of call {call_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="Failed to fetch recording"
+        )
+    
+    size = os.fstat(recording.fileno()).st_size
+    # recordings never change at their URL, so the URL and size identify the bytes
+    etag = '"' + hashlib.sha256(call["recording_url"].encode()).hexdigest()[:32] + f'-{size}"'
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Cache-Control": "private, max-age=3600",
+    }
+    
+    if is_not_modified(request, etag, None):
+        recording.close()
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    byte_range = None
+    range_header = request.headers.get("range")
+    # a range only applies to the version of the recording it was read from
+    if range_header and request.headers.get("if-range", etag) == etag:
+        try:
+            byte_range = parse_range(range_header, size)
+        except HTTPException:
+            recording.close()
+            raise
+    
+    if byte_range is None:
+        first, last, status_code = 0, size - 1, status.HTTP_200_OK
+    else:
+        (first, last), status_code = byte_range, status.HTTP_206_PARTIAL_CONTENT
+        headers["Content-Range"] = f"bytes {first}-{last}/{size}"
+    
+    headers["Content-Length"] = str(last - first + 1)
+    return StreamingResponse(
+        read_bytes(recording, first, last - first + 1),
+        status_code=status_code,
+        media_type=content_type(call["recording_url"]),
+        headers=headers
+    )
@@ -0,0 +1,88 @@
+"""
+API endpoints for full-text search over call transcriptions.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from databases import Database
+
+from app.schemas.calls import CallSearchResponse
+from app.dependencies.database import get_database
+from app.dependencies.filters import get_scoped_call_filters, build_filter_clause
+from app.models.migrations import TRANSCRIPTION_VECTOR
+from app.core.serialization import FastJSONResponse, call_record
+from app.core.config import settings
+
+router = APIRouter()
+
+# must match the configuration of TRANSCRIPTION_VECTOR
+SEARCH_CONFIG = "english"
+
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=30, MinWords=10, MaxFragments=2"
+
+
+def search_query(where_clause: str) -> str:
+    """Build the query for one page of ranked search results."""
+    # snippets are only built for the page, ts_headline re-parses the text
+    return f"""
+        WITH matches AS (
+            SELECT call_id, client_id, phone_number, response_category, 
+                timestamp, recording_url, recording_length, list_id, final_transcription,
+                ts_rank_cd({TRANSCRIPTION_VECTOR}, websearch_to_tsquery('{SEARCH_CONFIG}', :q)) AS rank
+            FROM calls
+            {where_clause}
+            ORDER BY rank DESC, timestamp DESC, call_id DESC
+            LIMIT :limit OFFSET :offset
+        )
+        SELECT *, ts_headline(
+            '{SEARCH_CONFIG}',
+            replace(replace(replace(final_transcription, '&', '&amp;'), '<', '&lt;'), '>', '&gt;'),
+            websearch_to_tsquery('{SEARCH_CONFIG}', :q),
+            '{HEADLINE_OPTIONS}'
+        ) AS snippet
+        FROM matches
+        ORDER BY rank DESC, timestamp DESC, call_id DESC
+    """
+
+
+@router.get("/search", response_model=CallSearchResponse)
+async def search_calls(
+    q: str = Query(
+        ..., 
+        min_length=2, 
+        max_length=200, 
+        description='Words to find in transcriptions; "quoted phrases", or and -word are supported'
+    ),
+    page: int = Query(1, ge=1, description="Page number"),
+    limit: int = Query(20, ge=1, le=settings.api.search_max_page_size, description="Results per page"),
+    filters: dict = Depends(get_scoped_call_filters),
+    db: Database = Depends(get_database),
+):
+    """Search call transcriptions, most relevant first."""
+    try:
+        # served by the GIN index on the same expression
+        where_clause, values = build_filter_clause(
+            filters, 
+            extra_conditions=[f"{TRANSCRIPTION_VECTOR} @@ websearch_to_tsquery('{SEARCH_CONFIG}', :q)"]
+        )
+        values["q"] = q
+        values["offset"] = (page - 1) * limit
+        values["limit"] = limit + 1  # one extra row tells whether another page exists
+        
+        rows = await db.fetch_all(search_query(where_clause), values=values)
+        
+        return FastJSONResponse({
+            "results": [
+                {**call_record(row), "rank": row["rank"], "snippet": row["snippet"]}
+                for row in rows[:limit]
+            ],
+            "page": page,
+            "limit": limit,
+            "has_more": len(rows) > limit,
+        })
+    
+    except Exception as e:
+        print(e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
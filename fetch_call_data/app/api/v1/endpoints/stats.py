@@ -0,0 +1,103 @@
+"""
+API endpoints for aggregated call statistics.
+"""
+
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from databases import Database
+
+from app.schemas.calls import CallStatsResponse, CategoryCount
+from app.dependencies.database import get_database
+from app.dependencies.auth import get_client_scope
+from app.dependencies.filters import apply_client_scope
+from app.models.rollup import UNCATEGORIZED
+from app.core.cache import calls_tag, shared_cache
+from app.core.config import settings
+
+router = APIRouter()
+
+FORWARDED_CATEGORY = "interested"
+
+
+@router.get("/stats", response_model=CallStatsResponse)
+async def get_call_stats(
+    client_id: Optional[int] = Query(None, gt=0, description="Only calls for this client"),
+    start_date: Optional[date] = Query(None, description="First day to include"),
+    end_date: Optional[date] = Query(None, description="Last day to include"),
+    scope: Optional[int] = Depends(get_client_scope),
+    db: Database = Depends(get_database),
+):
+    """Get call counts per response category from the daily rollup."""
+    client_id = apply_client_scope(client_id, scope)
+    
+    try:
+        conditions = []
+        values = {}
+        
+        if client_id is not None:
+            conditions.append("client_id = :client_id")
+            values["client_id"] = client_id
+        
+        if start_date is not None:
+            conditions.append("day >= :start_date")
+            values["start_date"] = start_date
+        
+        if end_date is not None:
+            conditions.append("day <= :end_date")
+            values["end_date"] = end_date
+        
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        
+        # reads a few rows per client and day instead of scanning calls
+        query = f"""
+            SELECT response_category, SUM(call_count)::bigint AS call_count
+            FROM call_daily_stats
+            {where_clause}
+            GROUP BY response_category
+            HAVING SUM(call_count) > 0
+            ORDER BY call_count DESC
+        """
+        
+        async def fetch_counts():
+            rows = await db.fetch_all(query, values=values)
+            return [(row["response_category"], row["call_count"]) for row in rows]
+        
+        # shared by every worker until a write invalidates it or it expires
+        counts = await shared_cache.fetch(
+            "stats", 
+            (client_id, start_date, end_date), 
+            fetch_counts, 
+            tag=calls_tag(client_id), 
+            ttl=settings.api.stats_cache_ttl
+        )
+        
+        total_calls = 0
+        calls_forwarded = 0
+        calls_dropped = 0
+        categories = []
+        
+        for category, count in counts:
+            total_calls += count
+            if category == UNCATEGORIZED:
+                category = None
+            elif category.lower() == FORWARDED_CATEGORY:
+                calls_forwarded += count
+            else:
+                calls_dropped += count
+            
+            categories.append(CategoryCount(name=category, count=count))
+        
+        return CallStatsResponse(
+            total_calls=total_calls,
+            calls_forwarded=calls_forwarded,
+            calls_dropped=calls_dropped,
+            categories=categories
+        )
+        
+    except Exception as e:
+        print(e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
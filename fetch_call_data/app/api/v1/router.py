@@ -3,10 +3,20 @@ API v1 router configuration.
 """
 
 from fastapi import APIRouter
-from app.api.v1.endpoints import calls
+from app.api.v1.endpoints import calls, debug, export, purge, recordings, search, stats
+from app.core.config import settings
 
 # Create API v1 router
 api_router = APIRouter()
 
-# Include endpoint routers
+# Include endpoint routers, fixed /calls paths before /calls/{call_id}
+api_router.include_router(export.router, prefix="/calls", tags=["calls"])
+api_router.include_router(stats.router, prefix="/calls", tags=["calls"])
+api_router.include_router(purge.router, prefix="/calls", tags=["calls"])
+api_router.include_router(search.router, prefix="/calls", tags=["calls"])
+api_router.include_router(recordings.router, prefix="/calls", tags=["calls"])
 api_router.include_router(calls.router, prefix="/calls", tags=["calls"])
+
+# Debug endpoints expose query text, so only mount them in debug mode
+if settings.debug:
+    api_router.include_router(debug.router, prefix="/debug", tags=["debug"])
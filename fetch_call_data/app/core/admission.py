@@ -0,0 +1,114 @@
+"""
+Admission control for requests that use the database.
+
+Each worker admits a bounded number of requests per route class and in
+total, so a slow database backs requests up here, where they can be shed
+quickly, instead of on the pool until gunicorn kills the worker. Requests
+over a limit wait in a per-class FIFO queue for up to queue_timeout, then
+are rejected; a full queue rejects new requests at once.
+
+Classes are listed in priority order. Whenever a slot frees, waiting
+requests of earlier classes are admitted first, and the lower read limit
+keeps part of the pool free for ingest even before anything queues.
+Exports and recordings hold their slot until the last byte is sent, so
+they get a small stream class of their own rather than tying up read
+slots for the length of a download.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Dict
+
+from app.core.config import settings
+from app.core.metrics import ADMISSION_IN_FLIGHT, ADMISSION_QUEUED, ADMISSION_REJECTED, ADMISSION_WAIT
+
+INGEST = "ingest"
+READ = "read"
+STREAM = "stream"
+
+
+class AdmissionController:
+    """Per-class and total concurrency limits with prioritised, deadline-bounded queues."""
+    
+    def __init__(self, limits: Dict[str, int], total_limit: int, queue_size: int, queue_timeout: float):
+        # dict order is priority order
+        self.limits = limits
+        self.total_limit = total_limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.in_flight: Dict[str, int] = {route_class: 0 for route_class in limits}
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {route_class: deque() for route_class in limits}
+    
+    def _has_room(self, route_class: str) -> bool:
+        return (
+            self.in_flight[route_class] < self.limits[route_class]
+            and sum(self.in_flight.values()) < self.total_limit
+        )
+    
+    def _take(self, route_class: str):
+        self.in_flight[route_class] += 1
+        ADMISSION_IN_FLIGHT.labels(route_class).inc()
+    
+    def _grant(self):
+        """Admit waiting requests that now fit, higher priority classes first."""
+        for route_class, waiters in self._waiters.items():
+            while waiters and self._has_room(route_class):
+                waiter = waiters.popleft()
+                ADMISSION_QUEUED.labels(route_class).dec()
+                self._take(route_class)
+                waiter.set_result(True)
+    
+    async def acquire(self, route_class: str) -> bool:
+        """Wait for a slot, returning False if the request should be shed."""
+        waiters = self._waiters[route_class]
+        if not waiters and self._has_room(route_class):
+            self._take(route_class)
+            ADMISSION_WAIT.labels(route_class).observe(0)
+            return True
+        
+        if len(waiters) >= self.queue_size:
+            ADMISSION_REJECTED.labels(route_class, "queue_full").inc()
+            return False
+        
+        waiter = asyncio.get_running_loop().create_future()
+        waiters.append(waiter)
+        ADMISSION_QUEUED.labels(route_class).inc()
+        start = time.perf_counter()
+        try:
+            # asyncio.wait leaves the future alone on timeout, unlike wait_for
+            await asyncio.wait([waiter], timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            # the client went away, possibly just after being admitted
+            if waiter.done() and not waiter.cancelled():
+                self.release(route_class)
+            raise
+        finally:
+            if not waiter.done():
+                waiters.remove(waiter)
+                ADMISSION_QUEUED.labels(route_class).dec()
+                waiter.cancel()
+            ADMISSION_WAIT.labels(route_class).observe(time.perf_counter() - start)
+        
+        if waiter.cancelled():
+            ADMISSION_REJECTED.labels(route_class, "timeout").inc()
+            return False
+        return True
+    
+    def release(self, route_class: str):
+        """Free a slot taken by acquire()."""
+        self.in_flight[route_class] -= 1
+        ADMISSION_IN_FLIGHT.labels(route_class).dec()
+        self._grant()
+
+
+admission = AdmissionController(
+    limits={
+        INGEST: settings.api.admission_ingest_limit,
+        READ: settings.api.admission_read_limit,
+        STREAM: settings.api.admission_stream_limit,
+    },
+    total_limit=settings.api.admission_total_limit,
+    queue_size=settings.api.admission_queue_size,
+    queue_timeout=settings.api.admission_queue_timeout,
+)
@@ -0,0 +1,256 @@
+"""
+Caching utilities, in-process and shared by all workers on the host.
+
+SharedCache keeps its entries in a SQLite database on tmpfs (/dev/shm by
+default), so gunicorn workers reuse each other's results without an
+external service. The database lives in a directory only the service's
+user can enter, and a directory or file owned by anyone else is refused.
+Values are stored as JSON, so tuples come back as lists and datetimes as
+ISO strings, which is all results that are only encoded to JSON again need.
+
+Entries carry a tag; invalidate(tag) drops them and bumps the tag's
+generation, so a result computed from data read before the invalidation is
+not stored after it. Results filtered to one client are tagged with that
+client, so only its own writes invalidate them. Any SQLite error is treated
+as a miss, a cache problem never fails a request.
+"""
+
+import os
+import sqlite3
+import stat
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Iterable, Optional
+
+import orjson
+
+from app.core.config import settings
+from app.core.metrics import CACHE_REQUESTS
+from app.core.serialization import orjson_default
+
+# tag of every cached result derived from calls or their rollup, across clients
+CALLS_TAG = "calls"
+
+
+def calls_tag(client_id: Optional[int] = None) -> str:
+    """Get the tag of results derived from one client's calls, or from all calls."""
+    return CALLS_TAG if client_id is None else f"{CALLS_TAG}:{client_id}"
+
+
+class TTLCache:
+    """Size-bounded LRU cache whose entries expire after a time-to-live."""
+    
+    def __init__(self, ttl: float, max_size: int = 1024):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a cached value, or default if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return default
+        
+        self._entries.move_to_end(key)
+        return value
+    
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Cache a value, evicting the least recently used entry when full."""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+    
+    def delete(self, key: Hashable):
+        """Remove a cached value if present."""
+        self._entries.pop(key, None)
+    
+    def clear(self):
+        """Remove all cached values."""
+        self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SharedStore:
+    """SQLite database shared by all workers on the host, one connection per process."""
+    
+    # calls block the event loop, so give up on a busy lock quickly
+    busy_timeout = 0.1
+    
+    def __init__(self, path: str):
+        directory, name = os.path.split(os.path.abspath(path))
+        # tmpfs keeps the file in memory; fall back to the temp dir elsewhere
+        if not os.path.isdir(os.path.dirname(directory)):
+            directory = os.path.join(tempfile.gettempdir(), os.path.basename(directory))
+        self.path = os.path.join(directory, name)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+    
+    def create_tables(self, conn: sqlite3.Connection):
+        """Create the store's tables if they do not exist yet."""
+    
+    def check_ownership(self):
+        """Refuse a store another user could have planted or could read and rewrite."""
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        
+        for target, private_mode in ((directory, 0o077), (self.path, 0o022)):
+            try:
+                status = os.lstat(target)
+            except FileNotFoundError:
+                continue
+            if (
+                status.st_uid != os.getuid()
+                or status.st_mode & private_mode
+                or stat.S_ISLNK(status.st_mode)
+            ):
+                raise PermissionError(f"{target} must be owned by uid {os.getuid()} and private to it")
+    
+    def _connection(self) -> sqlite3.Connection:
+        """Get this process's connection, opening a new one after a fork."""
+        if self._conn is None or self._pid != os.getpid():
+            self.check_ownership()
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            self.create_tables(conn)
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+
+class SharedCache(SharedStore):
+    """Size-bounded LRU cache with TTLs, shared between processes through SQLite."""
+    
+    def __init__(self, path: str, ttl: float, max_size: int = 4096):
+        super().__init__(path)
+        self.ttl = ttl
+        self.max_size = max_size
+    
+    def create_tables(self, conn: sqlite3.Connection):
+        """Create the entries and generations tables."""
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                tag TEXT NOT NULL,
+                value BLOB NOT NULL,
+                expires_at REAL NOT NULL,
+                used_at REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS entries_tag ON entries (tag)")
+        conn.execute("CREATE INDEX IF NOT EXISTS entries_used_at ON entries (used_at)")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS generations (
+                tag TEXT PRIMARY KEY,
+                generation INTEGER NOT NULL
+            )
+        """)
+    
+    def generation(self, tag: str) -> int:
+        """Get how many times a tag has been invalidated."""
+        row = self._connection().execute(
+            "SELECT generation FROM generations WHERE tag = ?", (tag,)
+        ).fetchone()
+        return row[0] if row else 0
+    
+    def get(self, key: str) -> Any:
+        """Get a cached value, or None if missing or expired."""
+        now = time.time()
+        conn = self._connection()
+        row = conn.execute("SELECT value, expires_at FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None or row[1] <= now:
+            return None
+        
+        conn.execute("UPDATE entries SET used_at = ? WHERE key = ?", (now, key))
+        return orjson.loads(row[0])
+    
+    def set(self, key: str, value: Any, tag: str, generation: int, ttl: Optional[float] = None):
+        """Cache a value unless its tag was invalidated since generation was read."""
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        with conn:
+            if self.generation(tag) != generation:
+                return
+            
+            conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                (key, tag, orjson.dumps(value, default=orjson_default), now + (self.ttl if ttl is None else ttl), now)
+            )
+            
+            # drop expired entries, then the least recently used beyond max_size
+            conn.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+            conn.execute(
+                "DELETE FROM entries WHERE key IN "
+                "(SELECT key FROM entries ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_size,)
+            )
+    
+    async def fetch(
+        self, 
+        name: str, 
+        key: Hashable, 
+        compute: Callable[[], Awaitable[Any]], 
+        tag: str, 
+        ttl: Optional[float] = None
+    ) -> Any:
+        """Get a cached result, computing and caching it on a miss."""
+        cache_key = f"{name}:{key!r}"
+        generation = None
+        try:
+            generation = self.generation(tag)
+            value = self.get(cache_key)
+            if value is not None:
+                CACHE_REQUESTS.labels(name, "hit").inc()
+                return value
+        except Exception as e:
+            print(f"Shared cache read failed: {e}")
+        
+        CACHE_REQUESTS.labels(name, "miss").inc()
+        value = await compute()
+        
+        if generation is not None and value is not None:
+            try:
+                self.set(cache_key, value, tag, generation, ttl)
+            except Exception as e:
+                print(f"Shared cache write failed: {e}")
+        
+        return value
+    
+    def invalidate(self, *tags: str):
+        """Drop every entry with one of the tags and stop in-flight results for them being cached."""
+        try:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            with conn:
+                for tag in tags:
+                    conn.execute("DELETE FROM entries WHERE tag = ?", (tag,))
+                    conn.execute(
+                        "INSERT INTO generations VALUES (?, 1) "
+                        "ON CONFLICT (tag) DO UPDATE SET generation = generation + 1",
+                        (tag,)
+                    )
+        except Exception as e:
+            print(f"Shared cache invalidation failed: {e}")
+
+
+shared_cache = SharedCache(
+    path=settings.api.shared_cache_path,
+    ttl=settings.api.count_cache_ttl,
+    max_size=settings.api.shared_cache_size,
+)
+
+
+def invalidate_calls(client_ids: Iterable[int]):
+    """Invalidate cached results over all calls and over each written client's calls."""
+    shared_cache.invalidate(CALLS_TAG, *(calls_tag(client_id) for client_id in client_ids))
@@ -22,12 +22,36 @@ class DatabaseSettings(BaseSettings):
     connection_timeout: int = 10
     idle_timeout: int = 30
     max_uses: int = 7500
+    statement_cache_size: int = 256  # prepared statements kept per connection
+    partition_months_ahead: int = 3  # monthly calls partitions created in advance
+    partition_retention_months: int = 0  # full months of partitions kept, 0 keeps all
+    partition_detach_only: bool = False  # keep expired partitions as standalone tables
+    partition_check_interval: float = 3600.0  # seconds between partition maintenance runs
+    partition_lock_timeout: str = "5s"  # longest partition DDL waits for its locks
+    slow_query_threshold: float = 0.5  # seconds before a statement is logged as slow
+    slow_query_explain_rate: float = 0.1  # share of slow reads re-run with EXPLAIN ANALYZE
+    slow_query_explain_timeout: float = 10.0  # seconds a captured EXPLAIN may run
+    slow_query_log_size: int = 100  # slow statements kept for /debug/slow-queries
+    replica_hosts: str = ""  # comma-separated host or host:port of read replicas
+    replica_max_lag: float = 5.0  # seconds a replica may be behind before reads skip it
+    replica_check_interval: float = 1.0  # seconds between replica lag checks
+    primary_read_window: float = 10.0  # seconds a client's reads stay on the primary after it writes
     
     @property
     def url(self) -> str:
         """Get the database URL."""
         return f"postgresql://{self.user}:{self.password}@{self.host}:{self.port}/{self.database}"
     
+    @property
+    def replica_urls(self) -> List[str]:
+        """Get the read replica URLs, with the primary's credentials and database."""
+        urls = []
+        for host in filter(None, (host.strip() for host in self.replica_hosts.split(","))):
+            if ":" not in host:
+                host = f"{host}:{self.port}"
+            urls.append(f"postgresql://{self.user}:{self.password}@{host}/{self.database}")
+        return urls
+    
     class Config:
         env_prefix = "DB_"
 
@@ -38,6 +62,8 @@ class SecuritySettings(BaseSettings):
     secret_key: str = "this-is-a-secret-key-that-is-even-more-secure-lol-hahaha"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    token_cache_ttl: float = 300.0  # seconds a verified token is trusted without re-checking, capped by exp
+    token_cache_size: int = 4096
     
     class Config:
         env_prefix = "SECURITY_"
@@ -72,6 +98,43 @@ class APISettings(BaseSettings):
     max_batch_size: int = 1000
     default_page_size: int = 50
     max_page_size: int = 1000
+    shared_cache_path: str = "/dev/shm/xdial/cache.sqlite3"  # result cache shared by the workers, in a private directory
+    shared_cache_size: int = 4096  # entries kept before the least recently used are dropped
+    count_cache_ttl: float = 5.0  # seconds an exact COUNT(*) is reused
+    page_cache_ttl: float = 5.0  # seconds a first page of calls is reused
+    stats_cache_ttl: float = 30.0  # seconds call statistics are reused
+    search_max_page_size: int = 100  # search snippets re-parse each transcription
+    admission_total_limit: int = 20  # requests in flight per worker, matches the pool size
+    admission_ingest_limit: int = 20  # call writes in flight per worker
+    admission_read_limit: int = 12  # reads in flight per worker, the rest of the pool is kept for ingest
+    admission_stream_limit: int = 4  # exports and recordings streaming per worker, each holds its slot until done
+    admission_queue_size: int = 200  # requests waiting per class before new ones are shed
+    admission_queue_timeout: float = 5.0  # seconds a request waits for admission before a 503
+    admission_retry_after: int = 2  # seconds clients are told to wait after a 503
+    rate_limit_path: str = "/dev/shm/xdial/rate_limits.sqlite3"  # token buckets shared by the workers, in a private directory
+    rate_limit_ingest_rate: float = 0.0  # call writes per second per client, 0 disables (e.g. 20)
+    rate_limit_ingest_burst: int = 40
+    rate_limit_read_rate: float = 0.0  # reads per second per client, 0 disables (e.g. 10)
+    rate_limit_read_burst: int = 30
+    rate_limit_export_rate: float = 0.0  # exports per second per client, 0 disables (e.g. 0.1)
+    rate_limit_export_burst: int = 2
+    rate_limit_trusted_proxies: str = "127.0.0.1,::1"  # comma-separated proxy addresses whose X-Forwarded-For is believed
+    export_chunk_size: int = 1000  # rows encoded per streamed export chunk
+    recording_cache_path: str = "/tmp/xdial_recordings"  # directory of proxied recordings shared by the workers
+    recording_cache_size: int = 2 * 1024 ** 3  # bytes of recordings kept before the least recently used are dropped
+    recording_max_size: int = 100 * 1024 ** 2  # largest recording fetched, in bytes
+    recording_fetch_timeout: float = 60.0  # seconds a recording host may take to respond
+    recording_verify_ssl: bool = False  # client recording hosts often use self-signed certificates
+    client_registry_ttl: float = 300.0  # seconds between client ID reloads
+    ingest_queue_size: int = 10000  # calls queued by POST /calls/async before 429
+    ingest_batch_size: int = 500  # calls per group-commit insert
+    ingest_flush_interval: float = 0.1  # seconds a partial batch waits for more calls
+    ingest_drain_timeout: float = 10.0  # seconds shutdown waits for queued calls
+    ingest_retry_interval: float = 1.0  # seconds before retrying calls the database could not take, doubled per failure
+    ingest_max_retry_interval: float = 30.0  # longest wait between ingest retries
+    purge_chunk_size: int = 5000  # calls deleted per purge transaction
+    purge_throttle: float = 0.5  # seconds a purge job sleeps between chunks
+    purge_locked_retry: float = 1.0  # seconds a purge job waits when every remaining call is locked
     
     class Config:
         env_prefix = "API_"
@@ -0,0 +1,139 @@
+"""
+Prometheus metrics for the API and its database pool.
+
+Under gunicorn every worker is a separate process, so metrics are written
+to per-process files in PROMETHEUS_MULTIPROC_DIR and summed when /metrics
+is scraped from any worker (scripts/start.py sets the directory up and
+gunicorn.conf.py cleans up after exited workers). Without the variable,
+e.g. under the development server, the in-process registry is served.
+"""
+
+import os
+
+from fastapi import Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+    generate_latest, multiprocess
+)
+
+REQUEST_COUNT = Counter(
+    "http_requests_total",
+    "HTTP requests handled",
+    ["method", "route", "status"],
+)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending its last byte",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests being handled",
+    multiprocess_mode="livesum",
+)
+
+POOL_CONNECTIONS = Gauge(
+    "db_pool_connections",
+    "Database pool connections, open or in use",
+    ["pool", "state"],
+    multiprocess_mode="livesum",
+)
+
+POOL_WAITING = Gauge(
+    "db_pool_waiting",
+    "Tasks waiting to acquire a database pool connection",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+
+POOL_ACQUIRE_LATENCY = Histogram(
+    "db_pool_acquire_seconds",
+    "Time spent waiting for a database pool connection",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+
+STATEMENT_LATENCY = Histogram(
+    "db_statement_duration_seconds",
+    "Database statement execution time",
+    ["statement"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+
+STATEMENT_ERRORS = Counter(
+    "db_statement_errors_total",
+    "Database statements that raised an error",
+    ["statement"],
+)
+
+REPLICA_LAG = Gauge(
+    "db_replica_lag_seconds",
+    "How far each read replica's replay is behind the primary, as last measured",
+    ["pool"],
+    multiprocess_mode="livemax",
+)
+
+READ_ROUTES = Counter(
+    "db_read_routes_total",
+    "Read requests routed to a replica or the primary",
+    ["target"],
+)
+
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Shared result cache lookups",
+    ["cache", "result"],
+)
+
+RECORDING_DOWNLOADS = Counter(
+    "recording_downloads_total",
+    "Recordings fetched from client recording hosts, per result",
+    ["result"],
+)
+
+ADMISSION_IN_FLIGHT = Gauge(
+    "admission_in_flight",
+    "Requests admitted and not yet finished, per route class",
+    ["route_class"],
+    multiprocess_mode="livesum",
+)
+
+ADMISSION_QUEUED = Gauge(
+    "admission_queued",
+    "Requests waiting for admission, per route class",
+    ["route_class"],
+    multiprocess_mode="livesum",
+)
+
+ADMISSION_WAIT = Histogram(
+    "admission_wait_seconds",
+    "Time requests waited for admission, per route class",
+    ["route_class"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+ADMISSION_REJECTED = Counter(
+    "admission_rejected_total",
+    "Requests shed with 503, per route class and reason",
+    ["route_class", "reason"],
+)
+
+RATE_LIMITED = Counter(
+    "rate_limited_total",
+    "Requests refused with 429, per endpoint class",
+    ["endpoint_class"],
+)
+
+
+def metrics_response() -> Response:
+    """Render all metrics, summed across workers in multiprocess mode."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
@@ -13,6 +13,14 @@ jwt_bearer = HTTPBearer(
     auto_error=True
 )
 
+# same scheme for endpoints that also serve callers without a token
+jwt_bearer_optional = HTTPBearer(
+    bearerFormat="JWT",
+    scheme_name="JWT Bearer Token",
+    description="Enter JWT token (the 'Bearer ' prefix will be added automatically)",
+    auto_error=False
+)
+
 # Security schema for OpenAPI documentation
 SECURITY_SCHEMA = {
     "JWTBearer": {
@@ -0,0 +1,42 @@
+"""
+Fast JSON encoding for call responses.
+
+Hot list endpoints encode database records straight to JSON with orjson
+instead of building a Pydantic model per row and letting FastAPI validate
+and serialize it again. Endpoints keep their response_model, so the
+OpenAPI schema is unchanged; returning a Response simply skips the
+response_model round trip. The output matches what CallResponse produces.
+"""
+
+from decimal import Decimal
+from typing import Any, Mapping, Sequence
+
+import orjson
+from fastapi.responses import Response
+
+# same field order as CallResponse
+CALL_FIELDS = (
+    "client_id", "phone_number", "response_category", "recording_url", 
+    "recording_length", "list_id", "final_transcription", "call_id", "timestamp",
+)
+
+
+def call_record(row: Mapping, fields: Sequence[str] = CALL_FIELDS) -> dict:
+    """Map a database record to a CallResponse-shaped dict, or the given fields of one."""
+    return {field: row[field] for field in fields}
+
+
+def orjson_default(value: Any) -> Any:
+    """Encode values orjson does not handle natively."""
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(Response):
+    """JSON response rendered with orjson."""
+    
+    media_type = "application/json"
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=orjson_default)
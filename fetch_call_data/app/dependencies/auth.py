@@ -2,14 +2,20 @@
 Authentication dependencies for FastAPI with JWT Bearer tokens only.
 """
 
+import hashlib
+import time
 from typing import Optional
-from fastapi import HTTPException, status, Depends
+from fastapi import HTTPException, Request, status, Depends
 from fastapi.security import HTTPAuthorizationCredentials
 from jose import JWTError, jwt
 from datetime import datetime, timedelta, timezone
 
+from app.core.cache import TTLCache
 from app.core.config import settings
-from app.core.security import jwt_bearer
+from app.core.security import jwt_bearer, jwt_bearer_optional
+
+# verified payloads by token hash, so a token's signature is checked once per worker
+token_cache = TTLCache(ttl=settings.security.token_cache_ttl, max_size=settings.security.token_cache_size)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -27,15 +33,28 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 def verify_token(token: str) -> Optional[dict]:
     """Verify JWT token and return payload."""
+    cache_key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(cache_key)
+    if payload is not None:
+        return payload
+    
     try:
         payload = jwt.decode(token, settings.security.secret_key, algorithms=[settings.security.algorithm])
-        return payload
     except JWTError:
         return None
+    
+    # never trust a cached token past its expiry
+    ttl = settings.security.token_cache_ttl
+    if payload.get("exp") is not None:
+        ttl = min(ttl, payload["exp"] - time.time())
+    if ttl > 0:
+        token_cache.set(cache_key, payload, ttl=ttl)
+    
+    return payload
 
 
 async def get_current_user_optional(
-    credentials: Optional[HTTPAuthorizationCredentials] = Depends(jwt_bearer)
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(jwt_bearer_optional)
 ) -> Optional[dict]:
     """Get current user from Bearer token (optional - returns None if no valid token)."""
     if not credentials:
@@ -58,4 +77,26 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    return payload
\ No newline at end of file
+    return payload
+
+
+async def get_client_scope(
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(jwt_bearer_optional)
+) -> Optional[int]:
+    """Get the client a caller's token is limited to, None for unscoped callers."""
+    if "authorization" not in request.headers:
+        return None
+    
+    # a bad token must not fall back to the unscoped access of no token
+    user = verify_token(credentials.credentials) if credentials else None
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    if user.get("client_id") is None:
+        return None
+    return int(user["client_id"])
@@ -2,10 +2,12 @@
 Database dependencies for FastAPI.
 """
 
-from databases import Database
-from app.models.database import database
+from fastapi import Request
 
+from app.models.database import Database
+from app.services.replicas import replica_router
 
-async def get_database() -> Database:
-    """Get database connection dependency."""
-    return database
+
+async def get_database(request: Request) -> Database:
+    """Get the primary, or a current replica for reads, db.pool is the native asyncpg pool."""
+    return replica_router.for_request(request)
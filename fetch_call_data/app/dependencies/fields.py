@@ -0,0 +1,41 @@
+"""
+Sparse fieldset dependencies for FastAPI.
+"""
+
+from typing import Optional, Tuple
+from fastapi import HTTPException, Query, status
+
+from app.core.serialization import CALL_FIELDS
+
+# named projections; summary is what the calls table view shows
+PROJECTIONS = {
+    "full": CALL_FIELDS,
+    "summary": tuple(field for field in CALL_FIELDS if field != "final_transcription"),
+}
+
+
+async def get_call_fields(
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to return, or a projection: summary (all but "
+                    "final_transcription) or full (default). call_id is always returned"
+    )
+) -> Tuple[str, ...]:
+    """Get the call fields to read and return."""
+    if not fields:
+        return CALL_FIELDS
+    
+    if fields in PROJECTIONS:
+        return PROJECTIONS[fields]
+    
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - set(CALL_FIELDS)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+    
+    # CallResponse order, so each fieldset maps to one statement text
+    requested.add("call_id")
+    return tuple(field for field in CALL_FIELDS if field in requested)
@@ -0,0 +1,106 @@
+"""
+Call filtering dependencies for FastAPI.
+"""
+
+from datetime import date, datetime, time
+from typing import List, Optional, Tuple, Union
+from fastapi import Depends, HTTPException, Query, status
+
+from app.dependencies.auth import get_client_scope
+
+
+def as_datetime(value: Optional[Union[datetime, date]]) -> Optional[datetime]:
+    """Treat a bare date as midnight, matching how Postgres casts it."""
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.combine(value, time.min)
+
+
+async def get_call_filters(
+    client_id: Optional[int] = Query(None, gt=0, description="Only calls for this client"),
+    start_date: Optional[Union[datetime, date]] = Query(None, description="Only calls at or after this time"),
+    end_date: Optional[Union[datetime, date]] = Query(None, description="Only calls at or before this time"),
+    list_ids: List[str] = Query([], description="Only calls from these lists"),
+    response_categories: List[str] = Query([], description="Only calls in these response categories"),
+    phone: Optional[str] = Query(None, min_length=3, max_length=20, description="Only calls whose phone number contains this text"),
+) -> dict:
+    """Get call filter parameters."""
+    return {
+        "client_id": client_id,
+        "start_date": as_datetime(start_date),
+        "end_date": as_datetime(end_date),
+        "list_ids": list_ids,
+        "response_categories": response_categories,
+        "phone": phone,
+    }
+
+
+def apply_client_scope(client_id: Optional[int], scope: Optional[int]) -> Optional[int]:
+    """Get the client_id a scoped caller may filter by, its own."""
+    if scope is None:
+        return client_id
+    if client_id is not None and client_id != scope:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Token does not grant access to this client"
+        )
+    return scope
+
+
+async def get_scoped_call_filters(
+    filters: dict = Depends(get_call_filters),
+    scope: Optional[int] = Depends(get_client_scope),
+) -> dict:
+    """Get call filters limited to the caller's client, so queries use the (client_id, ...) indexes."""
+    return {**filters, "client_id": apply_client_scope(filters["client_id"], scope)}
+
+
+def escape_like(value: str) -> str:
+    """Escape LIKE wildcards so the value matches literally."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def build_filter_clause(
+    filters: dict, 
+    table_alias: str = "", 
+    extra_conditions: Optional[List[str]] = None
+) -> Tuple[str, dict]:
+    """Build a WHERE clause and its values from call filters."""
+    prefix = f"{table_alias}." if table_alias else ""
+    conditions = []
+    values = {}
+    
+    if filters.get("client_id") is not None:
+        conditions.append(f"{prefix}client_id = :client_id")
+        values["client_id"] = filters["client_id"]
+    
+    if filters.get("start_date") is not None:
+        conditions.append(f"{prefix}timestamp >= :start_date")
+        values["start_date"] = filters["start_date"]
+    
+    if filters.get("end_date") is not None:
+        conditions.append(f"{prefix}timestamp <= :end_date")
+        values["end_date"] = filters["end_date"]
+    
+    # a single value uses = so the (column, timestamp) indexes also return rows
+    # in timestamp order; = ANY(array) keeps the statement text stable otherwise
+    for column, name in (("list_id", "list_ids"), ("response_category", "response_categories")):
+        selected = filters.get(name)
+        if not selected:
+            continue
+        if len(selected) == 1:
+            conditions.append(f"{prefix}{column} = :{name}")
+            values[name] = selected[0]
+        else:
+            conditions.append(f"{prefix}{column} = ANY(CAST(:{name} AS text[]))")
+            values[name] = selected
+    
+    # substring matches are served by the phone_number trigram index
+    if filters.get("phone"):
+        conditions.append(f"{prefix}phone_number ILIKE :phone")
+        values["phone"] = f"%{escape_like(filters['phone'])}%"
+    
+    conditions.extend(extra_conditions or [])
+    
+    where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return where_clause, values
@@ -2,19 +2,47 @@
 Pagination dependencies for FastAPI.
 """
 
-from fastapi import Query
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+from fastapi import HTTPException, Query, status
 from app.core.config import settings
 
 
+def encode_cursor(timestamp: datetime, call_id: int) -> str:
+    """Encode the (timestamp, call_id) position of a row as an opaque cursor."""
+    raw = json.dumps([timestamp.isoformat(), call_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    """Decode an opaque cursor back into its (timestamp, call_id) position."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, call_id = json.loads(base64.urlsafe_b64decode(padded))
+        return {"timestamp": datetime.fromisoformat(timestamp), "call_id": int(call_id)}
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
 async def get_pagination_params(
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(
-        settings.api.default_page_size, 
-        ge=1, 
-        le=settings.api.max_page_size, 
+        settings.api.default_page_size,
+        ge=1,
+        le=settings.api.max_page_size,
         description="Items per page"
+    ),
+    cursor: Optional[str] = Query(
+        None,
+        description="Cursor from a previous response's next_cursor, used instead of page"
     )
 ) -> dict:
     """Get pagination parameters."""
     offset = (page - 1) * limit
-    return {"page": page, "limit": limit, "offset": offset}
+    after = decode_cursor(cursor) if cursor else None
+    return {"page": page, "limit": limit, "offset": offset, "cursor": after}
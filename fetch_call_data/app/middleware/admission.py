@@ -0,0 +1,61 @@
+"""
+Admission control middleware for FastAPI.
+"""
+
+from fastapi.responses import JSONResponse
+
+from app.core.admission import INGEST, READ, STREAM, admission
+from app.core.config import settings
+
+API_PREFIX = "/api/"
+EXPORT_PREFIX = "/api/v1/calls/export"
+RECORDING_SUFFIX = "/recording"
+
+READ_METHODS = ("GET", "HEAD")
+
+
+def admission_class(scope) -> str:
+    """Get the admission class of a request."""
+    if scope["method"] not in READ_METHODS:
+        return INGEST
+    if scope["path"].startswith(EXPORT_PREFIX) or scope["path"].endswith(RECORDING_SUFFIX):
+        return STREAM
+    return READ
+
+
+class AdmissionMiddleware:
+    """ASGI middleware shedding API requests with 503 when their class is saturated."""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        # metrics, docs and CORS preflights never touch the database
+        if (
+            scope["type"] != "http"
+            or not scope["path"].startswith(API_PREFIX)
+            or scope["method"] == "OPTIONS"
+        ):
+            await self.app(scope, receive, send)
+            return
+        
+        route_class = admission_class(scope)
+        if not await admission.acquire(route_class):
+            response = JSONResponse(
+                status_code=503,
+                content={"error": "Server is busy, retry later"},
+                headers={"Retry-After": str(settings.api.admission_retry_after)}
+            )
+            await response(scope, receive, send)
+            return
+        
+        # held until the response is sent, which for streams is the whole download
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            admission.release(route_class)
+
+
+def add_admission_middleware(app):
+    """Add admission control middleware to FastAPI app."""
+    app.add_middleware(AdmissionMiddleware)
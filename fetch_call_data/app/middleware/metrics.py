@@ -0,0 +1,62 @@
+"""
+Request metrics middleware for FastAPI.
+"""
+
+import time
+
+from app.core.metrics import REQUEST_COUNT, REQUEST_LATENCY, REQUESTS_IN_PROGRESS
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request counts and latency per route template."""
+    
+    def __init__(self, app):
+        self.app = app
+        self._route_paths = None
+    
+    def route_label(self, scope) -> str:
+        """Get the path template of the route that handled a request."""
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return UNMATCHED_ROUTE
+        
+        # label by template, not by path, so /calls/1 and /calls/2 share a series
+        if self._route_paths is None:
+            self._route_paths = {
+                route.endpoint: route.path
+                for route in scope["app"].routes
+                if hasattr(route, "endpoint")
+            }
+        return self._route_paths.get(endpoint, UNMATCHED_ROUTE)
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        status_code = 500
+        
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+        
+        REQUESTS_IN_PROGRESS.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            REQUESTS_IN_PROGRESS.dec()
+            
+            route = self.route_label(scope)
+            REQUEST_LATENCY.labels(scope["method"], route).observe(elapsed)
+            REQUEST_COUNT.labels(scope["method"], route, str(status_code)).inc()
+
+
+def add_metrics_middleware(app):
+    """Add request metrics middleware to FastAPI app."""
+    app.add_middleware(MetricsMiddleware)
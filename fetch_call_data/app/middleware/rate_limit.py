@@ -0,0 +1,121 @@
+"""
+Per-client rate limiting middleware for FastAPI.
+"""
+
+from typing import FrozenSet
+
+from fastapi.responses import JSONResponse
+from starlette.requests import Request
+
+from app.core.config import settings
+from app.core.rate_limit import RateLimitResult, rate_limiter
+from app.dependencies.auth import verify_token
+
+API_PREFIX = "/api/"
+EXPORT_PREFIX = "/api/v1/calls/export"
+
+READ_METHODS = ("GET", "HEAD")
+
+
+def endpoint_class(scope) -> str:
+    """Get the rate limit class of a request."""
+    if scope["path"].startswith(EXPORT_PREFIX):
+        return "export"
+    return "read" if scope["method"] in READ_METHODS else "ingest"
+
+
+def client_address(request: Request, trusted_proxies: FrozenSet[str]) -> str:
+    """Get the address a request came from, through X-Forwarded-For when a trusted proxy sent it."""
+    address = request.client.host if request.client else "unknown"
+    if address not in trusted_proxies:
+        return address
+    
+    forwarded = ",".join(request.headers.getlist("x-forwarded-for"))
+    hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+    # entries left of the last untrusted one could have been made up by the client
+    for hop in reversed(hops):
+        address = hop
+        if hop not in trusted_proxies:
+            break
+    return address
+
+
+def client_key(request: Request, route_class: str, trusted_proxies: FrozenSet[str] = frozenset()) -> str:
+    """Identify the client a request counts against: token subject, client_id (not for ingest) or address."""
+    authorization = request.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        payload = verify_token(authorization[7:].strip())
+        if payload and payload.get("sub"):
+            return f"sub:{payload['sub']}"
+    
+    # a dialer could name any client in its writes, draining that client's
+    # bucket or rotating ids to dodge its own, so only the sender counts
+    client_id = request.query_params.get("client_id", "")
+    if route_class != "ingest" and client_id.isdigit():
+        return f"client:{client_id}"
+    
+    return f"address:{client_address(request, trusted_proxies)}"
+
+
+def rate_limit_headers(result: RateLimitResult) -> dict:
+    """Get the RateLimit-* headers describing a client's bucket."""
+    headers = {
+        "RateLimit-Limit": str(result.limit),
+        "RateLimit-Remaining": str(result.remaining),
+        "RateLimit-Reset": str(result.reset),
+    }
+    if not result.allowed:
+        headers["Retry-After"] = str(result.retry_after)
+    return headers
+
+
+class RateLimitMiddleware:
+    """ASGI middleware refusing API requests with 429 once a client's bucket is empty."""
+    
+    def __init__(self, app, trusted_proxies: FrozenSet[str] = frozenset()):
+        self.app = app
+        self.trusted_proxies = trusted_proxies
+    
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not scope["path"].startswith(API_PREFIX)
+            or scope["method"] == "OPTIONS"
+        ):
+            await self.app(scope, receive, send)
+            return
+        
+        route_class = endpoint_class(scope)
+        if not rate_limiter.enabled(route_class):
+            await self.app(scope, receive, send)
+            return
+        
+        result = await rate_limiter.take_async(
+            route_class, client_key(Request(scope), route_class, self.trusted_proxies)
+        )
+        headers = rate_limit_headers(result)
+        if not result.allowed:
+            response = JSONResponse(
+                status_code=429,
+                content={"error": "Rate limit exceeded, retry later"},
+                headers=headers
+            )
+            await response(scope, receive, send)
+            return
+        
+        encoded = [(name.lower().encode(), value.encode()) for name, value in headers.items()]
+        
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), *encoded]
+            await send(message)
+        
+        await self.app(scope, receive, send_with_headers)
+
+
+def add_rate_limit_middleware(app):
+    """Add per-client rate limiting middleware to FastAPI app."""
+    trusted_proxies = frozenset(
+        filter(None, (proxy.strip() for proxy in settings.api.rate_limit_trusted_proxies.split(",")))
+    )
+    app.add_middleware(RateLimitMiddleware, trusted_proxies=trusted_proxies)
@@ -0,0 +1,40 @@
+"""
+Read-your-writes middleware for replica routing.
+"""
+
+import time
+
+from app.core.config import settings
+from app.services.replicas import PRIMARY_COOKIE, SAFE_METHODS
+
+
+class ReadYourWritesMiddleware:
+    """ASGI middleware keeping a client's reads on the primary for a while after it writes."""
+    
+    def __init__(self, app, window: float):
+        self.app = app
+        self.window = window
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+        
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                # replicas may not have replayed the write until the window ends
+                until = time.time() + self.window
+                cookie = (
+                    f"{PRIMARY_COOKIE}={until:.3f}; Max-Age={int(self.window) + 1}; "
+                    f"Path=/; HttpOnly; SameSite=Lax"
+                )
+                message["headers"] = [*message.get("headers", []), (b"set-cookie", cookie.encode())]
+            await send(message)
+        
+        await self.app(scope, receive, send_with_cookie)
+
+
+def add_read_your_writes_middleware(app):
+    """Add read-your-writes middleware to FastAPI app when reads can go to replicas."""
+    if settings.database.replica_urls:
+        app.add_middleware(ReadYourWritesMiddleware, window=settings.database.primary_read_window)
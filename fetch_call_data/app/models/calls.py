@@ -0,0 +1,116 @@
+"""
+Data access for calls through the native asyncpg pool.
+
+Each function takes a pooled connection and runs one of the fixed
+statements, which the connection prepares on first use and reuses from its
+statement cache. Callers own the transaction.
+"""
+
+from functools import lru_cache
+from typing import List, Optional, Sequence
+
+import asyncpg
+
+from app.core.serialization import CALL_FIELDS
+from app.models.statements import STATEMENTS
+from app.schemas.calls import CallBase, CallUpsert
+
+
+def call_values(call: CallBase) -> tuple:
+    """Get a call's column values in statement parameter order."""
+    return (
+        call.client_id, call.phone_number, call.response_category, 
+        call.recording_url, call.recording_length, call.list_id, call.final_transcription,
+    )
+
+
+@lru_cache(maxsize=64)
+def get_call_statement(fields: Sequence[str], scoped: bool = False) -> str:
+    """Build get_call reading only the given columns, so skipped text is never detoasted."""
+    if tuple(fields) == CALL_FIELDS and not scoped:
+        return STATEMENTS["get_call"]
+    
+    columns = ", ".join(f"c.{field}" for field in fields)
+    scope_condition = "AND c.client_id = $2" if scoped else ""
+    return f"""
+        SELECT {columns}, c.xmin::text AS version, v.updated_at AS modified_at
+        FROM calls c 
+        LEFT JOIN call_versions v ON v.client_id = c.client_id
+        WHERE c.call_id = $1 {scope_condition}
+    """
+
+
+async def fetch_call(
+    conn: asyncpg.Connection, 
+    call_id: int, 
+    fields: Sequence[str] = CALL_FIELDS,
+    client_id: Optional[int] = None
+) -> Optional[asyncpg.Record]:
+    """Get a call by ID, only if it belongs to client_id when one is given."""
+    if client_id is None:
+        return await conn.fetchrow(get_call_statement(tuple(fields)), call_id)
+    return await conn.fetchrow(get_call_statement(tuple(fields), scoped=True), call_id, client_id)
+
+
+async def fetch_call_recording(
+    conn: asyncpg.Connection, 
+    call_id: int, 
+    client_id: Optional[int] = None
+) -> Optional[asyncpg.Record]:
+    """Get a call's recording URL and its client's recording host."""
+    if client_id is None:
+        return await conn.fetchrow(STATEMENTS["get_call_recording"], call_id)
+    return await conn.fetchrow(STATEMENTS["get_client_call_recording"], call_id, client_id)
+
+
+async def insert_call(conn: asyncpg.Connection, call: CallBase) -> asyncpg.Record:
+    """Insert a call and return the created row."""
+    return await conn.fetchrow(STATEMENTS["insert_call"], *call_values(call))
+
+
+async def insert_calls(conn: asyncpg.Connection, calls: List[CallBase]) -> List[asyncpg.Record]:
+    """Insert calls in a single statement and return the created rows."""
+    columns = list(zip(*(call_values(call) for call in calls)))
+    rows = await conn.fetch(STATEMENTS["insert_calls"], *columns)
+    
+    # RETURNING order is not guaranteed, call_id follows insert order
+    return sorted(rows, key=lambda row: row["call_id"])
+
+
+async def update_call(
+    conn: asyncpg.Connection, 
+    call_id: int, 
+    call: CallBase,
+    client_id: Optional[int] = None
+) -> Optional[asyncpg.Record]:
+    """Update a call, returning the new row plus old_client_id and old_response_category; None unless it belongs to client_id when one is given."""
+    return await conn.fetchrow(STATEMENTS["update_call"], call_id, *call_values(call), client_id)
+
+
+async def delete_call(
+    conn: asyncpg.Connection, 
+    call_id: int, 
+    client_id: Optional[int] = None
+) -> Optional[asyncpg.Record]:
+    """Delete a call, only if it belongs to client_id when one is given, and return the deleted row."""
+    return await conn.fetchrow(STATEMENTS["delete_call"], call_id, client_id)
+
+
+async def upsert_calls(conn: asyncpg.Connection, calls: List[CallUpsert]) -> List[asyncpg.Record]:
+    """Create or update calls by (client_id, external_key), in request order."""
+    # claim keys in sorted order so concurrent batches lock them consistently
+    keys = sorted({(call.client_id, call.external_key) for call in calls})
+    claimed = await conn.fetch(
+        STATEMENTS["claim_call_keys"], 
+        [key[0] for key in keys], 
+        [key[1] for key in keys]
+    )
+    call_ids = {(row["client_id"], row["external_key"]): row["call_id"] for row in claimed}
+    
+    # a separate statement sees calls committed by retries we waited on above
+    ordered_ids = [call_ids[(call.client_id, call.external_key)] for call in calls]
+    columns = list(zip(*(call_values(call) for call in calls)))
+    rows = await conn.fetch(STATEMENTS["upsert_calls"], ordered_ids, *columns)
+    
+    rows_by_id = {row["call_id"]: row for row in rows}
+    return [rows_by_id[call_id] for call_id in ordered_ids]
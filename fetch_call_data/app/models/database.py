@@ -2,18 +2,153 @@
 Database connection management for existing database.
 """
 
-from databases import Database
-from app.core.config import settings
+import re
+import time
+from functools import lru_cache
 
-# Create database instance with connection pooling
-database = Database(
-    settings.database.url,
-    min_size=settings.database.min_connections,
-    max_size=settings.database.max_connections,
-    max_queries=settings.database.max_uses,
-    max_inactive_connection_lifetime=settings.database.idle_timeout,
-    command_timeout=settings.database.connection_timeout
+import asyncpg
+import databases
+from app.core.config import settings
+from app.core.metrics import (
+    POOL_ACQUIRE_LATENCY, POOL_CONNECTIONS, POOL_WAITING, STATEMENT_ERRORS, STATEMENT_LATENCY
 )
+from app.models.query_log import slow_query_log
+from app.models.statements import STATEMENTS
+
+STATEMENT_NAMES = {query: name for name, query in STATEMENTS.items()}
+
+
+@lru_cache(maxsize=1024)
+def statement_label(query: str) -> str:
+    """Get a low-cardinality metrics label for a query."""
+    if query in STATEMENT_NAMES:
+        return STATEMENT_NAMES[query]
+    
+    # ad hoc queries are labelled by their verb and first table, e.g. "select calls"
+    query = re.sub(r"^\s*/\*.*?\*/", "", query, flags=re.DOTALL)
+    verb = query.split(None, 1)[0].lower() if query.strip() else "empty"
+    table = re.search(r"\b(?:from|into|update)\s+([a-z_][a-z0-9_]*)", query, re.IGNORECASE)
+    return f"{verb} {table.group(1).lower()}" if table else verb
+
+
+def observe_query(record):
+    """Record a finished query's duration, called by asyncpg's query logger."""
+    label = statement_label(record.query)
+    STATEMENT_LATENCY.labels(label).observe(record.elapsed)
+    if record.exception is not None:
+        STATEMENT_ERRORS.labels(label).inc()
+    slow_query_log.record(label, record)
+
+
+async def init_connection(conn: asyncpg.Connection):
+    """Set up each new pooled connection."""
+    conn.add_query_logger(observe_query)
+
+
+class InstrumentedPool:
+    """asyncpg pool wrapper reporting pool size, use and acquire waits."""
+    
+    def __init__(self, pool: asyncpg.Pool, name: str):
+        self._pool = pool
+        self.name = name
+    
+    def __getattr__(self, name):
+        return getattr(self._pool, name)
+    
+    def report(self):
+        """Update the pool gauges."""
+        size = self._pool.get_size()
+        POOL_CONNECTIONS.labels(self.name, "open").set(size)
+        POOL_CONNECTIONS.labels(self.name, "in_use").set(size - self._pool.get_idle_size())
+    
+    def acquire(self, *, timeout=None) -> "InstrumentedAcquire":
+        """Acquire a connection, usable with await or async with like asyncpg's."""
+        return InstrumentedAcquire(self, timeout)
+    
+    async def release(self, connection, *, timeout=None):
+        """Release a connection back to the pool."""
+        try:
+            await self._pool.release(connection, timeout=timeout)
+        finally:
+            self.report()
+
+
+class InstrumentedAcquire:
+    """Awaitable and async context manager returned by InstrumentedPool.acquire()."""
+    
+    def __init__(self, pool: InstrumentedPool, timeout):
+        self._pool = pool
+        self._timeout = timeout
+        self._connection = None
+    
+    async def _acquire(self):
+        POOL_WAITING.labels(self._pool.name).inc()
+        start = time.perf_counter()
+        try:
+            return await self._pool._pool.acquire(timeout=self._timeout)
+        finally:
+            POOL_WAITING.labels(self._pool.name).dec()
+            POOL_ACQUIRE_LATENCY.labels(self._pool.name).observe(time.perf_counter() - start)
+            self._pool.report()
+    
+    def __await__(self):
+        return self._acquire().__await__()
+    
+    async def __aenter__(self):
+        self._connection = await self._acquire()
+        return self._connection
+    
+    async def __aexit__(self, *exc):
+        connection, self._connection = self._connection, None
+        await self._pool.release(connection)
+
+
+class Database(databases.Database):
+    """databases.Database that also exposes its asyncpg pool."""
+    
+    def __init__(self, url: str, *, name: str = "primary", **options):
+        super().__init__(url, **options)
+        self.name = name
+    
+    async def connect(self) -> None:
+        """Connect, wrapping the pool so every acquire is measured."""
+        await super().connect()
+        if not isinstance(self._backend._pool, InstrumentedPool):
+            self._backend._pool = InstrumentedPool(self._backend._pool, self.name)
+            # plans are captured on the primary, whichever pool ran the query
+            if self.name == "primary":
+                slow_query_log.attach(self._backend._pool)
+    
+    @property
+    def pool(self) -> InstrumentedPool:
+        """The underlying asyncpg pool, for the native data access layer."""
+        # the postgres backend creates the pool on connect and owns it
+        return self._backend._pool
+
+
+def create_database(url: str, name: str) -> Database:
+    """Create a pooled database with the configured pool settings."""
+    return Database(
+        url,
+        name=name,
+        min_size=settings.database.min_connections,
+        max_size=settings.database.max_connections,
+        max_queries=settings.database.max_uses,
+        max_inactive_connection_lifetime=settings.database.idle_timeout,
+        command_timeout=settings.database.connection_timeout,
+        statement_cache_size=settings.database.statement_cache_size,
+        init=init_connection
+    )
+
+
+# Create database instance with connection pooling, it takes every write
+database = create_database(settings.database.url, "primary")
+
+# read replicas, connected and health-checked by the replica router
+replicas = [
+    create_database(url, f"replica{number}")
+    for number, url in enumerate(settings.database.replica_urls, 1)
+]
 
 
 async def connect_db():
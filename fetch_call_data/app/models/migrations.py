@@ -0,0 +1,410 @@
+"""
+Schema migrations for the existing database.
+
+Migrations are applied in version order and recorded in the
+schema_migrations table. Index builds use CONCURRENTLY so they can run
+against a live database; those migrations are marked non-transactional
+because Postgres refuses CONCURRENTLY inside a transaction block. A
+statement may also be a function of the database, for steps that depend
+on its current shape, such as whether calls is partitioned.
+
+Usage: python -m app.models.migrations
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Awaitable, Callable, List, Union
+
+import asyncpg
+from databases import Database
+
+# transcription search matches against this expression, which the GIN index covers
+TRANSCRIPTION_VECTOR = "to_tsvector('english', COALESCE(final_transcription, ''))"
+
+# statement-level triggers running apply_call_rollup() with each statement's changed rows
+ROLLUP_TRIGGERS = {
+    "calls_rollup_insert": "AFTER INSERT ON calls REFERENCING NEW TABLE AS new_calls",
+    "calls_rollup_update": "AFTER UPDATE ON calls REFERENCING OLD TABLE AS old_calls NEW TABLE AS new_calls",
+    "calls_rollup_delete": "AFTER DELETE ON calls REFERENCING OLD TABLE AS old_calls",
+}
+
+
+@dataclass(frozen=True)
+class Migration:
+    """A single schema migration."""
+    
+    version: int
+    name: str
+    statements: List[Union[str, Callable[[Database], Awaitable[None]]]]
+    transactional: bool = True
+
+
+async def create_calls_index(db: Database, name: str, definition: str):
+    """Build an index on calls without blocking writes, one partition at a time if partitioned."""
+    partitioned = await db.fetch_val(
+        "SELECT relkind = 'p' FROM pg_class WHERE oid = 'calls'::regclass"
+    )
+    if not partitioned:
+        await db.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON calls {definition}")
+        return
+    
+    # Postgres refuses CONCURRENTLY on a partitioned table, so the parent gets
+    # an invalid index of its own that becomes valid once every partition's
+    # concurrently built index is attached; new partitions then get one too
+    await db.execute(f"CREATE INDEX IF NOT EXISTS {name} ON ONLY calls {definition}")
+    partitions = await db.fetch_all("""
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'calls'::regclass
+        ORDER BY c.relname
+    """)
+    for partition in partitions:
+        partition_index = f"idx_{partition['relname']}_{name.removeprefix('idx_calls_')}"
+        await db.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition_index} ON {partition['relname']} {definition}"
+        )
+        await db.execute(f"ALTER INDEX {name} ATTACH PARTITION {partition_index}")
+
+
+async def create_rollup_triggers(db: Union[Database, asyncpg.Connection]):
+    """Create the triggers keeping the rollup in step with calls, replacing existing ones."""
+    for name, event in ROLLUP_TRIGGERS.items():
+        await db.execute(f"DROP TRIGGER IF EXISTS {name} ON calls")
+        await db.execute(f"CREATE TRIGGER {name} {event} FOR EACH STATEMENT EXECUTE FUNCTION apply_call_rollup()")
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(
+        version=1,
+        name="calls_keyset_index",
+        statements=[
+            # serves ORDER BY timestamp DESC, call_id DESC and keyset seeks
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_calls_timestamp_call_id
+            ON calls (timestamp DESC, call_id DESC)
+            """,
+        ],
+        transactional=False,
+    ),
+    Migration(
+        version=2,
+        name="call_daily_stats_rollup",
+        statements=[
+            """
+            CREATE TABLE IF NOT EXISTS call_daily_stats (
+                client_id integer NOT NULL,
+                day date NOT NULL,
+                response_category text NOT NULL DEFAULT '',
+                call_count bigint NOT NULL DEFAULT 0,
+                PRIMARY KEY (client_id, day, response_category)
+            )
+            """,
+            # maintained in the database so every writer of calls keeps it
+            # exact, the dashboard's own inserts included; each statement
+            # adds its net change per row, sorted so concurrent writers lock
+            # rollup rows in the same order
+            """
+            CREATE OR REPLACE FUNCTION apply_call_rollup() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'INSERT' THEN
+                    INSERT INTO call_daily_stats (client_id, day, response_category, call_count)
+                    SELECT client_id, timestamp::date, COALESCE(response_category, ''), COUNT(*)
+                    FROM new_calls
+                    GROUP BY 1, 2, 3
+                    ORDER BY 1, 2, 3
+                    ON CONFLICT (client_id, day, response_category)
+                    DO UPDATE SET call_count = call_daily_stats.call_count + EXCLUDED.call_count;
+                ELSIF TG_OP = 'DELETE' THEN
+                    INSERT INTO call_daily_stats (client_id, day, response_category, call_count)
+                    SELECT client_id, timestamp::date, COALESCE(response_category, ''), -COUNT(*)
+                    FROM old_calls
+                    GROUP BY 1, 2, 3
+                    ORDER BY 1, 2, 3
+                    ON CONFLICT (client_id, day, response_category)
+                    DO UPDATE SET call_count = call_daily_stats.call_count + EXCLUDED.call_count;
+                ELSE
+                    INSERT INTO call_daily_stats (client_id, day, response_category, call_count)
+                    SELECT client_id, timestamp::date, COALESCE(response_category, ''), SUM(delta)
+                    FROM (
+                        SELECT client_id, timestamp, response_category, 1 AS delta FROM new_calls
+                        UNION ALL
+                        SELECT client_id, timestamp, response_category, -1 AS delta FROM old_calls
+                    ) changes
+                    GROUP BY 1, 2, 3
+                    HAVING SUM(delta) <> 0
+                    ORDER BY 1, 2, 3
+                    ON CONFLICT (client_id, day, response_category)
+                    DO UPDATE SET call_count = call_daily_stats.call_count + EXCLUDED.call_count;
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+            """,
+            create_rollup_triggers,
+            # the triggers lock out writes until this commits, so the
+            # backfill sees every call written before them
+            """
+            INSERT INTO call_daily_stats (client_id, day, response_category, call_count)
+            SELECT client_id, timestamp::date, COALESCE(response_category, ''), COUNT(*)
+            FROM calls
+            GROUP BY 1, 2, 3
+            ON CONFLICT (client_id, day, response_category)
+            DO UPDATE SET call_count = EXCLUDED.call_count
+            """,
+        ],
+    ),
+    Migration(
+        version=3,
+        name="calls_filter_indexes",
+        statements=[
+            # trailing (timestamp DESC, call_id DESC) serves the list ordering
+            # and keyset seeks within each filter
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_calls_client_timestamp
+            ON calls (client_id, timestamp DESC, call_id DESC)
+            """,
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_calls_client_category_timestamp
+            ON calls (client_id, response_category, timestamp DESC, call_id DESC)
+            """,
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_calls_list_timestamp
+            ON calls (list_id, timestamp DESC, call_id DESC)
+            """,
+        ],
+        transactional=False,
+    ),
+    Migration(
+        version=4,
+        name="calls_phone_trigram_index",
+        statements=[
+            "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+            # serves phone_number ILIKE '%...%' substring filters
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_calls_phone_trgm
+            ON calls USING gin (phone_number gin_trgm_ops)
+            """,
+        ],
+        transactional=False,
+    ),
+    Migration(
+        version=5,
+        name="clients_changed_notify",
+        statements=[
+            # lets the API's client registry drop its cached IDs
+            """
+            CREATE OR REPLACE FUNCTION notify_clients_changed() RETURNS trigger AS $$
+            BEGIN
+                PERFORM pg_notify('clients_changed', '');
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+            """,
+            "DROP TRIGGER IF EXISTS clients_changed ON clients",
+            """
+            CREATE TRIGGER clients_changed
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON clients
+            FOR EACH STATEMENT EXECUTE FUNCTION notify_clients_changed()
+            """,
+        ],
+    ),
+    Migration(
+        version=6,
+        name="call_keys",
+        statements=[
+            # caller-supplied idempotency keys for PUT /calls/batch, kept out
+            # of calls so uniqueness does not depend on how calls is stored
+            """
+            CREATE TABLE IF NOT EXISTS call_keys (
+                client_id integer NOT NULL,
+                external_key text NOT NULL,
+                call_id integer NOT NULL,
+                created_at timestamp NOT NULL DEFAULT now(),
+                PRIMARY KEY (client_id, external_key)
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_call_keys_call_id ON call_keys (call_id)",
+        ],
+    ),
+    Migration(
+        version=7,
+        name="purge_jobs",
+        statements=[
+            """
+            CREATE TABLE IF NOT EXISTS purge_jobs (
+                job_id serial PRIMARY KEY,
+                filters jsonb NOT NULL,
+                status text NOT NULL DEFAULT 'running',
+                deleted bigint NOT NULL DEFAULT 0,
+                chunks integer NOT NULL DEFAULT 0,
+                error text,
+                created_at timestamp NOT NULL DEFAULT now(),
+                updated_at timestamp NOT NULL DEFAULT now(),
+                finished_at timestamp
+            )
+            """,
+        ],
+    ),
+    Migration(
+        version=8,
+        name="call_versions",
+        statements=[
+            # per-client change counters behind the calls list ETags
+            """
+            CREATE TABLE IF NOT EXISTS call_versions (
+                client_id integer PRIMARY KEY,
+                version bigint NOT NULL DEFAULT 1,
+                updated_at timestamptz NOT NULL DEFAULT now()
+            )
+            """,
+            """
+            INSERT INTO call_versions (client_id)
+            SELECT client_id FROM clients
+            ON CONFLICT (client_id) DO NOTHING
+            """,
+            # the rollup triggers also bump the counter of every client a
+            # statement touched, even when its counts cancel out (e.g. an
+            # update that keeps the category), so writes from outside the
+            # API change the ETags too
+            """
+            CREATE OR REPLACE FUNCTION apply_call_rollup() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'INSERT' THEN
+                    INSERT INTO call_daily_stats (client_id, day, response_category, call_count)
+                    SELECT client_id, timestamp::date, COALESCE(response_category, ''), COUNT(*)
+                    FROM new_calls
+                    GROUP BY 1, 2, 3
+                    ORDER BY 1, 2, 3
+                    ON CONFLICT (client_id, day, response_category)
+                    DO UPDATE SET call_count = call_daily_stats.call_count + EXCLUDED.call_count;
+                    
+                    INSERT INTO call_versions (client_id)
+                    SELECT DISTINCT client_id FROM new_calls
+                    ORDER BY 1
+                    ON CONFLICT (client_id)
+                    DO UPDATE SET version = call_versions.version + 1, updated_at = now();
+                ELSIF TG_OP = 'DELETE' THEN
+                    INSERT INTO call_daily_stats (client_id, day, response_category, call_count)
+                    SELECT client_id, timestamp::date, COALESCE(response_category, ''), -COUNT(*)
+                    FROM old_calls
+                    GROUP BY 1, 2, 3
+                    ORDER BY 1, 2, 3
+                    ON CONFLICT (client_id, day, response_category)
+                    DO UPDATE SET call_count = call_daily_stats.call_count + EXCLUDED.call_count;
+                    
+                    INSERT INTO call_versions (client_id)
+                    SELECT DISTINCT client_id FROM old_calls
+                    ORDER BY 1
+                    ON CONFLICT (client_id)
+                    DO UPDATE SET version = call_versions.version + 1, updated_at = now();
+                ELSE
+                    INSERT INTO call_daily_stats (client_id, day, response_category, call_count)
+                    SELECT client_id, timestamp::date, COALESCE(response_category, ''), SUM(delta)
+                    FROM (
+                        SELECT client_id, timestamp, response_category, 1 AS delta FROM new_calls
+                        UNION ALL
+                        SELECT client_id, timestamp, response_category, -1 AS delta FROM old_calls
+                    ) changes
+                    GROUP BY 1, 2, 3
+                    HAVING SUM(delta) <> 0
+                    ORDER BY 1, 2, 3
+                    ON CONFLICT (client_id, day, response_category)
+                    DO UPDATE SET call_count = call_daily_stats.call_count + EXCLUDED.call_count;
+                    
+                    INSERT INTO call_versions (client_id)
+                    SELECT client_id FROM new_calls
+                    UNION
+                    SELECT client_id FROM old_calls
+                    ORDER BY 1
+                    ON CONFLICT (client_id)
+                    DO UPDATE SET version = call_versions.version + 1, updated_at = now();
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+            """,
+        ],
+    ),
+    Migration(
+        version=9,
+        name="calls_transcription_search",
+        statements=[
+            # an expression index needs no new column, so calls is never
+            # rewritten and writes go on while each partition's index builds
+            lambda db: create_calls_index(db, "idx_calls_transcription_tsv", f"USING gin (({TRANSCRIPTION_VECTOR}))"),
+        ],
+        transactional=False,
+    ),
+]
+
+
+async def execute_statement(db: Database, statement: Union[str, Callable[[Database], Awaitable[None]]]):
+    """Run one migration statement."""
+    if callable(statement):
+        await statement(db)
+    else:
+        await db.execute(statement)
+
+
+async def get_applied_versions(db: Database) -> set:
+    """Get versions of the migrations already applied."""
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version integer PRIMARY KEY,
+            name text NOT NULL,
+            applied_at timestamp NOT NULL DEFAULT now()
+        )
+    """)
+    rows = await db.fetch_all("SELECT version FROM schema_migrations")
+    return {row["version"] for row in rows}
+
+
+async def apply_migration(db: Database, migration: Migration):
+    """Apply a single migration and record it."""
+    record_query = "INSERT INTO schema_migrations (version, name) VALUES (:version, :name)"
+    record_values = {"version": migration.version, "name": migration.name}
+    
+    if migration.transactional:
+        async with db.transaction():
+            for statement in migration.statements:
+                await execute_statement(db, statement)
+            await db.execute(record_query, values=record_values)
+    else:
+        # statements must be idempotent, a failure leaves earlier ones applied
+        for statement in migration.statements:
+            await execute_statement(db, statement)
+        await db.execute(record_query, values=record_values)
+
+
+async def apply_migrations(db: Database) -> List[Migration]:
+    """Apply all pending migrations in version order."""
+    applied_versions = await get_applied_versions(db)
+    
+    applied = []
+    for migration in sorted(MIGRATIONS, key=lambda m: m.version):
+        if migration.version in applied_versions:
+            continue
+        await apply_migration(db, migration)
+        applied.append(migration)
+    
+    return applied
+
+
+async def main():
+    """Apply pending migrations to the configured database."""
+    from app.models.database import database
+    
+    await database.connect()
+    try:
+        applied = await apply_migrations(database)
+        for migration in applied:
+            print(f"Applied migration {migration.version}: {migration.name}")
+        if not applied:
+            print("Database schema is up to date")
+    finally:
+        await database.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,112 @@
+"""
+Slow-query log fed by the asyncpg query logger.
+
+Every pooled connection reports each finished statement to
+SlowQueryLog.record(). Statements slower than slow_query_threshold are
+printed with their parameters redacted to type names and kept in a ring
+buffer of the last slow_query_log_size entries, which the debug-only
+/api/v1/debug/slow-queries endpoint returns.
+
+A slow_query_explain_rate sample of slow read-only statements is run once
+more as EXPLAIN (ANALYZE, BUFFERS) with the original parameters, inside a
+read-only transaction on another pooled connection, and the plan is
+attached to the entry. Only one plan is captured at a time per worker, so a
+burst of slow queries cannot take over the pool.
+"""
+
+import asyncio
+import json
+import random
+import re
+from collections import deque
+from datetime import datetime, timezone
+from typing import List
+
+from app.core.config import settings
+
+# marks the log's own EXPLAIN statements so they are not logged in turn
+EXPLAIN_MARKER = "/* slow-query-log */"
+
+WRITE_KEYWORDS = re.compile(r"\b(insert|update|delete|merge|truncate|for\s+update|for\s+share)\b", re.IGNORECASE)
+
+
+def redact(args) -> List[str]:
+    """Replace parameter values with their type names."""
+    return [type(arg).__name__ for arg in args or ()]
+
+
+def is_read_only(query: str) -> bool:
+    """Whether running a statement again cannot change or lock anything."""
+    head = query.lstrip().split(None, 1)[0].lower() if query.strip() else ""
+    return head in ("select", "with") and not WRITE_KEYWORDS.search(query)
+
+
+class SlowQueryLog:
+    """Ring buffer of recent slow statements, with sampled query plans."""
+    
+    def __init__(self, threshold: float, explain_rate: float, explain_timeout: float, size: int):
+        self.threshold = threshold
+        self.explain_rate = explain_rate
+        self.explain_timeout = explain_timeout
+        self.entries = deque(maxlen=size)
+        self._pool = None
+        self._explaining = False
+    
+    def attach(self, pool):
+        """Use a pool for capturing plans."""
+        self._pool = pool
+    
+    def recent(self) -> List[dict]:
+        """Get the logged slow statements, newest first."""
+        return list(reversed(self.entries))
+    
+    def record(self, label: str, record):
+        """Log a finished statement if it was slow."""
+        if record.elapsed < self.threshold or record.query.startswith(EXPLAIN_MARKER):
+            return
+        
+        query = " ".join(record.query.split())
+        entry = {
+            "statement": label,
+            "query": query,
+            "parameters": redact(record.args),
+            "duration": record.elapsed,
+            "error": str(record.exception) if record.exception else None,
+            "logged_at": datetime.now(timezone.utc).isoformat(),
+            "plan": None,
+        }
+        self.entries.append(entry)
+        print(f"Slow query {label} took {record.elapsed * 1000:.0f} ms: {query} parameters={entry['parameters']}")
+        
+        if (
+            self._pool is not None
+            and not self._explaining
+            and is_read_only(record.query)
+            and random.random() < self.explain_rate
+        ):
+            self._explaining = True
+            asyncio.get_running_loop().create_task(self._explain(entry, record.query, record.args))
+    
+    async def _explain(self, entry: dict, query: str, args):
+        """Attach an EXPLAIN (ANALYZE, BUFFERS) plan to a logged entry."""
+        try:
+            async with self._pool.acquire() as conn:
+                async with conn.transaction(readonly=True):
+                    plan = await conn.fetchval(
+                        f"{EXPLAIN_MARKER} EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}",
+                        *(args or ()),
+                        timeout=self.explain_timeout
+                    )
+            entry["plan"] = json.loads(plan) if isinstance(plan, str) else plan
+        except Exception as e:
+            print(f"Could not capture plan for slow query {entry['statement']}: {e}")
+        finally:
+            self._explaining = False
+
+
+slow_query_log = SlowQueryLog(
+    threshold=settings.database.slow_query_threshold,
+    explain_rate=settings.database.slow_query_explain_rate,
+    explain_timeout=settings.database.slow_query_explain_timeout,
+    size=settings.database.slow_query_log_size,
+)
@@ -0,0 +1,45 @@
+"""
+Per-client, per-day, per-category call count rollup and change counters.
+
+call_daily_stats is kept in step with calls by statement-level triggers
+on calls (see migration 2), so inserts, updates and deletes from any
+writer, not only this API, are counted in the same transaction. Calls
+without a response category are counted under the empty string because
+primary key columns cannot be NULL. Detaching a partition fires no
+triggers, so partition removal subtracts its calls itself.
+
+The same triggers bump call_versions for every client a statement touched,
+even when its counts cancel out (e.g. an update that keeps the category),
+which is what the calls list ETags are derived from (see migration 8).
+"""
+
+from typing import Iterable, List, Optional
+
+import asyncpg
+
+from app.models.statements import STATEMENTS
+
+# the rollup's response_category for calls without one, as the triggers count them
+UNCATEGORIZED = ""
+
+
+def touched_clients(rows: Iterable[asyncpg.Record]) -> List[int]:
+    """Get the clients of a write's returned rows, including the previous client of updated calls."""
+    client_ids = set()
+    for row in rows:
+        client_ids.add(row["client_id"])
+        if row.get("old_client_id") is not None:
+            client_ids.add(row["old_client_id"])
+    return sorted(client_ids)
+
+
+async def fetch_calls_version(conn: asyncpg.Connection, client_id: Optional[int] = None) -> tuple:
+    """Get the change counter and last change time of one client's calls or of all calls."""
+    if client_id is not None:
+        row = await conn.fetchrow(STATEMENTS["get_client_version"], client_id)
+    else:
+        row = await conn.fetchrow(STATEMENTS["get_calls_version"])
+    
+    if row is None:
+        return 0, None
+    return row["version"], row["updated_at"]
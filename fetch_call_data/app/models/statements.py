@@ -0,0 +1,195 @@
+"""
+Fixed SQL statements for the native asyncpg data access layer.
+
+Statements use asyncpg's $n parameters and are passed to the connection
+unchanged, so they skip the named-parameter rewriting the databases library
+does on every query. asyncpg keeps a per-connection cache of prepared
+statements keyed by query text, so each statement is parsed and planned
+once per pooled connection and reused after that.
+"""
+
+CALL_COLUMNS = """call_id, client_id, phone_number, response_category, 
+    timestamp, recording_url, recording_length, list_id, final_transcription"""
+
+PURGE_JOB_COLUMNS = """job_id, filters, status, deleted, chunks, error, 
+    created_at, updated_at, finished_at"""
+
+STATEMENTS = {
+    # xmin changes whenever the row does, so it doubles as the call's ETag
+    "get_call": """
+        SELECT c.call_id, c.client_id, c.phone_number, c.response_category, 
+            c.timestamp, c.recording_url, c.recording_length, c.list_id, c.final_transcription,
+            c.xmin::text AS version, v.updated_at AS modified_at
+        FROM calls c 
+        LEFT JOIN call_versions v ON v.client_id = c.client_id
+        WHERE c.call_id = $1
+    """,
+    # the client's recording host, which recording URLs must point at
+    "get_call_recording": """
+        SELECT c.client_id, c.recording_url, cl.fetch_recording_url
+        FROM calls c 
+        JOIN clients cl ON cl.client_id = c.client_id
+        WHERE c.call_id = $1
+    """,
+    "get_client_call_recording": """
+        SELECT c.client_id, c.recording_url, cl.fetch_recording_url
+        FROM calls c 
+        JOIN clients cl ON cl.client_id = c.client_id
+        WHERE c.call_id = $1 AND c.client_id = $2
+    """,
+    "insert_call": f"""
+        INSERT INTO calls (client_id, phone_number, response_category, 
+                        recording_url, recording_length, list_id, final_transcription)
+        VALUES ($1, $2, $3, $4, $5, $6, $7)
+        RETURNING {CALL_COLUMNS}
+    """,
+    # unnest one array per column so a whole batch costs one round trip;
+    # ordinality keeps call_id assignment in request order
+    "insert_calls": f"""
+        INSERT INTO calls (client_id, phone_number, response_category, 
+                        recording_url, recording_length, list_id, final_transcription)
+        SELECT client_id, phone_number, response_category, 
+            recording_url, recording_length, list_id, final_transcription
+        FROM unnest(
+            $1::integer[], $2::text[], $3::text[], $4::text[], 
+            $5::double precision[], $6::text[], $7::text[]
+        ) WITH ORDINALITY AS batch(client_id, phone_number, response_category, 
+            recording_url, recording_length, list_id, final_transcription, ord)
+        ORDER BY ord
+        RETURNING {CALL_COLUMNS}
+    """,
+    # returns the previous client and category, whose calls changed too
+    "update_call": """
+        UPDATE calls c
+        SET client_id = $2, phone_number = $3, response_category = $4, 
+            recording_url = $5, recording_length = $6, list_id = $7, 
+            final_transcription = $8
+        FROM (
+            SELECT call_id, client_id, response_category 
+            FROM calls 
+            WHERE call_id = $1 AND ($9::integer IS NULL OR client_id = $9)
+            FOR UPDATE
+        ) old
+        WHERE c.call_id = old.call_id
+        RETURNING c.call_id, c.client_id, c.phone_number, c.response_category, 
+            c.timestamp, c.recording_url, c.recording_length, c.list_id, c.final_transcription,
+            old.client_id AS old_client_id, old.response_category AS old_response_category
+    """,
+    "delete_call": f"""
+        WITH deleted AS (
+            DELETE FROM calls 
+            WHERE call_id = $1 AND ($2::integer IS NULL OR client_id = $2)
+            RETURNING {CALL_COLUMNS}
+        ), deleted_keys AS (
+            DELETE FROM call_keys 
+            WHERE call_id IN (SELECT call_id FROM deleted)
+        )
+        SELECT * FROM deleted
+    """,
+    # assigns a call_id to each new key and locks existing ones, so
+    # concurrent retries of the same key wait for each other
+    "claim_call_keys": """
+        INSERT INTO call_keys AS k (client_id, external_key, call_id)
+        SELECT client_id, external_key, nextval(pg_get_serial_sequence('calls', 'call_id'))
+        FROM unnest($1::integer[], $2::text[]) AS batch(client_id, external_key)
+        ON CONFLICT (client_id, external_key) 
+        DO UPDATE SET client_id = EXCLUDED.client_id
+        RETURNING k.client_id, k.external_key, k.call_id
+    """,
+    # updates the calls whose claimed call_id exists and inserts the rest,
+    # returning the previous client and category of updated calls; the
+    # update joins old so rows are locked and read before they change
+    "upsert_calls": """
+        WITH batch AS (
+            SELECT * FROM unnest(
+                $1::integer[], $2::integer[], $3::text[], $4::text[], $5::text[], 
+                $6::double precision[], $7::text[], $8::text[]
+            ) AS batch(call_id, client_id, phone_number, response_category, 
+                recording_url, recording_length, list_id, final_transcription)
+        ), old AS (
+            SELECT c.call_id, c.client_id, c.response_category
+            FROM calls c 
+            JOIN batch b ON c.call_id = b.call_id
+            FOR UPDATE OF c
+        ), updated AS (
+            UPDATE calls c
+            SET phone_number = b.phone_number, response_category = b.response_category, 
+                recording_url = b.recording_url, recording_length = b.recording_length, 
+                list_id = b.list_id, final_transcription = b.final_transcription
+            FROM batch b 
+            JOIN old o ON o.call_id = b.call_id
+            WHERE c.call_id = b.call_id
+            RETURNING c.call_id, c.client_id, c.phone_number, c.response_category, 
+                c.timestamp, c.recording_url, c.recording_length, c.list_id, c.final_transcription
+        ), inserted AS (
+            INSERT INTO calls (call_id, client_id, phone_number, response_category, 
+                            recording_url, recording_length, list_id, final_transcription)
+            SELECT call_id, client_id, phone_number, response_category, 
+                recording_url, recording_length, list_id, final_transcription
+            FROM batch b
+            WHERE NOT EXISTS (SELECT 1 FROM old WHERE old.call_id = b.call_id)
+            ORDER BY call_id
+            RETURNING call_id, client_id, phone_number, response_category, 
+                timestamp, recording_url, recording_length, list_id, final_transcription
+        )
+        SELECT u.*, false AS created, 
+            o.client_id AS old_client_id, o.response_category AS old_response_category
+        FROM updated u 
+        JOIN old o ON o.call_id = u.call_id
+        UNION ALL
+        SELECT i.*, true AS created, NULL AS old_client_id, NULL AS old_response_category
+        FROM inserted i
+    """,
+    # for detached partitions, triggers count every other change of calls
+    "apply_rollup_deltas": """
+        WITH rollup AS (
+            INSERT INTO call_daily_stats (client_id, day, response_category, call_count)
+            SELECT * FROM unnest($1::integer[], $2::date[], $3::text[], $4::bigint[])
+            ON CONFLICT (client_id, day, response_category)
+            DO UPDATE SET call_count = call_daily_stats.call_count + EXCLUDED.call_count
+        )
+        INSERT INTO call_versions (client_id)
+        SELECT * FROM unnest($5::integer[])
+        ON CONFLICT (client_id)
+        DO UPDATE SET version = call_versions.version + 1, updated_at = now()
+    """,
+    "get_client_version": """
+        SELECT version, updated_at 
+        FROM call_versions 
+        WHERE client_id = $1
+    """,
+    # the sum grows whenever any client's counter does
+    "get_calls_version": """
+        SELECT COALESCE(SUM(version), 0)::bigint AS version, MAX(updated_at) AS updated_at 
+        FROM call_versions
+    """,
+    "create_purge_job": f"""
+        INSERT INTO purge_jobs (filters) 
+        VALUES ($1::jsonb) 
+        RETURNING {PURGE_JOB_COLUMNS}
+    """,
+    "get_purge_job": f"""
+        SELECT {PURGE_JOB_COLUMNS} 
+        FROM purge_jobs 
+        WHERE job_id = $1
+    """,
+    "cancel_purge_job": f"""
+        UPDATE purge_jobs 
+        SET status = CASE WHEN status = 'running' THEN 'cancelling' ELSE status END, 
+            updated_at = now() 
+        WHERE job_id = $1 
+        RETURNING {PURGE_JOB_COLUMNS}
+    """,
+    # records a chunk and returns the status, which DELETE may have changed
+    "record_purge_chunk": """
+        UPDATE purge_jobs 
+        SET deleted = deleted + $2, chunks = chunks + 1, updated_at = now() 
+        WHERE job_id = $1 
+        RETURNING status
+    """,
+    "finish_purge_job": """
+        UPDATE purge_jobs 
+        SET status = $2, error = $3, updated_at = now(), finished_at = now() 
+        WHERE job_id = $1
+    """,
+}
@@ -2,8 +2,8 @@
 Pydantic schemas for calls API endpoints.
 """
 
-from datetime import datetime
-from typing import Optional, List
+from datetime import date, datetime, time
+from typing import Optional, List, Union
 from pydantic import BaseModel, Field, validator
 
 
@@ -85,6 +85,31 @@ class CallBatchCreate(BaseModel):
         return v
 
 
+class CallUpsert(CallBase):
+    """Schema for creating or updating a call by its external key."""
+    
+    external_key: str = Field(
+        ..., 
+        min_length=1, 
+        max_length=100, 
+        description="Caller-supplied key identifying the call within its client"
+    )
+
+
+class CallBatchUpsert(BaseModel):
+    """Schema for batch call upserts."""
+    
+    calls: List[CallUpsert] = Field(..., min_items=1, max_items=1000, description="List of calls to create or update")
+    
+    @validator("calls")
+    def validate_unique_keys(cls, v):
+        """Validate each external key appears once per client."""
+        keys = [(call.client_id, call.external_key) for call in v]
+        if len(set(keys)) != len(keys):
+            raise ValueError("Duplicate external_key for the same client_id")
+        return v
+
+
 class CallBatchResponse(BaseModel):
     """Schema for batch operation responses."""
     
@@ -92,11 +117,39 @@ class CallBatchResponse(BaseModel):
     calls: List[CallResponse] = Field(..., description="Created calls")
 
 
+class CallUpsertResult(BaseModel):
+    """Schema for the outcome of one upserted call."""
+    
+    external_key: str = Field(..., description="Caller-supplied key")
+    created: bool = Field(..., description="True if the call was created, False if updated")
+    call: CallResponse = Field(..., description="Call data after the upsert")
+
+
+class CallBatchUpsertResponse(BaseModel):
+    """Schema for batch upsert responses."""
+    
+    message: str = Field(..., description="Operation result message")
+    created: int = Field(..., ge=0, description="Number of calls created")
+    updated: int = Field(..., ge=0, description="Number of calls updated")
+    results: List[CallUpsertResult] = Field(..., description="Outcome per call, in request order")
+
+
+class QueuedResponse(BaseModel):
+    """Schema for calls accepted for asynchronous writing."""
+    
+    message: str = Field(..., description="Operation result message")
+    queued: int = Field(..., ge=0, description="Number of calls queued")
+
+
 class CallListResponse(BaseModel):
     """Schema for paginated call list responses."""
     
     calls: List[CallResponse] = Field(..., description="List of calls")
     pagination: "PaginationInfo" = Field(..., description="Pagination information")
+    next_cursor: Optional[str] = Field(
+        None, 
+        description="Cursor for the next page, None when there are no more calls"
+    )
 
 
 class PaginationInfo(BaseModel):
@@ -104,8 +157,71 @@ class PaginationInfo(BaseModel):
     
     page: int = Field(..., ge=1, description="Current page number")
     limit: int = Field(..., ge=1, le=1000, description="Items per page")
-    total: int = Field(..., ge=0, description="Total number of items")
-    total_pages: int = Field(..., ge=0, description="Total number of pages")
+    total: Optional[int] = Field(None, ge=0, description="Total number of items, None when not counted")
+    total_pages: Optional[int] = Field(None, ge=0, description="Total number of pages, None when not counted")
+    count: str = Field("exact", description="How total was computed: exact, estimate or none")
+
+
+class CallSearchResult(CallResponse):
+    """Schema for a call matching a transcription search."""
+    
+    rank: float = Field(..., ge=0, description="Relevance of the transcription to the search, higher is better")
+    snippet: str = Field(..., description="HTML-escaped transcription excerpt with matches wrapped in <mark> tags")
+
+
+class CallSearchResponse(BaseModel):
+    """Schema for transcription search results."""
+    
+    results: List[CallSearchResult] = Field(..., description="Matching calls, most relevant first")
+    page: int = Field(..., ge=1, description="Current page number")
+    limit: int = Field(..., ge=1, description="Results per page")
+    has_more: bool = Field(..., description="True if a later page has more results")
+
+
+class CategoryCount(BaseModel):
+    """Schema for a response category call count."""
+    
+    name: Optional[str] = Field(..., description="Response category, None for uncategorized calls")
+    count: int = Field(..., ge=0, description="Number of calls")
+
+
+class CallStatsResponse(BaseModel):
+    """Schema for aggregated call statistics."""
+    
+    total_calls: int = Field(..., ge=0, description="Total number of calls")
+    calls_forwarded: int = Field(..., ge=0, description="Calls categorized as Interested")
+    calls_dropped: int = Field(..., ge=0, description="Categorized calls that were not forwarded")
+    categories: List[CategoryCount] = Field(..., description="Call counts per response category")
+
+
+class PurgeRequest(BaseModel):
+    """Schema for starting a retention purge."""
+    
+    before: Union[datetime, date] = Field(..., description="Delete calls older than this time")
+    client_id: Optional[int] = Field(None, gt=0, description="Only calls for this client")
+    list_ids: List[str] = Field([], description="Only calls from these lists")
+    response_categories: List[str] = Field([], description="Only calls in these response categories")
+    
+    @validator("before")
+    def validate_before(cls, v):
+        """Treat a bare date as midnight."""
+        if isinstance(v, datetime):
+            return v
+        return datetime.combine(v, time.min)
+
+
+class PurgeJobResponse(BaseModel):
+    """Schema for purge job progress."""
+    
+    job_id: int = Field(..., description="Unique purge job identifier")
+    filters: dict = Field(..., description="Filter the job deletes by")
+    status: str = Field(..., description="running, cancelling, cancelled, completed, failed or interrupted")
+    deleted: int = Field(..., ge=0, description="Calls deleted so far")
+    chunks: int = Field(..., ge=0, description="Chunks committed so far")
+    error: Optional[str] = Field(None, description="Failure reason if the job failed")
+    created_at: datetime = Field(..., description="When the job was submitted")
+    updated_at: datetime = Field(..., description="When the job last made progress")
+    finished_at: Optional[datetime] = Field(None, description="When the job stopped")
 
 
 class SuccessResponse(BaseModel):
@@ -0,0 +1,109 @@
+"""
+In-process registry of existing client IDs for the calls write paths.
+
+The clients table is small and rarely changes, so each worker keeps the
+full set of IDs and checks writes against it instead of querying clients
+on every request. The set is reloaded when its TTL expires, when Postgres
+sends a clients_changed notification (see the trigger added by the
+migrations), and at most once per second when an unknown ID shows up, in
+case the notification for a new client has not arrived yet. Writes still
+fail with a foreign key violation if a client is deleted in between.
+"""
+
+import asyncio
+import time
+from typing import Iterable, Optional, Set
+
+import asyncpg
+from databases import Database
+
+from app.core.config import settings
+
+CHANNEL = "clients_changed"
+
+
+class ClientRegistry:
+    """Cached set of client IDs, invalidated by TTL and LISTEN/NOTIFY."""
+    
+    def __init__(self, ttl: float, miss_refresh_interval: float = 1.0):
+        self.ttl = ttl
+        self.miss_refresh_interval = miss_refresh_interval
+        self._client_ids: Set[int] = set()
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self._dsn: Optional[str] = None
+        self._listener: Optional[asyncpg.Connection] = None
+    
+    async def start(self, dsn: str):
+        """Start listening for client changes."""
+        self._dsn = dsn
+        await self._listen()
+    
+    async def stop(self):
+        """Stop listening for client changes."""
+        self._dsn = None
+        if self._listener is not None:
+            listener, self._listener = self._listener, None
+            await listener.close()
+    
+    def invalidate(self):
+        """Force a reload on the next check."""
+        self._loaded_at = None
+    
+    async def _listen(self):
+        """Open the LISTEN connection, falling back to the TTL if it fails."""
+        try:
+            listener = await asyncpg.connect(self._dsn)
+            await listener.add_listener(CHANNEL, self._on_notify)
+            listener.add_termination_listener(self._on_terminate)
+            self._listener = listener
+        except (OSError, asyncpg.PostgresError) as e:
+            print(f"Client registry could not listen for changes: {e}")
+        
+        # changes made while not listening were missed
+        self.invalidate()
+    
+    def _on_notify(self, connection, pid, channel, payload):
+        self.invalidate()
+    
+    def _on_terminate(self, connection):
+        self._listener = None
+        self.invalidate()
+    
+    def _age(self) -> float:
+        if self._loaded_at is None:
+            return float("inf")
+        return time.monotonic() - self._loaded_at
+    
+    async def refresh(self, db: Database, max_age: float = 0.0):
+        """Reload client IDs unless another task reloaded them within max_age."""
+        async with self._lock:
+            if self._age() <= max_age:
+                return
+            
+            if self._listener is None and self._dsn is not None:
+                await self._listen()
+            
+            loaded_at = time.monotonic()
+            rows = await db.fetch_all("SELECT client_id FROM clients")
+            self._client_ids = {row["client_id"] for row in rows}
+            self._loaded_at = loaded_at
+    
+    async def missing(self, db: Database, client_ids: Iterable[int]) -> Set[int]:
+        """Get the client IDs that do not exist."""
+        if self._age() > self.ttl:
+            await self.refresh(db, max_age=self.ttl)
+        
+        unknown = set(client_ids) - self._client_ids
+        if unknown and self._age() > self.miss_refresh_interval:
+            await self.refresh(db, max_age=self.miss_refresh_interval)
+            unknown -= self._client_ids
+        
+        return unknown
+    
+    async def exists(self, db: Database, client_id: int) -> bool:
+        """Check whether a client exists."""
+        return not await self.missing(db, [client_id])
+
+
+client_registry = ClientRegistry(ttl=settings.api.client_registry_ttl)
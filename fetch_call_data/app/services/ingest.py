@@ -0,0 +1,181 @@
+"""
+Group-commit ingestion for calls accepted through POST /calls/async.
+
+Accepted calls wait in a bounded in-process queue. A single background
+writer drains it and inserts up to ingest_batch_size calls per transaction,
+flushing early once ingest_flush_interval has passed since the first call
+of the batch arrived. Thousands of single-call commits per second become a
+few multi-row ones. When the queue is full the endpoint answers 429 so
+dialers back off instead of piling up memory.
+
+Accepted calls have already been answered, so a call is only dropped when
+Postgres rejects its own data (e.g. a client deleted after its calls were
+accepted). When the database cannot be reached the unwritten calls stay at
+the head of the queue and are retried with a growing backoff.
+
+Queued calls are only held in memory: the lifespan shutdown hook drains the
+queue before the pool closes, but a killed worker loses what it had queued.
+"""
+
+import asyncio
+from typing import List, Optional
+
+import asyncpg
+
+from app.core.cache import invalidate_calls
+from app.core.config import settings
+from app.models.calls import insert_call, insert_calls
+from app.models.database import Database
+from app.models.rollup import touched_clients
+from app.schemas.calls import CallCreate
+
+# errors caused by a call's own values, which retrying cannot fix
+CALL_DATA_ERRORS = (asyncpg.DataError, asyncpg.IntegrityConstraintViolationError)
+
+
+class IngestWriter:
+    """Background writer merging queued calls into multi-row inserts."""
+    
+    def __init__(self, max_queue_size: int, batch_size: int, flush_interval: float, retry_interval: float, max_retry_interval: float):
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_interval = retry_interval
+        self.max_retry_interval = max_retry_interval
+        self._db: Optional[Database] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._accepting = False
+        # calls taken off the queue that the database could not take yet
+        self._unwritten: List[CallCreate] = []
+    
+    @property
+    def accepting(self) -> bool:
+        """Whether the writer is running and taking new calls."""
+        return self._accepting
+    
+    def pending(self) -> int:
+        """Number of calls waiting to be written."""
+        queued = self._queue.qsize() if self._queue is not None else 0
+        return queued + len(self._unwritten)
+    
+    async def start(self, db: Database):
+        """Start the background writer."""
+        self._db = db
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._unwritten = []
+        self._task = asyncio.create_task(self._run())
+        self._accepting = True
+    
+    async def stop(self, timeout: float):
+        """Stop taking calls and write everything already queued."""
+        self._accepting = False
+        if self._task is None:
+            return
+        
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            print(f"Ingest writer stopped with {self.pending()} calls unwritten")
+        
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+    
+    def submit(self, calls: List[CallCreate]) -> bool:
+        """Queue calls for writing, False if the queue has no room for all of them."""
+        if not self._accepting:
+            return False
+        
+        if self.max_queue_size - self._queue.qsize() < len(calls):
+            return False
+        
+        # no await between the check and the puts, so they cannot fail
+        for call in calls:
+            self._queue.put_nowait(call)
+        return True
+    
+    async def _next_batch(self) -> List[CallCreate]:
+        """Wait for a call, then gather more until the batch is full or the interval passes."""
+        batch = [await self._queue.get()]
+        
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        
+        while len(batch) < self.batch_size:
+            # take whatever is already queued without waiting
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        
+        return batch
+    
+    async def _run(self):
+        """Write batches until cancelled, backing off while the database is unavailable."""
+        retry_interval = self.retry_interval
+        while True:
+            # unwritten calls go first, so they keep their place in the queue
+            batch = self._unwritten or await self._next_batch()
+            self._unwritten = await self._write(batch)
+            
+            # queued calls count as done once written or dropped, so
+            # shutdown keeps waiting for the ones still unwritten
+            for _ in range(len(batch) - len(self._unwritten)):
+                self._queue.task_done()
+            
+            if not self._unwritten:
+                retry_interval = self.retry_interval
+                continue
+            
+            await asyncio.sleep(retry_interval)
+            retry_interval = min(retry_interval * 2, self.max_retry_interval)
+    
+    async def _write(self, calls: List[CallCreate]) -> List[CallCreate]:
+        """Insert a batch in one transaction, isolating bad calls if it fails, and return the unwritten ones."""
+        try:
+            async with self._db.pool.acquire() as conn, conn.transaction():
+                rows = await insert_calls(conn, calls)
+                client_ids = touched_clients(rows)
+            invalidate_calls(client_ids)
+            return []
+        except CALL_DATA_ERRORS as e:
+            print(f"Ingest batch of {len(calls)} calls failed, retrying one by one: {e}")
+        except Exception as e:
+            print(f"Ingest batch of {len(calls)} calls failed, retrying later: {e}")
+            return calls
+        
+        client_ids = set()
+        try:
+            for index, call in enumerate(calls):
+                try:
+                    async with self._db.pool.acquire() as conn, conn.transaction():
+                        row = await insert_call(conn, call)
+                        client_ids.update(touched_clients([row]))
+                except CALL_DATA_ERRORS as e:
+                    print(f"Dropped queued call for client {call.client_id}: {e}")
+                except Exception as e:
+                    print(f"Ingest of {len(calls) - index} calls failed, retrying later: {e}")
+                    return calls[index:]
+        finally:
+            invalidate_calls(client_ids)
+        return []
+
+
+ingest_writer = IngestWriter(
+    max_queue_size=settings.api.ingest_queue_size,
+    batch_size=settings.api.ingest_batch_size,
+    flush_interval=settings.api.ingest_flush_interval,
+    retry_interval=settings.api.ingest_retry_interval,
+    max_retry_interval=settings.api.ingest_max_retry_interval,
+)
@@ -0,0 +1,342 @@
+"""
+Monthly range partitioning of calls by timestamp.
+
+convert_calls() turns the calls heap into a table partitioned by month
+without copying rows. The existing table becomes the calls_legacy
+partition, covering everything before next month. Its existing indexes are
+reused as partitions of the parent's indexes, so nothing is rebuilt while
+the tables are locked. The scan needed to prove the legacy range runs
+beforehand as an online CHECK constraint validation. Run it once from the
+command line:
+
+    python -m app.services.partitions convert
+
+Once calls is partitioned, PartitionManager runs in every worker. It keeps
+partition_months_ahead monthly partitions created in advance and, when
+partition_retention_months is set, removes partitions that end before the
+retention window. Removing a partition subtracts its calls from the daily
+rollup and deletes their external keys. Then it detaches the partition,
+and drops it unless partition_detach_only is set, all in one transaction,
+so purging a month is a metadata operation instead of millions of row
+deletes.
+
+DDL on the parent runs with a short lock_timeout, so maintenance gives up
+and retries on the next check instead of queueing ingestion behind it.
+"""
+
+import argparse
+import asyncio
+import re
+from datetime import date, datetime
+from typing import List, NamedTuple, Optional
+
+import asyncpg
+
+from app.core.cache import invalidate_calls
+from app.core.config import settings
+from app.models.database import Database
+from app.models.migrations import ROLLUP_TRIGGERS, create_rollup_triggers
+from app.models.statements import STATEMENTS
+
+LEGACY_PARTITION = "calls_legacy"
+
+# arbitrary constant identifying partition maintenance among advisory locks
+MAINTENANCE_LOCK_ID = 7381001
+
+
+class Partition(NamedTuple):
+    """A partition of calls and its timestamp range, None for MINVALUE."""
+    
+    name: str
+    lower: Optional[date]
+    upper: date
+
+
+def month_start(day: date) -> date:
+    """Get the first day of a day's month."""
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    """Get the first day of the month a number of months after another."""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """Get the name of the partition holding a month."""
+    return f"calls_y{month.year:04d}m{month.month:02d}"
+
+
+def parse_bound(value: str) -> Optional[date]:
+    """Parse one side of a partition bound expression."""
+    if value == "MINVALUE":
+        return None
+    return datetime.fromisoformat(value.strip("'")).date()
+
+
+async def is_partitioned(conn: asyncpg.Connection) -> bool:
+    """Whether calls is already a partitioned table."""
+    return await conn.fetchval("SELECT relkind = 'p' FROM pg_class WHERE oid = 'calls'::regclass")
+
+
+async def list_partitions(conn: asyncpg.Connection) -> List[Partition]:
+    """List the partitions of calls in timestamp order."""
+    rows = await conn.fetch("""
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) AS bound
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'calls'::regclass
+    """)
+    
+    partitions = []
+    for row in rows:
+        match = re.match(r"FOR VALUES FROM \((.+)\) TO \((.+)\)", row["bound"])
+        lower, upper = match.groups()
+        partitions.append(Partition(row["relname"], parse_bound(lower), parse_bound(upper)))
+    
+    return sorted(partitions, key=lambda p: p.upper)
+
+
+async def create_partitions(conn: asyncpg.Connection, months_ahead: int) -> List[str]:
+    """Create monthly partitions from the last one through months_ahead months from now."""
+    partitions = await list_partitions(conn)
+    target = add_months(month_start(date.today()), months_ahead)
+    
+    # start where the newest partition ends, so an outage never leaves a gap
+    start = partitions[-1].upper if partitions else month_start(date.today())
+    
+    created = []
+    while start <= target:
+        end = add_months(start, 1)
+        name = partition_name(start)
+        async with conn.transaction():
+            await conn.execute(f"SET LOCAL lock_timeout = '{settings.database.partition_lock_timeout}'")
+            await conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {name} PARTITION OF calls
+                FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')
+            """)
+        created.append(name)
+        start = end
+    
+    return created
+
+
+async def remove_partition(conn: asyncpg.Connection, partition: Partition, detach_only: bool):
+    """Take a partition's calls out of calls, keeping the table if detach_only."""
+    async with conn.transaction():
+        # the rollup and the external keys must forget the calls too
+        rows = await conn.fetch(f"""
+            SELECT client_id, timestamp::date AS day,
+                COALESCE(response_category, '') AS response_category, -COUNT(*) AS delta
+            FROM {partition.name}
+            GROUP BY 1, 2, 3
+            ORDER BY 1, 2, 3
+        """)
+        if rows:
+            await conn.execute(
+                STATEMENTS["apply_rollup_deltas"],
+                [row["client_id"] for row in rows],
+                [row["day"] for row in rows],
+                [row["response_category"] for row in rows],
+                [row["delta"] for row in rows],
+                sorted({row["client_id"] for row in rows}),
+            )
+        await conn.execute(f"DELETE FROM call_keys WHERE call_id IN (SELECT call_id FROM {partition.name})")
+        
+        await conn.execute(f"SET LOCAL lock_timeout = '{settings.database.partition_lock_timeout}'")
+        await conn.execute(f"ALTER TABLE calls DETACH PARTITION {partition.name}")
+        if not detach_only:
+            await conn.execute(f"DROP TABLE {partition.name}")
+    invalidate_calls({row["client_id"] for row in rows})
+
+
+async def remove_partitions_before(
+    conn: asyncpg.Connection,
+    before: date,
+    detach_only: bool = False
+) -> List[str]:
+    """Remove every partition whose range ends on or before a date."""
+    removed = []
+    for partition in await list_partitions(conn):
+        if partition.upper > before:
+            break
+        await remove_partition(conn, partition, detach_only)
+        removed.append(partition.name)
+    return removed
+
+
+async def convert_calls(conn: asyncpg.Connection, months_ahead: int):
+    """Convert calls in place into a table partitioned by month."""
+    bound = add_months(month_start(date.today()), 1)
+    
+    # online preparation: prove the legacy range and build the new primary key
+    # index without blocking writes, so the locked part below does no scans
+    await conn.execute("ALTER TABLE calls DROP CONSTRAINT IF EXISTS calls_legacy_range")
+    await conn.execute(f"""
+        ALTER TABLE calls ADD CONSTRAINT calls_legacy_range
+        CHECK (timestamp < '{bound.isoformat()}') NOT VALID
+    """)
+    await conn.execute("ALTER TABLE calls VALIDATE CONSTRAINT calls_legacy_range")
+    await conn.execute("""
+        CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS calls_legacy_call_id_timestamp_key
+        ON calls (call_id, timestamp)
+    """)
+    
+    indexes = await conn.fetch("""
+        SELECT i.indexname, i.indexdef
+        FROM pg_indexes i
+        WHERE i.schemaname = current_schema() AND i.tablename = 'calls'
+            AND i.indexname NOT IN ('calls_pkey', 'calls_legacy_call_id_timestamp_key')
+    """)
+    sequence = await conn.fetchval("SELECT pg_get_serial_sequence('calls', 'call_id')")
+    
+    async with conn.transaction():
+        await conn.execute(f"SET LOCAL lock_timeout = '{settings.database.partition_lock_timeout}'")
+        
+        await conn.execute(f"ALTER TABLE calls RENAME TO {LEGACY_PARTITION}")
+        await conn.execute(f"ALTER TABLE {LEGACY_PARTITION} RENAME CONSTRAINT calls_pkey TO calls_legacy_pkey")
+        await conn.execute(f"""
+            ALTER TABLE {LEGACY_PARTITION} ADD CONSTRAINT calls_legacy_call_id_timestamp_key
+            UNIQUE USING INDEX calls_legacy_call_id_timestamp_key
+        """)
+        for index in indexes:
+            await conn.execute(f"ALTER INDEX {index['indexname']} RENAME TO calls_legacy_{index['indexname']}")
+        # the rollup triggers move to the parent, which sees every partition's rows
+        for trigger in ROLLUP_TRIGGERS:
+            await conn.execute(f"DROP TRIGGER IF EXISTS {trigger} ON {LEGACY_PARTITION}")
+        
+        await conn.execute(f"""
+            CREATE TABLE calls (LIKE {LEGACY_PARTITION} INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING STORAGE)
+            PARTITION BY RANGE (timestamp)
+        """)
+        await conn.execute("ALTER TABLE calls ADD CONSTRAINT calls_pkey PRIMARY KEY (call_id, timestamp)")
+        await conn.execute("""
+            ALTER TABLE calls ADD CONSTRAINT calls_client_id_fkey
+            FOREIGN KEY (client_id) REFERENCES clients(client_id)
+        """)
+        if sequence:
+            await conn.execute(f"ALTER SEQUENCE {sequence} OWNED BY calls.call_id")
+        
+        # the validated CHECK constraint lets ATTACH skip scanning the rows
+        await conn.execute(f"""
+            ALTER TABLE calls ATTACH PARTITION {LEGACY_PARTITION}
+            FOR VALUES FROM (MINVALUE) TO ('{bound.isoformat()}')
+        """)
+        await conn.execute(f"ALTER TABLE {LEGACY_PARTITION} DROP CONSTRAINT calls_legacy_range")
+        
+        # matching legacy indexes are attached instead of rebuilt
+        for index in indexes:
+            await conn.execute(index["indexdef"])
+        await create_rollup_triggers(conn)
+    
+    await create_partitions(conn, months_ahead)
+    await conn.execute("ANALYZE calls")
+
+
+class PartitionManager:
+    """Keeps future partitions created and applies partition retention."""
+    
+    def __init__(self, months_ahead: int, retention_months: int, detach_only: bool, interval: float):
+        self.months_ahead = months_ahead
+        self.retention_months = retention_months
+        self.detach_only = detach_only
+        self.interval = interval
+        self._db: Optional[Database] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    async def start(self, db: Database):
+        """Start periodic maintenance if calls is partitioned."""
+        self._db = db
+        async with db.pool.acquire() as conn:
+            if not await is_partitioned(conn):
+                return
+        
+        # create partitions before serving so inserts always have one
+        await self.maintain()
+        self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Stop periodic maintenance."""
+        if self._task is None:
+            return
+        
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+    
+    async def maintain(self):
+        """Create upcoming partitions and remove expired ones, in one worker at a time."""
+        try:
+            async with self._db.pool.acquire() as conn:
+                if not await conn.fetchval("SELECT pg_try_advisory_lock($1)", MAINTENANCE_LOCK_ID):
+                    return
+                try:
+                    await create_partitions(conn, self.months_ahead)
+                    if self.retention_months > 0:
+                        before = add_months(month_start(date.today()), -self.retention_months)
+                        removed = await remove_partitions_before(conn, before, self.detach_only)
+                        for name in removed:
+                            print(f"Removed expired partition {name}")
+                finally:
+                    await conn.execute("SELECT pg_advisory_unlock($1)", MAINTENANCE_LOCK_ID)
+        except Exception as e:
+            print(f"Partition maintenance failed: {e}")
+    
+    async def _run(self):
+        """Run maintenance every interval until cancelled."""
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.maintain()
+
+
+partition_manager = PartitionManager(
+    months_ahead=settings.database.partition_months_ahead,
+    retention_months=settings.database.partition_retention_months,
+    detach_only=settings.database.partition_detach_only,
+    interval=settings.database.partition_check_interval,
+)
+
+
+async def main():
+    """Convert calls or run partition maintenance from the command line."""
+    parser = argparse.ArgumentParser(description="Manage monthly partitions of calls")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("convert", help="Convert calls into a partitioned table")
+    subparsers.add_parser("create", help="Create upcoming monthly partitions")
+    remove_parser = subparsers.add_parser("remove", help="Remove partitions ending on or before a date")
+    remove_parser.add_argument("before", type=date.fromisoformat, help="Date as YYYY-MM-DD")
+    remove_parser.add_argument("--detach-only", action="store_true", help="Keep removed partitions as tables")
+    args = parser.parse_args()
+    
+    conn = await asyncpg.connect(settings.database.url)
+    try:
+        partitioned = await is_partitioned(conn)
+        
+        if args.command == "convert":
+            if partitioned:
+                print("calls is already partitioned")
+                return
+            await convert_calls(conn, settings.database.partition_months_ahead)
+            print("Converted calls into monthly partitions")
+            return
+        
+        if not partitioned:
+            print("calls is not partitioned, run the convert command first")
+            return
+        
+        if args.command == "create":
+            created = await create_partitions(conn, settings.database.partition_months_ahead)
+            print(f"Partitions up to date: {', '.join(created) or 'none created'}")
+        elif args.command == "remove":
+            removed = await remove_partitions_before(conn, args.before, args.detach_only)
+            print(f"Removed partitions: {', '.join(removed) or 'none'}")
+    finally:
+        await conn.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,187 @@
+"""
+Background retention purges for calls matching a filter.
+
+A purge job deletes the oldest matching calls in chunks of purge_chunk_size,
+one short transaction per chunk, and sleeps purge_throttle seconds between
+chunks so the WAL volume stays bounded and ingestion keeps its share of the
+pool. Rows locked by other writers are skipped and picked up by a later
+chunk instead of being waited on; when a chunk finds only locked rows the
+job waits purge_locked_retry seconds and tries again, and it completes only
+once no matching calls are left at all. Each chunk subtracts its calls from the
+daily rollup in the same transaction.
+
+Job state lives in purge_jobs so any worker can report progress or cancel
+a job; the worker that started it runs the chunks and checks for
+cancellation after each one. Jobs left running by a worker that stopped are
+marked interrupted on shutdown and can simply be submitted again.
+"""
+
+import asyncio
+import json
+from typing import Dict, List, Optional, Tuple
+
+import asyncpg
+
+from app.core.cache import invalidate_calls
+from app.core.config import settings
+from app.models.database import Database
+from app.models.rollup import touched_clients
+from app.models.statements import STATEMENTS
+
+
+def purge_conditions(filters: dict) -> Tuple[List[str], List]:
+    """Build the WHERE conditions and parameters matching a purge filter."""
+    conditions = ["timestamp < $1"]
+    values = [filters["before"]]
+    
+    if filters.get("client_id") is not None:
+        values.append(filters["client_id"])
+        conditions.append(f"client_id = ${len(values)}")
+    
+    # a single value uses = so the (column, timestamp) indexes are usable
+    for column, name in (("list_id", "list_ids"), ("response_category", "response_categories")):
+        selected = filters.get(name)
+        if not selected:
+            continue
+        if len(selected) == 1:
+            values.append(selected[0])
+            conditions.append(f"{column} = ${len(values)}")
+        else:
+            values.append(selected)
+            conditions.append(f"{column} = ANY(${len(values)}::text[])")
+    
+    return conditions, values
+
+
+def purge_remaining_query(filters: dict) -> Tuple[str, List]:
+    """Build the statement checking whether any call, locked or not, still matches a purge filter."""
+    conditions, values = purge_conditions(filters)
+    return f"SELECT EXISTS (SELECT 1 FROM calls WHERE {' AND '.join(conditions)})", values
+
+
+def purge_chunk_query(filters: dict, chunk_size: int) -> Tuple[str, List]:
+    """Build the statement deleting one chunk of calls matching a purge filter."""
+    conditions, values = purge_conditions(filters)
+    values.append(chunk_size)
+    query = f"""
+        WITH doomed AS (
+            SELECT call_id, timestamp FROM calls
+            WHERE {' AND '.join(conditions)}
+            ORDER BY timestamp
+            LIMIT ${len(values)}
+            FOR UPDATE SKIP LOCKED
+        ), deleted AS (
+            DELETE FROM calls c
+            USING doomed d
+            WHERE c.call_id = d.call_id AND c.timestamp = d.timestamp
+            RETURNING c.call_id, c.client_id, c.timestamp, c.response_category
+        ), deleted_keys AS (
+            DELETE FROM call_keys
+            WHERE call_id IN (SELECT call_id FROM deleted)
+        )
+        SELECT client_id, timestamp, response_category FROM deleted
+    """
+    return query, values
+
+
+def encode_filters(filters: dict) -> str:
+    """Encode a purge filter for the purge_jobs.filters column."""
+    return json.dumps({**filters, "before": filters["before"].isoformat()})
+
+
+def job_record(row: asyncpg.Record) -> dict:
+    """Convert a purge_jobs row to a response dict."""
+    job = dict(row)
+    job["filters"] = json.loads(job["filters"])
+    return job
+
+
+class PurgeRunner:
+    """Runs purge jobs as background tasks in this worker."""
+    
+    def __init__(self, chunk_size: int, throttle: float, locked_retry: float):
+        self.chunk_size = chunk_size
+        self.throttle = throttle
+        self.locked_retry = locked_retry
+        self._db: Optional[Database] = None
+        self._tasks: Dict[int, asyncio.Task] = {}
+    
+    async def start(self, db: Database):
+        """Start accepting purge jobs."""
+        self._db = db
+    
+    async def stop(self):
+        """Stop the jobs running in this worker, marking them interrupted."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def submit(self, filters: dict) -> dict:
+        """Record a new purge job and start running it."""
+        async with self._db.pool.acquire() as conn:
+            row = await conn.fetchrow(STATEMENTS["create_purge_job"], encode_filters(filters))
+        
+        job_id = row["job_id"]
+        self._tasks[job_id] = asyncio.create_task(self._run(job_id, filters))
+        return job_record(row)
+    
+    async def get(self, job_id: int) -> Optional[dict]:
+        """Get a purge job's progress, None if it does not exist."""
+        async with self._db.pool.acquire() as conn:
+            row = await conn.fetchrow(STATEMENTS["get_purge_job"], job_id)
+        return job_record(row) if row else None
+    
+    async def cancel(self, job_id: int) -> Optional[dict]:
+        """Ask a running purge job to stop after its current chunk."""
+        async with self._db.pool.acquire() as conn:
+            row = await conn.fetchrow(STATEMENTS["cancel_purge_job"], job_id)
+        return job_record(row) if row else None
+    
+    async def _run(self, job_id: int, filters: dict):
+        """Delete chunks until nothing matches or the job is cancelled."""
+        query, values = purge_chunk_query(filters, self.chunk_size)
+        remaining_query, remaining_values = purge_remaining_query(filters)
+        status, error = "completed", None
+        
+        try:
+            while True:
+                async with self._db.pool.acquire() as conn:
+                    async with conn.transaction():
+                        rows = await conn.fetch(query, *values)
+                        client_ids = touched_clients(rows)
+                    
+                    if rows:
+                        invalidate_calls(client_ids)
+                        current = await conn.fetchval(STATEMENTS["record_purge_chunk"], job_id, len(rows))
+                    # SKIP LOCKED finds nothing when every remaining row is locked too
+                    elif not await conn.fetchval(remaining_query, *remaining_values):
+                        break
+                    else:
+                        current = (await conn.fetchrow(STATEMENTS["get_purge_job"], job_id))["status"]
+                
+                if current == "cancelling":
+                    status = "cancelled"
+                    break
+                
+                await asyncio.sleep(self.throttle if rows else self.locked_retry)
+        except asyncio.CancelledError:
+            status = "interrupted"
+        except Exception as e:
+            print(f"Purge job {job_id} failed: {e}")
+            status, error = "failed", str(e)
+        finally:
+            self._tasks.pop(job_id, None)
+        
+        try:
+            async with self._db.pool.acquire() as conn:
+                await conn.execute(STATEMENTS["finish_purge_job"], job_id, status, error)
+        except Exception as e:
+            print(f"Could not record purge job {job_id} as {status}: {e}")
+
+
+purge_runner = PurgeRunner(
+    chunk_size=settings.api.purge_chunk_size,
+    throttle=settings.api.purge_throttle,
+    locked_retry=settings.api.purge_locked_retry,
+)
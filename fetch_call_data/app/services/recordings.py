@@ -0,0 +1,220 @@
+"""
+On-disk cache of call recordings proxied from the clients' recording hosts.
+
+Each recording is downloaded once into recording_cache_path, named by the
+SHA-256 of its URL, and served from there afterwards, so seeking in the
+dashboard's player only reads the requested bytes from local disk. The
+directory is shared by the workers: downloads go to a temporary file that
+is renamed into place when complete, so a reader never sees a partial
+recording. Once the directory holds more than recording_cache_size bytes
+the least recently used recordings are deleted, by modification time,
+which every cache hit refreshes. A recording being streamed when it is
+evicted stays readable until its file is closed; one evicted between its
+download and being opened is downloaded again.
+
+Redirects are not followed: the endpoint only checks the recording URL's
+host against the client's recording host, so a redirect could send the
+request anywhere else, including internal services.
+
+Concurrent requests for a recording that is not cached yet share one
+download per worker; workers downloading the same recording at the same
+time each rename a complete copy into place.
+"""
+
+import asyncio
+import hashlib
+import os
+import tempfile
+import time
+from typing import BinaryIO, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.core.config import settings
+from app.core.metrics import CACHE_REQUESTS, RECORDING_DOWNLOADS
+
+USER_AGENT = "XDialNetworks-Dashboard/1.0"
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+PARTIAL_SUFFIX = ".part"
+
+# partial files older than this were left behind by a worker that died mid-download
+STALE_PARTIAL_AGE = 3600.0
+
+CONTENT_TYPES = {
+    ".mp3": "audio/mpeg",
+    ".m4a": "audio/mp4",
+    ".ogg": "audio/ogg",
+    ".wav": "audio/wav",
+}
+
+
+class RecordingUnavailable(Exception):
+    """A recording host did not return the recording."""
+
+
+def content_type(url: str) -> str:
+    """Get a recording's content type from its URL, WAV unless the extension says otherwise."""
+    path = urlsplit(url).path.lower()
+    return CONTENT_TYPES.get(os.path.splitext(path)[1], "audio/wav")
+
+
+class RecordingCache:
+    """Size-bounded LRU directory of downloaded recordings, with single-flight downloads."""
+    
+    def __init__(self, directory: str, max_bytes: int, max_file_size: int, timeout: float, verify_ssl: bool):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_file_size = max_file_size
+        self.timeout = timeout
+        self.verify_ssl = verify_ssl
+        self._downloads: Dict[str, asyncio.Task] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+    
+    async def start(self):
+        """Create the cache directory and the HTTP client for recording hosts."""
+        os.makedirs(self.directory, exist_ok=True)
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout,
+            verify=self.verify_ssl,
+            # a redirect is a failed fetch, see the module docstring
+            follow_redirects=False,
+            headers={"User-Agent": USER_AGENT, "Accept": "audio/*,*/*"},
+        )
+    
+    async def stop(self):
+        """Cancel unfinished downloads and close the HTTP client."""
+        for download in list(self._downloads.values()):
+            download.cancel()
+        if self._client is not None:
+            client, self._client = self._client, None
+            await client.aclose()
+    
+    def path(self, url: str) -> str:
+        """Get where a recording is cached."""
+        return os.path.join(self.directory, hashlib.sha256(url.encode()).hexdigest())
+    
+    async def open(self, url: str) -> BinaryIO:
+        """Open a cached recording, downloading it first on a miss."""
+        path = self.path(url)
+        try:
+            recording = open(path, "rb")
+            CACHE_REQUESTS.labels("recording", "hit").inc()
+        except FileNotFoundError:
+            recording = await self._fetch_and_open(url, path)
+        
+        # mark it recently used
+        try:
+            os.utime(recording.fileno())
+        except OSError:
+            pass
+        return recording
+    
+    async def _fetch_and_open(self, url: str, path: str) -> BinaryIO:
+        """Download a recording and open it, downloading again if another worker evicted it first."""
+        for _ in range(2):
+            await self._fetch(url, path)
+            try:
+                return open(path, "rb")
+            except FileNotFoundError:
+                pass
+        raise RecordingUnavailable("Recording was evicted before it could be opened")
+    
+    async def _fetch(self, url: str, path: str):
+        """Download a recording, or wait for the download already running."""
+        download = self._downloads.get(path)
+        if download is None:
+            CACHE_REQUESTS.labels("recording", "miss").inc()
+            download = asyncio.create_task(self._download(url, path))
+            self._downloads[path] = download
+            download.add_done_callback(lambda task: self._forget(path, task))
+        else:
+            CACHE_REQUESTS.labels("recording", "shared").inc()
+        
+        # one request going away must not cancel the download the others wait for
+        await asyncio.shield(download)
+    
+    def _forget(self, path: str, task: asyncio.Task):
+        self._downloads.pop(path, None)
+        # retrieved here, every waiting request may have gone away
+        if not task.cancelled():
+            task.exception()
+    
+    async def _download(self, url: str, path: str):
+        """Stream a recording into a temporary file and rename it into place."""
+        if self._client is None:
+            raise RecordingUnavailable("Recording cache is not started")
+        
+        fd, partial = tempfile.mkstemp(dir=self.directory, suffix=PARTIAL_SUFFIX)
+        try:
+            with os.fdopen(fd, "wb") as file:
+                async with self._client.stream("GET", url) as response:
+                    if response.status_code != 200:
+                        raise RecordingUnavailable(f"Recording host returned HTTP {response.status_code}")
+                    
+                    length = response.headers.get("content-length", "")
+                    if length.isdigit() and int(length) > self.max_file_size:
+                        raise RecordingUnavailable(f"Recording is larger than {self.max_file_size} bytes")
+                    
+                    size = 0
+                    async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                        size += len(chunk)
+                        if size > self.max_file_size:
+                            raise RecordingUnavailable(f"Recording is larger than {self.max_file_size} bytes")
+                        file.write(chunk)
+            
+            os.replace(partial, path)
+        except BaseException as e:
+            RECORDING_DOWNLOADS.labels("error").inc()
+            try:
+                os.unlink(partial)
+            except OSError:
+                pass
+            if isinstance(e, httpx.HTTPError):
+                raise RecordingUnavailable(f"Could not reach recording host: {e}") from e
+            raise
+        
+        RECORDING_DOWNLOADS.labels("ok").inc()
+        self.evict()
+    
+    def evict(self):
+        """Delete the least recently used recordings until the cache fits in max_bytes."""
+        now = time.time()
+        recordings = []
+        total = 0
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    if entry.name.endswith(PARTIAL_SUFFIX):
+                        if stat.st_mtime < now - STALE_PARTIAL_AGE:
+                            os.unlink(entry.path)
+                        continue
+                    recordings.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+            
+            recordings.sort()
+            for _, size, path in recordings:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+        except OSError as e:
+            print(f"Recording cache eviction failed: {e}")
+
+
+recording_cache = RecordingCache(
+    directory=settings.api.recording_cache_path,
+    max_bytes=settings.api.recording_cache_size,
+    max_file_size=settings.api.recording_max_size,
+    timeout=settings.api.recording_fetch_timeout,
+    verify_ssl=settings.api.recording_verify_ssl,
+)
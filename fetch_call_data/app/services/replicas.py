@@ -0,0 +1,156 @@
+"""
+Routing of API reads between the primary and its read replicas.
+
+GET requests are served from a replica whose replay is within
+replica_max_lag seconds of the primary, round-robin when there are
+several; everything else, and every read when no replica qualifies, goes
+to the primary. Lag is measured every replica_check_interval seconds: a
+replica that has replayed up to the primary's current WAL position has no
+lag even when the primary has been idle, otherwise its lag is the time
+since the last transaction it replayed. A server that is not in recovery
+is not replicating at all and is treated as current.
+
+A client sees its own writes because reads within primary_read_window of a
+write go to the primary (see the read-your-writes middleware), as do reads
+sent with an X-Read-Primary header.
+
+To try it locally, stream a second instance from the first:
+
+    pg_basebackup -h 127.0.0.1 -U <replication user> -D /tmp/replica -R
+    pg_ctl -D /tmp/replica -o "-p 5433" start
+    DB_REPLICA_HOSTS=127.0.0.1:5433 python trunk.py
+"""
+
+import asyncio
+import itertools
+import time
+from typing import Dict, List, Optional
+
+from fastapi import Request
+
+from app.core.config import settings
+from app.core.metrics import READ_ROUTES, REPLICA_LAG
+from app.models.database import Database, database, replicas
+
+# set by the read-your-writes middleware to when the client's reads may leave the primary
+PRIMARY_COOKIE = "xdial_primary_until"
+PRIMARY_HEADER = "x-read-primary"
+
+SAFE_METHODS = ("GET", "HEAD")
+
+REPLICA_LAG_QUERY = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_replay_lsn() >= $1::pg_lsn THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 'Infinity')
+    END::float8
+"""
+
+
+class ReplicaRouter:
+    """Chooses the database for each request from the replicas' measured lag."""
+    
+    def __init__(self, primary: Database, replicas: List[Database], max_lag: float, interval: float):
+        self.primary = primary
+        self.replicas = replicas
+        self.max_lag = max_lag
+        self.interval = interval
+        self._lag: Dict[str, float] = {}
+        self._healthy: List[Database] = []
+        self._rotation = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+    
+    async def start(self):
+        """Connect the replicas and start checking their lag."""
+        if not self.replicas:
+            return
+        
+        await self.check()
+        self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Stop checking lag and disconnect the replicas."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        
+        self._healthy = []
+        for replica in self.replicas:
+            if replica.is_connected:
+                await replica.disconnect()
+    
+    def lag(self) -> Dict[str, float]:
+        """Get each replica's last measured lag in seconds, infinite if unreachable."""
+        return dict(self._lag)
+    
+    async def _replica_lag(self, replica: Database, primary_lsn: int) -> float:
+        """Measure how far a replica is behind, connecting it first if needed."""
+        if not replica.is_connected:
+            await replica.connect()
+        async with replica.pool.acquire() as conn:
+            return await conn.fetchval(REPLICA_LAG_QUERY, primary_lsn, timeout=self.interval)
+    
+    async def check(self):
+        """Measure every replica's lag and keep the ones close enough to the primary."""
+        try:
+            async with self.primary.pool.acquire() as conn:
+                primary_lsn = await conn.fetchval("SELECT pg_current_wal_lsn()")
+        except Exception as e:
+            # without the primary's position lag cannot be told apart from idling
+            print(f"Replica check could not read the primary WAL position: {e}")
+            return
+        
+        healthy = []
+        for replica in self.replicas:
+            try:
+                lag = await self._replica_lag(replica, primary_lsn)
+            except Exception as e:
+                print(f"Replica {replica.name} is unavailable: {e}")
+                lag = float("inf")
+            
+            self._lag[replica.name] = lag
+            REPLICA_LAG.labels(replica.name).set(lag)
+            if lag <= self.max_lag:
+                healthy.append(replica)
+        
+        self._healthy = healthy
+    
+    async def _run(self):
+        """Check lag every interval until cancelled."""
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.check()
+    
+    def reads_primary(self, request: Request) -> bool:
+        """Whether a read must see the client's own recent writes."""
+        if request.headers.get(PRIMARY_HEADER):
+            return True
+        try:
+            return float(request.cookies.get(PRIMARY_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+    
+    def for_request(self, request: Request) -> Database:
+        """Get the database a request should use."""
+        if request.method not in SAFE_METHODS or not self.replicas:
+            return self.primary
+        
+        healthy = self._healthy
+        if not healthy or self.reads_primary(request):
+            READ_ROUTES.labels("primary").inc()
+            return self.primary
+        
+        READ_ROUTES.labels("replica").inc()
+        return healthy[next(self._rotation) % len(healthy)]
+
+
+replica_router = ReplicaRouter(
+    primary=database,
+    replicas=replicas,
+    max_lag=settings.database.replica_max_lag,
+    interval=settings.database.replica_check_interval,
+)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark batch call insertion: per-row INSERT loop vs single-statement unnest.
+
+Runs against the database configured through the usual DB_* environment
+variables. Every run is rolled back, so the calls table is left untouched.
+
+Usage: python -m benchmarks.batch_insert [--batch-size 1000] [--runs 10]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.models.calls import call_values, insert_calls
+from app.models.database import database
+from app.schemas.calls import CallCreate
+
+LOOP_INSERT_QUERY = """
+    INSERT INTO calls (client_id, phone_number, response_category, 
+                    recording_url, recording_length, list_id, final_transcription)
+    VALUES ($1, $2, $3, $4, $5, $6, $7)
+    RETURNING *
+"""
+
+
+def build_batch(client_id: int, size: int) -> list:
+    """Build a batch of synthetic calls."""
+    return [
+        CallCreate(
+            client_id=client_id,
+            phone_number=f"555{i:07d}",
+            response_category="Interested" if i % 3 == 0 else "Not Interested",
+            recording_url=f"https://recordings.example.com/{i}.wav",
+            recording_length=float(i % 300),
+            list_id=f"list-{i % 10}",
+            final_transcription="hello, yes I would like to hear more " * 5,
+        )
+        for i in range(size)
+    ]
+
+
+async def insert_loop(conn, calls: list) -> list:
+    """Insert calls one statement at a time (the previous batch path)."""
+    rows = []
+    for call in calls:
+        rows.append(await conn.fetchrow(LOOP_INSERT_QUERY, *call_values(call)))
+    return rows
+
+
+async def insert_unnest(conn, calls: list) -> list:
+    """Insert calls with the single-statement batch path."""
+    return await insert_calls(conn, calls)
+
+
+async def measure(strategy, calls: list, runs: int) -> list:
+    """Time a strategy over several rolled back runs."""
+    timings = []
+    async with database.pool.acquire() as conn:
+        for _ in range(runs):
+            transaction = conn.transaction()
+            await transaction.start()
+            try:
+                start = time.perf_counter()
+                rows = await strategy(conn, calls)
+                timings.append(time.perf_counter() - start)
+            finally:
+                await transaction.rollback()
+            assert len(rows) == len(calls)
+    return timings
+
+
+async def main(batch_size: int, runs: int):
+    """Run both strategies and print a comparison."""
+    await database.connect()
+    try:
+        client_id = await database.fetch_val("SELECT MIN(client_id) FROM clients")
+        if client_id is None:
+            print("No clients found, create at least one client first")
+            return
+        
+        calls = build_batch(client_id, batch_size)
+        
+        # warm up connections and plans
+        await measure(insert_unnest, calls[:10], 1)
+        await measure(insert_loop, calls[:10], 1)
+        
+        print(f"batch size {batch_size}, {runs} runs")
+        results = {}
+        for name, strategy in (("loop", insert_loop), ("unnest", insert_unnest)):
+            timings = await measure(strategy, calls, runs)
+            results[name] = statistics.median(timings)
+            print(
+                f"  {name:<8} median {results[name] * 1000:8.1f} ms  "
+                f"min {min(timings) * 1000:8.1f} ms  "
+                f"{batch_size / results[name]:10.0f} rows/s"
+            )
+        print(f"  speedup  {results['loop'] / results['unnest']:.1f}x")
+    finally:
+        await database.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=1000, help="Calls per batch")
+    parser.add_argument("--runs", type=int, default=10, help="Timed runs per strategy")
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size, args.runs))
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Load-test the calls API through the ASGI app and report latency as JSON.
+
+Seeds the configured database with benchmark clients and deterministic
+synthetic calls, starts the app with its lifespan (pool, registry, ingest
+writer) and drives each scenario through an in-process HTTP client at a
+fixed concurrency. Every scenario reports p50/p95/p99/mean latency in
+milliseconds, throughput and error count. The clients seeded by the run
+and all of their calls are deleted afterwards unless --keep is given.
+Outside the development environment (ENVIRONMENT) the run refuses to start
+unless --allow-non-development is given.
+
+Runs with the same options are comparable: the seed data, request
+parameters and request order only depend on --calls, --clients, --days and
+--seed. Pass --baseline with an earlier result file to fail the run when a
+scenario's p95 latency grew by more than --tolerance.
+
+Usage: python -m benchmarks.load [--calls 200000] [--clients 20] [--requests 500]
+       [--concurrency 10] [--output result.json] [--baseline old.json]
+       [--allow-non-development]
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# every request comes from one address, so rate limits would measure the
+# limiter instead of the API
+for endpoint_class in ("INGEST", "READ", "EXPORT"):
+    os.environ[f"API_RATE_LIMIT_{endpoint_class}_RATE"] = "0"
+
+import httpx
+
+import trunk
+from app.models.database import database
+
+CLIENT_PREFIX = "benchmark-"
+
+SEED_CALLS_QUERY = """
+    INSERT INTO calls (client_id, phone_number, response_category, timestamp,
+                    recording_url, recording_length, list_id)
+    SELECT client_ids[1 + g % cardinality(client_ids)],
+        lpad((g::bigint * 7919 % 10000000000)::text, 10, '0'),
+        (ARRAY['Interested', 'Not_Interested', 'Answering_Machine', 'DNC',
+               'DNQ', 'Unknown', 'User_Silent'])[1 + g % 7],
+        date_trunc('day', now()) - (g::bigint * 86400 * $3 / $2) * interval '1 second',
+        'https://recordings.example.com/' || g || '.wav',
+        g % 300,
+        'list-' || (g % 50)
+    FROM generate_series(1, $2) g, (SELECT $1::integer[] AS client_ids) ids
+"""
+
+
+def percentile(sorted_values: list, percent: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies: list, errors: int, elapsed: float) -> dict:
+    """Summarize one scenario's request latencies."""
+    values = sorted(latencies)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "mean_ms": round(sum(values) / len(values) * 1000, 3),
+        "throughput_rps": round(len(values) / elapsed, 1),
+    }
+
+
+def git_commit() -> str:
+    """Get the commit being benchmarked, if run from a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=project_root,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def synthetic_call(client_id: int, i: int) -> dict:
+    """Build the request body of one synthetic call."""
+    return {
+        "client_id": client_id,
+        "phone_number": f"555{i:07d}",
+        "response_category": "Interested" if i % 3 == 0 else "Not_Interested",
+        "recording_url": f"https://recordings.example.com/load-{i}.wav",
+        "recording_length": float(i % 300),
+        "list_id": f"list-{i % 50}",
+        "final_transcription": "hello, yes I would like to hear more",
+    }
+
+
+async def seed(calls: int, clients: int, days: int) -> list:
+    """Create benchmark clients and their calls, returning the client IDs."""
+    async with database.pool.acquire() as conn, conn.transaction():
+        rows = await conn.fetch(
+            f"INSERT INTO clients (client_name) "
+            f"SELECT '{CLIENT_PREFIX}' || g FROM generate_series(1, $1) g RETURNING client_id",
+            clients
+        )
+        client_ids = [row["client_id"] for row in rows]
+        # the rollup triggers count the seeded calls
+        await conn.execute(SEED_CALLS_QUERY, client_ids, calls, days)
+    
+    async with database.pool.acquire() as conn:
+        await conn.execute("ANALYZE calls")
+    return client_ids
+
+
+def check_environment(allow_non_development: bool):
+    """Exit unless running against the development environment or explicitly allowed not to."""
+    environment = os.getenv("ENVIRONMENT", "development").lower()
+    if environment != "development" and not allow_non_development:
+        sys.exit(
+            f"Refusing to seed and delete benchmark data in the {environment} environment, "
+            f"pass --allow-non-development to run anyway"
+        )
+
+
+async def cleanup(client_ids: list):
+    """Delete the given benchmark clients and everything recorded for them."""
+    if not client_ids:
+        return
+    
+    async with database.pool.acquire() as conn, conn.transaction():
+        # calls first, deleting them updates the rollup
+        await conn.execute("DELETE FROM call_keys WHERE client_id = ANY($1::integer[])", client_ids)
+        await conn.execute("DELETE FROM calls WHERE client_id = ANY($1::integer[])", client_ids)
+        await conn.execute("DELETE FROM call_daily_stats WHERE client_id = ANY($1::integer[])", client_ids)
+        await conn.execute("DELETE FROM call_versions WHERE client_id = ANY($1::integer[])", client_ids)
+        await conn.execute("DELETE FROM clients WHERE client_id = ANY($1::integer[])", client_ids)
+    
+    async with database.pool.acquire() as conn:
+        await conn.execute("ANALYZE calls")
+
+
+async def run_scenario(client: httpx.AsyncClient, requests: list, concurrency: int, expected: int) -> dict:
+    """Send prepared requests with a fixed number of workers and time each one."""
+    latencies = []
+    errors = 0
+    queue = list(reversed(requests))
+    
+    async def worker():
+        nonlocal errors
+        while queue:
+            method, url, kwargs = queue.pop()
+            start = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != expected:
+                errors += 1
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+
+async def collect_cursors(client: httpx.AsyncClient, client_id: int, pages: int) -> list:
+    """Walk the list pages of a client once, returning the cursor of each page."""
+    cursors = []
+    params = {"client_id": client_id, "limit": 50, "count": "none"}
+    for _ in range(pages):
+        response = await client.get("/api/v1/calls/", params=params)
+        cursor = response.json().get("next_cursor")
+        if not cursor:
+            break
+        cursors.append(cursor)
+        params["cursor"] = cursor
+    return cursors
+
+
+async def run_benchmarks(client: httpx.AsyncClient, client_ids: list, args) -> dict:
+    """Run every scenario in a fixed order."""
+    rng = random.Random(args.seed)
+    n = args.requests
+    results = {}
+    
+    def list_requests(**params):
+        return [
+            ("GET", "/api/v1/calls/", {"params": {"client_id": rng.choice(client_ids), **params}})
+            for _ in range(n)
+        ]
+    
+    # warm up connections, statement caches and the client registry
+    for method, url, kwargs in list_requests(limit=50)[:20]:
+        await client.request(method, url, **kwargs)
+    
+    cursors = await collect_cursors(client, client_ids[0], 100)
+    
+    scenarios = [
+        ("list_first_page", list_requests(limit=50), 200),
+        ("list_page_20", list_requests(limit=50, page=20, count="none"), 200),
+        ("list_page_200", list_requests(limit=50, page=200, count="none"), 200),
+        ("list_cursor_deep", [
+            ("GET", "/api/v1/calls/", {"params": {
+                "client_id": client_ids[0], "limit": 50, "count": "none", "cursor": rng.choice(cursors)
+            }})
+            for _ in range(n)
+        ] if cursors else [], 200),
+        ("single_insert", [
+            ("POST", "/api/v1/calls/", {"json": synthetic_call(rng.choice(client_ids), i)})
+            for i in range(n)
+        ], 201),
+        ("batch_insert_100", [
+            ("POST", "/api/v1/calls/batch", {"json": {"calls": [
+                synthetic_call(rng.choice(client_ids), i * 100 + j) for j in range(100)
+            ]}})
+            for i in range(max(1, n // 10))
+        ], 201),
+    ]
+    
+    for name, requests, expected in scenarios:
+        if not requests:
+            continue
+        results[name] = await run_scenario(client, requests, args.concurrency, expected)
+        print(f"  {name:<18} {json.dumps(results[name])}", file=sys.stderr)
+    
+    # update and delete the calls the single insert scenario created
+    async with database.pool.acquire() as conn:
+        call_ids = await conn.fetchval(
+            "SELECT array_agg(call_id ORDER BY call_id) FROM calls "
+            "WHERE client_id = ANY($1::integer[]) "
+            "AND recording_url LIKE 'https://recordings.example.com/load-%'",
+            client_ids
+        )
+    call_ids = (call_ids or [])[:n]
+    
+    if call_ids:
+        results["update"] = await run_scenario(client, [
+            ("PUT", f"/api/v1/calls/{call_id}", {"json": {
+                **synthetic_call(rng.choice(client_ids), i), "response_category": "DNC"
+            }})
+            for i, call_id in enumerate(call_ids)
+        ], args.concurrency, 200)
+        print(f"  {'update':<18} {json.dumps(results['update'])}", file=sys.stderr)
+        
+        results["delete"] = await run_scenario(client, [
+            ("DELETE", f"/api/v1/calls/{call_id}", {}) for call_id in call_ids
+        ], args.concurrency, 200)
+        print(f"  {'delete':<18} {json.dumps(results['delete'])}", file=sys.stderr)
+    
+    return results
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> bool:
+    """Print p95 changes against a baseline, False if any scenario regressed."""
+    ok = True
+    for name, current in result["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        change = current["p95_ms"] / previous["p95_ms"] - 1 if previous["p95_ms"] else 0.0
+        regressed = change > tolerance
+        ok = ok and not regressed
+        print(
+            f"  {'FAIL' if regressed else 'ok  '} {name:<18} p95 "
+            f"{previous['p95_ms']:.1f} -> {current['p95_ms']:.1f} ms ({change:+.0%})",
+            file=sys.stderr
+        )
+    return ok
+
+
+async def main(args) -> dict:
+    """Seed, run every scenario through the app and clean up."""
+    # the lifespan connects the shared database, which seeding uses as well
+    async with trunk.lifespan(trunk.app):
+        print(f"Seeding {args.calls} calls for {args.clients} clients...", file=sys.stderr)
+        client_ids = await seed(args.calls, args.clients, args.days)
+        server_version = await database.fetch_val("SHOW server_version")
+        
+        try:
+            transport = httpx.ASGITransport(app=trunk.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+                scenarios = await run_benchmarks(client, client_ids, args)
+        finally:
+            if not args.keep:
+                await cleanup(client_ids)
+    
+    return {
+        "meta": {
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "postgres": server_version,
+            "calls": args.calls,
+            "clients": args.clients,
+            "days": args.days,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+        },
+        "scenarios": scenarios,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200000, help="Synthetic calls to seed")
+    parser.add_argument("--clients", type=int, default=20, help="Benchmark clients to seed")
+    parser.add_argument("--days", type=int, default=90, help="Days the seeded calls are spread over")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=10, help="Requests in flight per scenario")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for request parameters")
+    parser.add_argument("--output", type=Path, help="Write the JSON result here instead of stdout")
+    parser.add_argument("--baseline", type=Path, help="Earlier JSON result to compare p95 latency against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p95 growth over the baseline")
+    parser.add_argument("--keep", action="store_true", help="Keep the seeded clients and calls")
+    parser.add_argument(
+        "--allow-non-development", action="store_true", help="Run even when ENVIRONMENT is not development"
+    )
+    args = parser.parse_args()
+    check_environment(args.allow_non_development)
+    
+    result = asyncio.run(main(args))
+    
+    output = json.dumps(result, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n")
+    else:
+        print(output)
+    
+    if args.baseline:
+        sys.exit(0 if compare(result, json.loads(args.baseline.read_text()), args.tolerance) else 1)
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Benchmark the recording proxy against a local stand-in recording host.
+
+Starts an HTTP server on 127.0.0.1 that serves synthetic recordings after
+--latency seconds and counts its downloads, seeds a benchmark client whose
+fetch_recording_url points at it with --recordings calls, then runs the app
+with its lifespan and reports JSON timings for a cold fetch with
+--concurrency players starting at once, a full read from the cache and
+random seeks with Range requests. Fails when the concurrent cold fetch
+downloaded a recording more than once or a range returned the wrong bytes.
+Like benchmarks.load, it only deletes the client it seeded and refuses to
+run outside development unless --allow-non-development is given.
+
+Usage: python -m benchmarks.recordings [--recordings 20] [--size 1000000]
+       [--latency 0.2] [--concurrency 10] [--seeks 200] [--allow-non-development]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# every request comes from one address, which the read rate limit would throttle
+os.environ["API_RATE_LIMIT_READ_RATE"] = "0"
+
+import httpx
+
+import trunk
+from app.models.database import database
+from app.services.recordings import recording_cache
+from benchmarks.load import CLIENT_PREFIX, check_environment, cleanup, summarize
+
+
+def recording_bytes(name: str, size: int) -> bytes:
+    """Build the deterministic content of a synthetic recording."""
+    return random.Random(name).randbytes(size)
+
+
+def start_recording_host(size: int, latency: float):
+    """Serve synthetic recordings on a free local port, returning the server and its download log."""
+    downloads = []
+    
+    class RecordingHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            downloads.append(self.path)
+            time.sleep(latency)
+            body = recording_bytes(self.path, size)
+            self.send_response(200)
+            self.send_header("Content-Type", "audio/wav")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            pass
+    
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RecordingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, downloads
+
+
+async def seed(host: str, recordings: int) -> tuple:
+    """Create a benchmark client on the stand-in host and its calls, returning the client and call IDs."""
+    async with database.pool.acquire() as conn, conn.transaction():
+        client_id = await conn.fetchval(
+            "INSERT INTO clients (client_name, fetch_recording_url) VALUES ($1, $2) RETURNING client_id",
+            f"{CLIENT_PREFIX}recordings", f"{host}/recordings"
+        )
+        rows = await conn.fetch(
+            "INSERT INTO calls (client_id, phone_number, recording_url) "
+            "SELECT $1, lpad(g::text, 10, '0'), $2 || '/recordings/' || g || '.wav' "
+            "FROM generate_series(1, $3) g RETURNING call_id",
+            client_id, host, recordings
+        )
+    return client_id, [row["call_id"] for row in rows]
+
+
+async def timed(client: httpx.AsyncClient, url: str, **kwargs):
+    """Send one GET, returning the response and its latency."""
+    start = time.perf_counter()
+    response = await client.get(url, **kwargs)
+    return response, time.perf_counter() - start
+
+
+async def run_benchmarks(client: httpx.AsyncClient, call_ids: list, downloads: list, args) -> dict:
+    """Run every scenario in a fixed order."""
+    rng = random.Random(args.seed)
+    results = {}
+    
+    def url(call_id: int) -> str:
+        return f"/api/v1/calls/{call_id}/recording"
+    
+    # every player of a recording starts at once, so each recording is fetched cold by all of them
+    latencies, errors = [], 0
+    start = time.perf_counter()
+    for call_id in call_ids:
+        responses = await asyncio.gather(*(timed(client, url(call_id)) for _ in range(args.concurrency)))
+        for response, latency in responses:
+            latencies.append(latency)
+            errors += response.status_code != 200 or len(response.content) != args.size
+    results["cold_concurrent"] = summarize(latencies, errors, time.perf_counter() - start)
+    results["cold_concurrent"]["upstream_downloads"] = len(downloads)
+    
+    latencies, errors = [], 0
+    start = time.perf_counter()
+    for call_id in call_ids:
+        response, latency = await timed(client, url(call_id))
+        latencies.append(latency)
+        errors += response.status_code != 200
+    results["cached_full"] = summarize(latencies, errors, time.perf_counter() - start)
+    
+    # seek to a random position and read 64 KB, as a player does
+    latencies, errors = [], 0
+    start = time.perf_counter()
+    for _ in range(args.seeks):
+        index = rng.randrange(len(call_ids))
+        first = rng.randrange(args.size)
+        last = min(first + 65535, args.size - 1)
+        response, latency = await timed(client, url(call_ids[index]), headers={"Range": f"bytes={first}-{last}"})
+        latencies.append(latency)
+        expected = recording_bytes(f"/recordings/{index + 1}.wav", args.size)[first:last + 1]
+        errors += response.status_code != 206 or response.content != expected
+    results["cached_seek"] = summarize(latencies, errors, time.perf_counter() - start)
+    results["cached_seek"]["upstream_downloads"] = len(downloads)
+    
+    for name, result in results.items():
+        print(f"  {name:<16} {json.dumps(result)}", file=sys.stderr)
+    return results
+
+
+async def main(args) -> dict:
+    """Start the stand-in host, seed, run every scenario through the app and clean up."""
+    server, downloads = start_recording_host(args.size, args.latency)
+    host = f"http://127.0.0.1:{server.server_port}"
+    
+    # an empty cache directory, so every recording starts cold
+    with tempfile.TemporaryDirectory() as directory:
+        recording_cache.directory = directory
+        async with trunk.lifespan(trunk.app):
+            client_id, call_ids = await seed(host, args.recordings)
+            try:
+                transport = httpx.ASGITransport(app=trunk.app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+                    scenarios = await run_benchmarks(client, call_ids, downloads, args)
+            finally:
+                await cleanup([client_id])
+    
+    server.shutdown()
+    return {
+        "meta": {
+            "recordings": args.recordings,
+            "size": args.size,
+            "latency": args.latency,
+            "concurrency": args.concurrency,
+            "seeks": args.seeks,
+            "seed": args.seed,
+        },
+        "scenarios": scenarios,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--recordings", type=int, default=20, help="Recordings to seed")
+    parser.add_argument("--size", type=int, default=1000000, help="Bytes per recording")
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds the stand-in host waits before responding")
+    parser.add_argument("--concurrency", type=int, default=10, help="Players requesting each recording at once")
+    parser.add_argument("--seeks", type=int, default=200, help="Range requests to send")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for seek positions")
+    parser.add_argument(
+        "--allow-non-development", action="store_true", help="Run even when ENVIRONMENT is not development"
+    )
+    args = parser.parse_args()
+    check_environment(args.allow_non_development)
+    
+    result = asyncio.run(main(args))
+    print(json.dumps(result, indent=2))
+    
+    scenarios = result["scenarios"]
+    ok = (
+        scenarios["cold_concurrent"]["upstream_downloads"] == args.recordings
+        and scenarios["cached_seek"]["upstream_downloads"] == args.recordings
+        and not any(scenario["errors"] for scenario in scenarios.values())
+    )
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark call list serialization: Pydantic response_model vs orjson.
+
+Encodes a page of synthetic call records the way FastAPI did before
+(CallResponse per row, then response_model validation and serialization)
+and with the FastJSONResponse fast path, and reports the cost per row.
+No database is needed.
+
+Usage: python -m benchmarks.serialization [--rows 1000] [--runs 20]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.core.serialization import FastJSONResponse, call_record
+from app.schemas.calls import CallListResponse, CallResponse, PaginationInfo
+
+
+def build_records(size: int) -> list:
+    """Build synthetic records shaped like asyncpg rows."""
+    now = datetime.now()
+    return [
+        {
+            "call_id": i,
+            "client_id": 1 + i % 20,
+            "phone_number": f"555{i:07d}",
+            "response_category": "Interested" if i % 3 == 0 else "Not_Interested",
+            "timestamp": now - timedelta(seconds=i),
+            "recording_url": f"https://recordings.example.com/{i}.wav",
+            "recording_length": Decimal(i % 300) / 4,
+            "list_id": f"list-{i % 10}",
+            "final_transcription": "hello, yes I would like to hear more about the offer " * 8,
+        }
+        for i in range(size)
+    ]
+
+
+def pagination_info(size: int) -> PaginationInfo:
+    return PaginationInfo(page=1, limit=size, total=size, total_pages=1)
+
+
+async def encode_pydantic(records: list, response_field) -> bytes:
+    """Previous path: models per row, then FastAPI response_model handling."""
+    content = CallListResponse(
+        calls=[CallResponse(**dict(record)) for record in records],
+        pagination=pagination_info(len(records)),
+    )
+    serialized = await serialize_response(field=response_field, response_content=content)
+    return JSONResponse(serialized).body
+
+
+async def encode_fast(records: list, response_field) -> bytes:
+    """Fast path: records straight to orjson."""
+    return FastJSONResponse({
+        "calls": [call_record(record) for record in records],
+        "pagination": pagination_info(len(records)).dict(),
+        "next_cursor": None,
+    }).body
+
+
+async def measure(encoder, records: list, runs: int) -> list:
+    """Time an encoder over several runs."""
+    response_field = create_response_field(name="Response", type_=CallListResponse)
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await encoder(records, response_field)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def main(rows: int, runs: int):
+    """Run both encoders and print the cost per row."""
+    records = build_records(rows)
+    
+    print(f"{rows} rows per page, {runs} runs")
+    results = {}
+    for name, encoder in (("pydantic", encode_pydantic), ("orjson", encode_fast)):
+        await measure(encoder, records, 2)
+        timings = await measure(encoder, records, runs)
+        results[name] = statistics.median(timings)
+        print(
+            f"  {name:<9} median {results[name] * 1000:8.2f} ms/page  "
+            f"{results[name] / rows * 1e6:7.2f} us/row"
+        )
+    print(f"  speedup   {results['pydantic'] / results['orjson']:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000, help="Calls per page")
+    parser.add_argument("--runs", type=int, default=20, help="Timed runs per encoder")
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.runs))
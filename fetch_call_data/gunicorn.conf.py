@@ -0,0 +1,13 @@
+"""
+Gunicorn hooks for production, used by scripts/start.py.
+"""
+
+import os
+
+from prometheus_client import multiprocess
+
+
+def child_exit(server, worker):
+    """Drop the live gauges of a worker that exited."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(worker.pid)
@@ -4,6 +4,7 @@ Startup script for the Calls API.
 """
 
 import os
+import shutil
 import sys
 import subprocess
 from pathlib import Path
@@ -17,6 +18,11 @@ def install_dependencies():
     print("Installing dependencies...")
     subprocess.run([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"], check=True)
 
+def run_migrations():
+    """Apply pending database migrations."""
+    print("Applying database migrations...")
+    subprocess.run([sys.executable, "-m", "app.models.migrations"], check=True)
+
 def run_development():
     """Run in development mode."""
     print("Starting development server...")
@@ -28,6 +34,11 @@ def run_production():
     print("Starting production server with Gunicorn...")
     os.environ.setdefault("ENVIRONMENT", "production")
     
+    # workers write metrics here, start from an empty directory every run
+    metrics_dir = os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/xdial_metrics")
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir)
+    
     # Use gunicorn from virtual environment if it exists
     gunicorn_path = ".venv/bin/gunicorn"
     if not os.path.exists(gunicorn_path):
@@ -35,6 +46,7 @@ def run_production():
     
     subprocess.run([
         gunicorn_path, "trunk:app",
+        "--config", "gunicorn.conf.py",
         "--bind", "0.0.0.0:8000",
         "--workers", "4",
         "--worker-class", "uvicorn.workers.UvicornWorker",
@@ -54,12 +66,14 @@ if __name__ == "__main__":
         command = sys.argv[1]
         if command == "install":
             install_dependencies()
+        elif command == "migrate":
+            run_migrations()
         elif command == "dev":
             run_development()
         elif command == "prod":
             run_production()
         else:
             print(f"Unknown command: {command}")
-            print("Available commands: install, dev, prod")
+            print("Available commands: install, migrate, dev, prod")
     else:
-        print("Usage: python scripts/start.py [install|dev|prod]")
+        print("Usage: python scripts/start.py [install|migrate|dev|prod]")
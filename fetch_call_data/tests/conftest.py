@@ -0,0 +1,73 @@
+"""
+Shared fixtures for the API tests.
+
+Tests that need Postgres run against the configured database (the DB_*
+settings) and are skipped when it cannot be reached. They roll back or
+delete every row they add.
+"""
+
+import sys
+from pathlib import Path
+
+import asyncpg
+import httpx
+import pytest
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def db():
+    """The primary database, connected."""
+    from app.models.database import database
+    
+    try:
+        await database.connect()
+    except (OSError, asyncpg.PostgresError) as e:
+        pytest.skip(f"Database not available: {e}")
+    
+    try:
+        yield database
+    finally:
+        await database.disconnect()
+
+
+@pytest.fixture
+async def client():
+    """HTTP client for the app, running inside its lifespan."""
+    import trunk
+    
+    lifespan = trunk.lifespan(trunk.app)
+    try:
+        await lifespan.__aenter__()
+    except (OSError, asyncpg.PostgresError) as e:
+        pytest.skip(f"Database not available: {e}")
+    
+    try:
+        transport = httpx.ASGITransport(app=trunk.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            yield client
+    finally:
+        await lifespan.__aexit__(None, None, None)
+
+
+@pytest.fixture
+async def client_id(client):
+    """A client created for the test, deleted with everything recorded for it afterwards."""
+    from app.models.database import database
+    
+    client_id = await database.fetch_val(
+        "INSERT INTO clients (client_name) VALUES ('test-client') RETURNING client_id"
+    )
+    try:
+        yield client_id
+    finally:
+        for table in ("call_keys", "calls", "call_daily_stats", "call_versions", "clients"):
+            await database.execute(f"DELETE FROM {table} WHERE client_id = :client_id", {"client_id": client_id})
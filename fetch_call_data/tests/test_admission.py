@@ -0,0 +1,37 @@
+"""
+Tests for admission control.
+"""
+
+import pytest
+
+from app.core.admission import INGEST, READ, STREAM, AdmissionController
+from app.middleware.admission import admission_class
+
+pytestmark = pytest.mark.anyio
+
+
+def test_admission_class():
+    assert admission_class({"method": "GET", "path": "/api/v1/calls/"}) == READ
+    assert admission_class({"method": "GET", "path": "/api/v1/calls/export"}) == STREAM
+    assert admission_class({"method": "GET", "path": "/api/v1/calls/7/recording"}) == STREAM
+    assert admission_class({"method": "HEAD", "path": "/api/v1/calls/7/recording"}) == STREAM
+    assert admission_class({"method": "POST", "path": "/api/v1/calls/batch"}) == INGEST
+
+
+async def test_streams_do_not_take_read_slots():
+    controller = AdmissionController(
+        limits={INGEST: 4, READ: 2, STREAM: 1},
+        total_limit=4,
+        queue_size=1,
+        queue_timeout=0.05,
+    )
+    
+    assert await controller.acquire(STREAM)
+    # a second download waits for the first instead of using a read slot
+    assert not await controller.acquire(STREAM)
+    assert await controller.acquire(READ)
+    assert await controller.acquire(READ)
+    assert await controller.acquire(INGEST)
+    
+    controller.release(STREAM)
+    assert await controller.acquire(STREAM)
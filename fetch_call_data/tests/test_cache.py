@@ -0,0 +1,63 @@
+"""
+Tests for the shared result cache.
+"""
+
+import os
+from datetime import datetime
+
+import pytest
+
+from app.core.cache import CALLS_TAG, SharedCache, calls_tag
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SharedCache(str(tmp_path / "xdial" / "cache.sqlite3"), ttl=60)
+
+
+def counter(value):
+    """A compute function returning value and counting its calls."""
+    async def compute():
+        compute.calls += 1
+        return value
+    compute.calls = 0
+    return compute
+
+
+async def test_values_round_trip_as_json(cache):
+    page = ([{"call_id": 1, "timestamp": datetime(2024, 5, 1, 12, 0, 0, 123456)}], "cursor")
+    compute = counter(page)
+    
+    assert await cache.fetch("first_page", 1, compute, tag=CALLS_TAG) == page
+    cached = await cache.fetch("first_page", 1, compute, tag=CALLS_TAG)
+    
+    assert compute.calls == 1
+    assert cached == [[{"call_id": 1, "timestamp": "2024-05-01T12:00:00.123456"}], "cursor"]
+
+
+async def test_invalidation_is_scoped_to_client(cache):
+    first, second, everyone = counter(1), counter(2), counter(3)
+    for compute, tag in ((first, calls_tag(1)), (second, calls_tag(2)), (everyone, calls_tag())):
+        await cache.fetch("count", tag, compute, tag=tag)
+    
+    cache.invalidate(CALLS_TAG, calls_tag(1))
+    for compute, tag in ((first, calls_tag(1)), (second, calls_tag(2)), (everyone, calls_tag())):
+        await cache.fetch("count", tag, compute, tag=tag)
+    
+    assert (first.calls, second.calls, everyone.calls) == (2, 1, 2)
+
+
+async def test_refuses_directory_others_can_enter(cache):
+    cache.check_ownership()
+    os.chmod(os.path.dirname(cache.path), 0o755)
+    
+    with pytest.raises(PermissionError):
+        cache.check_ownership()
+    
+    # a refused store behaves as a miss
+    compute = counter(1)
+    await cache.fetch("count", 1, compute, tag=CALLS_TAG)
+    await cache.fetch("count", 1, compute, tag=CALLS_TAG)
+    assert compute.calls == 2
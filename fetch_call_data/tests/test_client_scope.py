@@ -0,0 +1,142 @@
+"""
+Tests for limiting client-scoped tokens to their own client's calls.
+"""
+
+import asyncio
+
+import pytest
+
+from app.dependencies.auth import create_access_token
+from app.models.database import database
+
+pytestmark = pytest.mark.anyio
+
+
+def bearer(client_id: int) -> dict:
+    """Headers carrying a token scoped to a client."""
+    return {"Authorization": f"Bearer {create_access_token({'sub': 'test', 'client_id': client_id})}"}
+
+
+@pytest.fixture
+async def other_client_id(client):
+    """A second client, deleted with its calls afterwards."""
+    other_client_id = await database.fetch_val(
+        "INSERT INTO clients (client_name) VALUES ('test-other-client') RETURNING client_id"
+    )
+    try:
+        yield other_client_id
+    finally:
+        for table in ("call_keys", "calls", "call_daily_stats", "call_versions", "clients"):
+            await database.execute(f"DELETE FROM {table} WHERE client_id = :client_id", {"client_id": other_client_id})
+
+
+async def create_call(client, client_id: int) -> int:
+    """Create a call for a client through the API, returning its ID."""
+    response = await client.post("/api/v1/calls/", json={"client_id": client_id, "phone_number": "5550100"})
+    assert response.status_code == 201
+    return response.json()["call"]["call_id"]
+
+
+async def test_invalid_token_is_refused(client):
+    for authorization in ("Bearer not-a-token", "Basic dXNlcjpwYXNz"):
+        response = await client.get("/api/v1/calls/", headers={"Authorization": authorization})
+        assert response.status_code == 401
+    
+    response = await client.get("/api/v1/calls/?limit=1")
+    assert response.status_code == 200
+
+
+async def test_update_is_scoped(client, client_id, other_client_id):
+    call_id = await create_call(client, other_client_id)
+    url = f"/api/v1/calls/{call_id}"
+    
+    # moving the call to the token's client does not reach it either
+    response = await client.put(url, json={"client_id": client_id, "phone_number": "5550101"}, headers=bearer(client_id))
+    assert response.status_code == 404
+    response = await client.put(url, json={"client_id": other_client_id, "phone_number": "5550101"}, headers=bearer(client_id))
+    assert response.status_code == 403
+    assert (await client.get(url)).json()["phone_number"] == "5550100"
+    
+    response = await client.put(url, json={"client_id": other_client_id, "phone_number": "5550101"}, headers=bearer(other_client_id))
+    assert response.status_code == 200
+    assert response.json()["call"]["phone_number"] == "5550101"
+
+
+async def test_delete_is_scoped(client, client_id, other_client_id):
+    call_id = await create_call(client, other_client_id)
+    url = f"/api/v1/calls/{call_id}"
+    
+    response = await client.delete(url, headers=bearer(client_id))
+    assert response.status_code == 404
+    assert (await client.get(url)).status_code == 200
+    
+    response = await client.delete(url, headers=bearer(other_client_id))
+    assert response.status_code == 200
+    assert (await client.get(url)).status_code == 404
+
+
+async def calls_of(client_id: int) -> list:
+    """Phone numbers of a client's calls, in insert order."""
+    rows = await database.fetch_all(
+        "SELECT phone_number FROM calls WHERE client_id = :client_id ORDER BY call_id",
+        {"client_id": client_id}
+    )
+    return [row["phone_number"] for row in rows]
+
+
+async def test_writes_are_scoped(client, client_id, other_client_id):
+    headers = bearer(client_id)
+    other_call = {"client_id": other_client_id, "phone_number": "5550101"}
+    own_call = {"client_id": client_id, "phone_number": "5550100"}
+    
+    assert (await client.post("/api/v1/calls/", json=other_call, headers=headers)).status_code == 403
+    assert (await client.post("/api/v1/calls/async", json=other_call, headers=headers)).status_code == 403
+    # one call for another client refuses the whole batch
+    response = await client.post("/api/v1/calls/batch", json={"calls": [own_call, other_call]}, headers=headers)
+    assert response.status_code == 403
+    
+    # overwriting another client's calls by external key is refused too
+    response = await client.put("/api/v1/calls/batch", json={"calls": [{**other_call, "external_key": "a"}]})
+    assert response.status_code == 200
+    response = await client.put(
+        "/api/v1/calls/batch", json={"calls": [{**other_call, "external_key": "a", "phone_number": "5550102"}]}, headers=headers
+    )
+    assert response.status_code == 403
+    assert await calls_of(other_client_id) == ["5550101"]
+    assert await calls_of(client_id) == []
+    
+    assert (await client.post("/api/v1/calls/", json=own_call, headers=headers)).status_code == 201
+    assert (await client.post("/api/v1/calls/batch", json={"calls": [own_call]}, headers=headers)).status_code == 201
+    assert await calls_of(client_id) == ["5550100", "5550100"]
+
+
+async def test_purge_is_scoped(client, client_id, other_client_id):
+    headers = bearer(client_id)
+    await create_call(client, client_id)
+    await create_call(client, other_client_id)
+    
+    response = await client.post(
+        "/api/v1/calls/purge", json={"before": "2100-01-01", "client_id": other_client_id}, headers=headers
+    )
+    assert response.status_code == 403
+    
+    # leaving the client out purges the token's own client, not every client
+    response = await client.post("/api/v1/calls/purge", json={"before": "2100-01-01"}, headers=headers)
+    assert response.status_code == 202
+    job = response.json()
+    assert job["filters"]["client_id"] == client_id
+    
+    url = f"/api/v1/calls/purge/{job['job_id']}"
+    for _ in range(50):
+        job = (await client.get(url, headers=headers)).json()
+        if job["status"] != "running":
+            break
+        await asyncio.sleep(0.1)
+    assert job["status"] == "completed"
+    assert await calls_of(client_id) == []
+    assert await calls_of(other_client_id) == ["5550100"]
+    
+    # another client's token can neither see nor cancel the job
+    assert (await client.get(url, headers=bearer(other_client_id))).status_code == 404
+    assert (await client.delete(url, headers=bearer(other_client_id))).status_code == 404
+    assert (await client.delete(url, headers=headers)).status_code == 200
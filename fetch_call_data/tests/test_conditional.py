@@ -0,0 +1,48 @@
+"""
+Tests for the conditional request helpers.
+"""
+
+from datetime import datetime, timezone
+
+from starlette.requests import Request
+
+from app.core.conditional import is_not_modified, make_etag
+
+LAST_MODIFIED = datetime(2024, 5, 1, 12, 0, 0, 500000, tzinfo=timezone.utc)
+
+
+def request_with(**headers) -> Request:
+    """Build a GET request carrying the given headers."""
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+def test_if_none_match_uses_weak_comparison():
+    etag = make_etag(1, "a")
+    assert is_not_modified(request_with(if_none_match=etag.removeprefix("W/")), etag, None)
+    assert is_not_modified(request_with(if_none_match=f'"other", {etag}'), etag, None)
+    assert is_not_modified(request_with(if_none_match="*"), etag, None)
+    assert not is_not_modified(request_with(if_none_match='"other"'), etag, None)
+
+
+def test_if_modified_since():
+    etag = make_etag(1)
+    assert is_not_modified(request_with(if_modified_since="Wed, 01 May 2024 12:00:00 GMT"), etag, LAST_MODIFIED)
+    assert not is_not_modified(request_with(if_modified_since="Wed, 01 May 2024 11:59:59 GMT"), etag, LAST_MODIFIED)
+
+
+def test_if_modified_since_without_zone_is_gmt():
+    etag = make_etag(1)
+    # -0000 parses to a naive datetime
+    assert is_not_modified(request_with(if_modified_since="Wed, 01 May 2024 12:00:00 -0000"), etag, LAST_MODIFIED)
+    assert is_not_modified(
+        request_with(if_modified_since="Wed, 01 May 2024 12:00:00 GMT"), etag, LAST_MODIFIED.replace(tzinfo=None)
+    )
+
+
+def test_invalid_if_modified_since_is_ignored():
+    assert not is_not_modified(request_with(if_modified_since="yesterday"), make_etag(1), LAST_MODIFIED)
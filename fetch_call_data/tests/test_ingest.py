@@ -0,0 +1,77 @@
+"""
+Tests for the group-commit ingest writer.
+"""
+
+import asyncio
+
+import pytest
+
+from app.models.database import database
+from app.schemas.calls import CallCreate
+from app.services import ingest
+from app.services.ingest import IngestWriter
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def writer():
+    """A writer flushing and retrying quickly."""
+    return IngestWriter(max_queue_size=100, batch_size=10, flush_interval=0.01, retry_interval=0.01, max_retry_interval=0.05)
+
+
+async def written(client_id: int) -> list:
+    """Phone numbers of a client's calls, in insert order."""
+    rows = await database.fetch_all(
+        "SELECT phone_number FROM calls WHERE client_id = :client_id ORDER BY call_id",
+        {"client_id": client_id}
+    )
+    return [row["phone_number"] for row in rows]
+
+
+async def test_calls_survive_database_outage(client_id, writer, monkeypatch):
+    outage = {"down": True, "attempts": 0}
+    
+    def unreachable(insert):
+        async def wrapped(conn, calls):
+            if outage["down"]:
+                outage["attempts"] += 1
+                raise ConnectionRefusedError("database unreachable")
+            return await insert(conn, calls)
+        return wrapped
+    
+    monkeypatch.setattr(ingest, "insert_calls", unreachable(ingest.insert_calls))
+    monkeypatch.setattr(ingest, "insert_call", unreachable(ingest.insert_call))
+    
+    await writer.start(database)
+    try:
+        assert writer.submit([CallCreate(client_id=client_id, phone_number=f"555010{i}") for i in range(3)])
+        while outage["attempts"] < 3:
+            await asyncio.sleep(0.01)
+        
+        # the accepted calls are held while the database is down
+        assert await written(client_id) == []
+        assert writer.pending() == 3
+        
+        outage["down"] = False
+    finally:
+        await writer.stop(timeout=5.0)
+    
+    assert await written(client_id) == ["5550100", "5550101", "5550102"]
+    assert writer.pending() == 0
+
+
+async def test_only_bad_calls_are_dropped(client_id, writer):
+    await writer.start(database)
+    try:
+        assert writer.submit([
+            CallCreate(client_id=client_id, phone_number="5550100"),
+            # a client deleted after its call was accepted
+            CallCreate(client_id=2147483647, phone_number="5550101"),
+            CallCreate(client_id=client_id, phone_number="5550102"),
+        ])
+    finally:
+        await writer.stop(timeout=5.0)
+    
+    assert await written(client_id) == ["5550100", "5550102"]
+    assert writer.pending() == 0
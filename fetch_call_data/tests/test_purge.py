@@ -0,0 +1,58 @@
+"""
+Tests for background retention purges.
+"""
+
+import asyncio
+import asyncpg
+import pytest
+
+from app.core.config import settings
+from app.services.purge import purge_runner
+
+pytestmark = pytest.mark.anyio
+
+
+async def wait_for_job(client, job_id: int, done, timeout: float = 10.0) -> dict:
+    """Poll a purge job until done(job) holds."""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while True:
+        job = (await client.get(f"/api/v1/calls/purge/{job_id}")).json()
+        if done(job) or asyncio.get_running_loop().time() > deadline:
+            return job
+        await asyncio.sleep(0.2)
+
+
+async def test_purge_waits_for_locked_calls(client, client_id, monkeypatch):
+    monkeypatch.setattr(purge_runner, "throttle", 0.01)
+    monkeypatch.setattr(purge_runner, "locked_retry", 0.05)
+    
+    calls = [{"client_id": client_id, "phone_number": f"55500000{i}"} for i in range(3)]
+    response = await client.post("/api/v1/calls/batch", json={"calls": calls})
+    assert response.status_code == 201
+    
+    # another writer holds one of the calls
+    locker = await asyncpg.connect(settings.database.url)
+    try:
+        transaction = locker.transaction()
+        await transaction.start()
+        await locker.execute(
+            "SELECT 1 FROM calls WHERE call_id = (SELECT MIN(call_id) FROM calls WHERE client_id = $1) FOR UPDATE",
+            client_id
+        )
+        
+        job = (await client.post("/api/v1/calls/purge", json={"before": "2100-01-01", "client_id": client_id})).json()
+        job = await wait_for_job(client, job["job_id"], lambda job: job["deleted"] == 2)
+        
+        # the locked call is still there, so the job is not done
+        await asyncio.sleep(0.3)
+        job = (await client.get(f"/api/v1/calls/purge/{job['job_id']}")).json()
+        assert job["status"] == "running"
+        assert job["deleted"] == 2
+        
+        await transaction.rollback()
+    finally:
+        await locker.close()
+    
+    job = await wait_for_job(client, job["job_id"], lambda job: job["status"] != "running")
+    assert job["status"] == "completed"
+    assert job["deleted"] == 3
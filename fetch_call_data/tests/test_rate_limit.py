@@ -0,0 +1,90 @@
+"""
+Tests for per-client rate limiting.
+"""
+
+import pytest
+from starlette.requests import Request
+
+from app.core.rate_limit import RateLimiter
+from app.middleware import rate_limit as middleware
+from app.middleware.rate_limit import RateLimitMiddleware, client_address, client_key
+
+pytestmark = pytest.mark.anyio
+
+PROXIES = frozenset({"127.0.0.1"})
+
+
+def make_request(peer: str = "127.0.0.1", headers: dict = None, query: str = "") -> Request:
+    """Build a request from a peer address with the given headers."""
+    return Request({
+        "type": "http",
+        "method": "POST",
+        "path": "/api/v1/calls/batch",
+        "query_string": query.encode(),
+        "client": (peer, 5000),
+        "headers": [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()],
+    })
+
+
+def test_client_address():
+    forwarded = {"X-Forwarded-For": "10.0.0.1, 203.0.113.9"}
+    assert client_address(make_request(headers=forwarded), PROXIES) == "203.0.113.9"
+    # only a trusted proxy's header is believed
+    assert client_address(make_request("198.51.100.4", forwarded), PROXIES) == "198.51.100.4"
+    assert client_address(make_request(), PROXIES) == "127.0.0.1"
+    
+    chained = {"X-Forwarded-For": "203.0.113.9, 127.0.0.1"}
+    assert client_address(make_request(headers=chained), PROXIES) == "203.0.113.9"
+
+
+def test_client_key():
+    assert client_key(make_request(query="client_id=3"), "read", PROXIES) == "client:3"
+    # writes name their client themselves, so they count against the sender
+    assert client_key(make_request(query="client_id=3"), "ingest", PROXIES) == "address:127.0.0.1"
+    forwarded = {"X-Forwarded-For": "203.0.113.9"}
+    assert client_key(make_request(headers=forwarded), "ingest", PROXIES) == "address:203.0.113.9"
+
+
+async def test_take_async(tmp_path):
+    limiter = RateLimiter(str(tmp_path / "limits" / "rate_limits.sqlite3"), {"ingest": (0.001, 2)})
+    
+    assert (await limiter.take_async("ingest", "client:1")).allowed
+    assert (await limiter.take_async("ingest", "client:1")).allowed
+    refused = await limiter.take_async("ingest", "client:1")
+    assert not refused.allowed and refused.retry_after > 0
+    assert (await limiter.take_async("ingest", "client:2")).allowed
+
+
+async def test_ingest_keyed_by_sender(tmp_path, monkeypatch):
+    limiter = RateLimiter(str(tmp_path / "limits" / "rate_limits.sqlite3"), {"ingest": (0.001, 1)})
+    monkeypatch.setattr(middleware, "rate_limiter", limiter)
+    
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 201, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+    
+    async def post(dialer: str, client_id: int) -> int:
+        sent = []
+        
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+        
+        async def send(message):
+            sent.append(message)
+        
+        scope = {
+            "type": "http",
+            "method": "POST",
+            "path": "/api/v1/calls/batch",
+            "query_string": f"client_id={client_id}".encode(),
+            "client": ("127.0.0.1", 5000),
+            "headers": [(b"x-forwarded-for", dialer.encode())],
+        }
+        await RateLimitMiddleware(app, PROXIES)(scope, receive, send)
+        return sent[0]["status"]
+    
+    assert await post("203.0.113.9", 1) == 201
+    # naming another client does not get a dialer a fresh bucket
+    assert await post("203.0.113.9", 2) == 429
+    # another dialer behind the same proxy has its own bucket
+    assert await post("203.0.113.10", 1) == 201
@@ -0,0 +1,180 @@
+"""
+Tests for the recording proxy against a local stand-in recording host.
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.models.database import database
+from app.services.recordings import RecordingCache, RecordingUnavailable, recording_cache
+
+pytestmark = pytest.mark.anyio
+
+SIZE = 10000
+
+RECORDING = random.Random("recording").randbytes(SIZE)
+
+
+@pytest.fixture
+def host():
+    """Serve RECORDING after a short delay, redirecting /redirect, and log every download."""
+    downloads = []
+    
+    class RecordingHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            downloads.append(self.path)
+            if self.path == "/redirect":
+                self.send_response(302)
+                # stands in for an internal service the host check never saw
+                self.send_header("Location", "/internal")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            
+            time.sleep(0.2)
+            self.send_response(200)
+            self.send_header("Content-Type", "audio/wav")
+            self.send_header("Content-Length", str(SIZE))
+            self.end_headers()
+            self.wfile.write(RECORDING)
+        
+        def log_message(self, format, *args):
+            pass
+    
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RecordingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}", downloads
+    finally:
+        server.shutdown()
+
+
+@pytest.fixture
+async def recording_url(client, client_id, host, tmp_path, monkeypatch):
+    """URL of the recording of a call on the stand-in host, with an empty cache."""
+    address, _ = host
+    monkeypatch.setattr(recording_cache, "directory", str(tmp_path))
+    await database.execute(
+        "UPDATE clients SET fetch_recording_url = :url WHERE client_id = :client_id",
+        {"url": f"{address}/recordings", "client_id": client_id}
+    )
+    
+    async def create(path: str = "/recordings/1.wav") -> str:
+        call_id = await database.fetch_val(
+            "INSERT INTO calls (client_id, phone_number, recording_url) VALUES (:client_id, '5550100', :url) "
+            "RETURNING call_id",
+            {"client_id": client_id, "url": f"{address}{path}"}
+        )
+        return f"/api/v1/calls/{call_id}/recording"
+    
+    return create
+
+
+async def test_full_recording(client, recording_url):
+    response = await client.get(await recording_url())
+    assert response.status_code == 200
+    assert response.content == RECORDING
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["content-type"] == "audio/wav"
+    
+    response = await client.get(response.url.path, headers={"If-None-Match": response.headers["etag"]})
+    assert response.status_code == 304
+
+
+async def test_ranges(client, recording_url):
+    url = await recording_url()
+    
+    response = await client.get(url, headers={"Range": "bytes=100-199"})
+    assert response.status_code == 206
+    assert response.content == RECORDING[100:200]
+    assert response.headers["content-range"] == f"bytes 100-199/{SIZE}"
+    
+    response = await client.get(url, headers={"Range": "bytes=-300"})
+    assert response.status_code == 206
+    assert response.content == RECORDING[-300:]
+    assert response.headers["content-range"] == f"bytes {SIZE - 300}-{SIZE - 1}/{SIZE}"
+    
+    response = await client.get(url, headers={"Range": f"bytes={SIZE - 50}-"})
+    assert response.status_code == 206
+    assert response.content == RECORDING[-50:]
+    
+    # an end past the last byte is cut to the recording
+    response = await client.get(url, headers={"Range": f"bytes={SIZE - 10}-{SIZE + 100}"})
+    assert response.status_code == 206
+    assert response.content == RECORDING[-10:]
+    
+    for unsatisfiable in (f"bytes={SIZE}-", "bytes=-0"):
+        response = await client.get(url, headers={"Range": unsatisfiable})
+        assert response.status_code == 416
+        assert response.headers["content-range"] == f"bytes */{SIZE}"
+    
+    # a range the server does not support is answered with the whole recording
+    response = await client.get(url, headers={"Range": "bytes=0-9,20-29"})
+    assert response.status_code == 200
+    assert response.content == RECORDING
+
+
+async def test_if_range(client, recording_url):
+    url = await recording_url()
+    etag = (await client.get(url)).headers["etag"]
+    
+    response = await client.get(url, headers={"Range": "bytes=0-99", "If-Range": etag})
+    assert response.status_code == 206
+    assert response.content == RECORDING[:100]
+    
+    response = await client.get(url, headers={"Range": "bytes=0-99", "If-Range": '"changed"'})
+    assert response.status_code == 200
+    assert response.content == RECORDING
+
+
+async def test_concurrent_requests_download_once(client, recording_url, host):
+    _, downloads = host
+    url = await recording_url()
+    
+    responses = await asyncio.gather(*(client.get(url) for _ in range(4)))
+    assert [response.status_code for response in responses] == [200] * 4
+    assert all(response.content == RECORDING for response in responses)
+    assert downloads == ["/recordings/1.wav"]
+    
+    assert (await client.get(url, headers={"Range": "bytes=0-9"})).status_code == 206
+    assert len(downloads) == 1
+
+
+async def test_redirect_is_not_followed(client, recording_url, host):
+    _, downloads = host
+    response = await client.get(await recording_url("/redirect"))
+    assert response.status_code == 502
+    assert downloads == ["/redirect"]
+
+
+async def test_download_again_after_eviction(host, tmp_path, monkeypatch):
+    address, downloads = host
+    cache = RecordingCache(str(tmp_path), max_bytes=10 * SIZE, max_file_size=10 * SIZE, timeout=5.0, verify_ssl=False)
+    evictions = []
+    
+    # another worker deletes the first download before it is opened
+    def evict():
+        evictions.append(True)
+        if len(evictions) == 1:
+            os.unlink(cache.path(f"{address}/recordings/1.wav"))
+    
+    monkeypatch.setattr(cache, "evict", evict)
+    await cache.start()
+    try:
+        with await cache.open(f"{address}/recordings/1.wav") as recording:
+            assert recording.read() == RECORDING
+        assert len(downloads) == 2
+        
+        # evicted every time, the request fails instead of retrying forever
+        monkeypatch.setattr(cache, "evict", lambda: os.unlink(cache.path(f"{address}/recordings/2.wav")))
+        with pytest.raises(RecordingUnavailable):
+            await cache.open(f"{address}/recordings/2.wav")
+        assert len(downloads) == 4
+    finally:
+        await cache.stop()
@@ -0,0 +1,115 @@
+"""
+Tests for routing reads between the primary and its replicas.
+
+The primary itself stands in for a replica: it is not in recovery, so the
+router measures it as current.
+"""
+
+import time
+
+import pytest
+from fastapi import Request
+
+from app.core.config import settings
+from app.middleware.read_your_writes import ReadYourWritesMiddleware
+from app.models.database import create_database
+from app.services.replicas import PRIMARY_COOKIE, PRIMARY_HEADER, ReplicaRouter
+
+pytestmark = pytest.mark.anyio
+
+
+def make_request(method: str = "GET", headers: dict = None) -> Request:
+    """Build a request with the given method and headers."""
+    return Request({
+        "type": "http",
+        "method": method,
+        "path": "/api/v1/calls/",
+        "query_string": b"",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()],
+    })
+
+
+@pytest.fixture
+async def router(db):
+    """A router whose only replica is a second pool on the primary."""
+    replica = create_database(settings.database.url, "replica1")
+    router = ReplicaRouter(primary=db, replicas=[replica], max_lag=5.0, interval=1.0)
+    await router.check()
+    try:
+        yield router
+    finally:
+        await router.stop()
+
+
+async def test_reads_go_to_current_replica(router):
+    assert router.lag() == {"replica1": 0.0}
+    assert router.for_request(make_request("GET")) is router.replicas[0]
+    assert router.for_request(make_request("HEAD")) is router.replicas[0]
+
+
+async def test_writes_go_to_primary(router):
+    for method in ("POST", "PUT", "PATCH", "DELETE"):
+        assert router.for_request(make_request(method)) is router.primary
+
+
+async def test_primary_header_and_cookie(router):
+    assert router.for_request(make_request(headers={PRIMARY_HEADER: "1"})) is router.primary
+    
+    recent_write = {"Cookie": f"{PRIMARY_COOKIE}={time.time() + 60:.3f}"}
+    assert router.for_request(make_request(headers=recent_write)) is router.primary
+    
+    expired = {"Cookie": f"{PRIMARY_COOKIE}={time.time() - 60:.3f}"}
+    assert router.for_request(make_request(headers=expired)) is router.replicas[0]
+    
+    malformed = {"Cookie": f"{PRIMARY_COOKIE}=soon"}
+    assert router.for_request(make_request(headers=malformed)) is router.replicas[0]
+
+
+async def test_lagging_replica_is_skipped(router):
+    # any measured lag exceeds a negative limit
+    router.max_lag = -1.0
+    await router.check()
+    assert router.for_request(make_request("GET")) is router.primary
+    
+    router.max_lag = 5.0
+    await router.check()
+    assert router.for_request(make_request("GET")) is router.replicas[0]
+
+
+async def test_unreachable_replica_is_skipped(db):
+    replica = create_database("postgresql://nobody@127.0.0.1:1/nowhere", "replica1")
+    router = ReplicaRouter(primary=db, replicas=[replica], max_lag=5.0, interval=1.0)
+    await router.check()
+    try:
+        assert router.lag() == {"replica1": float("inf")}
+        assert router.for_request(make_request("GET")) is db
+    finally:
+        await router.stop()
+
+
+async def test_writes_set_primary_cookie():
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+    
+    middleware = ReadYourWritesMiddleware(app, window=2.0)
+    
+    async def cookies(method: str) -> list:
+        messages = []
+        
+        async def send(message):
+            messages.append(message)
+        
+        await middleware({"type": "http", "method": method, "headers": []}, None, send)
+        return [value.decode() for name, value in messages[0]["headers"] if name == b"set-cookie"]
+    
+    assert await cookies("GET") == []
+    
+    (cookie,) = await cookies("POST")
+    until = float(cookie.split(";")[0].split("=")[1])
+    assert time.time() < until < time.time() + 2.1
+    
+    # the cookie keeps the client's next reads on the primary
+    request = make_request(headers={"Cookie": cookie.split(";")[0]})
+    router = ReplicaRouter(primary=None, replicas=[], max_lag=5.0, interval=1.0)
+    assert router.reads_primary(request)
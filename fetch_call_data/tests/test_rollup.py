@@ -0,0 +1,85 @@
+"""
+Tests for the daily rollup and change counters kept by the triggers on calls.
+"""
+
+import pytest
+
+from app.models.database import database
+
+pytestmark = pytest.mark.anyio
+
+
+async def rollup(client_id: int) -> dict:
+    """Get a client's rollup counts by category, leaving out zeroed rows."""
+    rows = await database.fetch_all(
+        "SELECT response_category, SUM(call_count) AS calls FROM call_daily_stats "
+        "WHERE client_id = :client_id GROUP BY 1 HAVING SUM(call_count) <> 0",
+        {"client_id": client_id}
+    )
+    return {row["response_category"]: row["calls"] for row in rows}
+
+
+async def test_direct_writes_are_counted(client, client_id):
+    # the dashboard inserts calls itself, without going through the API
+    await database.execute(
+        "INSERT INTO calls (client_id, phone_number, response_category) "
+        "SELECT :client_id, '5550100', category FROM unnest(ARRAY['DNC', 'DNC', NULL]) category",
+        {"client_id": client_id}
+    )
+    assert await rollup(client_id) == {"DNC": 2, "": 1}
+    
+    await database.execute(
+        "UPDATE calls SET response_category = 'Interested' "
+        "WHERE client_id = :client_id AND response_category IS NULL",
+        {"client_id": client_id}
+    )
+    assert await rollup(client_id) == {"DNC": 2, "Interested": 1}
+    
+    await database.execute(
+        "DELETE FROM calls WHERE client_id = :client_id AND response_category = 'DNC'",
+        {"client_id": client_id}
+    )
+    assert await rollup(client_id) == {"Interested": 1}
+
+
+async def test_stats_match_calls(client, client_id):
+    await database.execute(
+        "INSERT INTO calls (client_id, phone_number, response_category) VALUES (:client_id, '5550100', 'DNC')",
+        {"client_id": client_id}
+    )
+    response = await client.post("/api/v1/calls/batch", json={"calls": [
+        {"client_id": client_id, "phone_number": "5550101", "response_category": "DNC"},
+        {"client_id": client_id, "phone_number": "5550102", "response_category": "Interested"},
+    ]})
+    assert response.status_code == 201
+    
+    response = await client.get(f"/api/v1/calls/stats?client_id={client_id}")
+    assert response.status_code == 200
+    assert await rollup(client_id) == {"DNC": 2, "Interested": 1}
+    assert response.json()["total_calls"] == 3
+
+
+async def test_direct_writes_change_etag(client, client_id):
+    url = f"/api/v1/calls/?client_id={client_id}"
+    response = await client.get(url)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert (await client.get(url, headers={"If-None-Match": etag})).status_code == 304
+    
+    await database.execute(
+        "INSERT INTO calls (client_id, phone_number) VALUES (:client_id, '5550100')",
+        {"client_id": client_id}
+    )
+    response = await client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert [call["phone_number"] for call in response.json()["calls"]] == ["5550100"]
+    etag = response.headers["etag"]
+    
+    # an update that keeps every count still changes the calls
+    await database.execute(
+        "UPDATE calls SET phone_number = '5550101' WHERE client_id = :client_id",
+        {"client_id": client_id}
+    )
+    response = await client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert [call["phone_number"] for call in response.json()["calls"]] == ["5550101"]
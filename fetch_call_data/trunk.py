@@ -6,14 +6,26 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
+from fastapi.encoders import jsonable_encoder
 from starlette.exceptions import HTTPException as StarletteHTTPException
 import uvicorn
 
 from app.core.config import settings
 from app.core.openapi import setup_openapi
-from app.models.database import connect_db, disconnect_db
+from app.models.database import database, connect_db, disconnect_db
+from app.services.client_registry import client_registry
+from app.services.ingest import ingest_writer
+from app.services.partitions import partition_manager
+from app.services.purge import purge_runner
+from app.services.recordings import recording_cache
+from app.services.replicas import replica_router
 from app.api.v1.router import api_router
 from app.middleware.cors import add_cors_middleware
+from app.middleware.admission import add_admission_middleware
+from app.middleware.metrics import add_metrics_middleware
+from app.middleware.rate_limit import add_rate_limit_middleware
+from app.middleware.read_your_writes import add_read_your_writes_middleware
+from app.core.metrics import metrics_response
 
 
 @asynccontextmanager
@@ -21,8 +33,20 @@ async def lifespan(app: FastAPI):
     """Handle application lifespan events."""
     # startup
     await connect_db()
+    await replica_router.start()
+    await partition_manager.start(database)
+    await client_registry.start(settings.database.url)
+    await ingest_writer.start(database)
+    await purge_runner.start(database)
+    await recording_cache.start()
     yield
-    # shutdown
+    # shutdown, writing queued calls before the pool closes
+    await recording_cache.stop()
+    await purge_runner.stop()
+    await ingest_writer.stop(timeout=settings.api.ingest_drain_timeout)
+    await client_registry.stop()
+    await partition_manager.stop()
+    await replica_router.stop()
     await disconnect_db()
 
 
@@ -40,9 +64,22 @@ def create_application() -> FastAPI:
         lifespan=lifespan,
     )
     
+    # shed requests before they queue on the database pool, inside CORS so
+    # browsers can read the 503
+    add_admission_middleware(application)
+    
+    # refuse flooding clients before they wait for admission
+    add_rate_limit_middleware(application)
+    
     # add cors middleware
     add_cors_middleware(application)
     
+    # keep clients' reads on the primary right after their writes
+    add_read_your_writes_middleware(application)
+    
+    # add request metrics middleware, outermost so it times everything
+    add_metrics_middleware(application)
+    
     # database events now handled by lifespan context manager
     
     # setup custom openapi schema
@@ -51,6 +88,11 @@ def create_application() -> FastAPI:
     # include api routes
     application.include_router(api_router, prefix="/api/v1")
     
+    @application.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus metrics for all workers."""
+        return metrics_response()
+    
     # add exception handlers
     @application.exception_handler(RequestValidationError)
     async def validation_exception_handler(request, exc):
@@ -59,7 +101,7 @@ def create_application() -> FastAPI:
             status_code=422,
             content={
                 "error": "Validation error",
-                "details": exc.errors()
+                "details": jsonable_encoder(exc.errors())
             }
         )
     
@@ -68,7 +110,8 @@ def create_application() -> FastAPI:
         """Handle HTTP exceptions."""
         return JSONResponse(
             status_code=exc.status_code,
-            content={"error": exc.detail}
+            content={"error": exc.detail},
+            headers=getattr(exc, "headers", None)
         )
     
     @application.exception_handler(Exception)